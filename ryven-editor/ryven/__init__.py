@@ -8,3 +8,6 @@ from ryven.main.packages.nodes_package import NodesPackage, import_nodes_package
 
 from .main.Ryven import run as run_ryven
 from .main.RyvenConsole import run as run_ryven_console
+from .main.RyvenRun import run as run_ryven_run
+from .main.RyvenServer import run as run_ryven_server
+from .main.RyvenCompile import run as run_ryven_compile
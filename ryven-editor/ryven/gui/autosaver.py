@@ -0,0 +1,178 @@
+import hashlib
+import os
+import time
+from typing import Dict, List, Set, Tuple
+
+from qtpy.QtCore import QObject, QTimer
+
+from ryvencore import Flow, Node
+from ryvencore.Base import Event
+
+from ryven.main.autosave import ProjectJournal
+from ryven.main.utils import abs_path_from_ryven_dir
+
+
+def autosave_dir(project_path) -> str:
+    """The directory of the autosave of a project file, or of an unsaved project."""
+    if project_path is None:
+        name = 'untitled'
+    else:
+        path = os.path.abspath(str(project_path))
+        name = f'{os.path.splitext(os.path.basename(path))[0]}_{hashlib.sha1(path.encode()).hexdigest()[:8]}'
+    directory: str = abs_path_from_ryven_dir(f'autosave/{name}')
+    return directory
+
+
+class Autosaver(QObject):
+    """
+    Periodically journals the changes of the editor's project, see
+    ``ryven.main.autosave``. A flow is marked as changed by commands on its
+    undo stack, by added or removed nodes and connections, and by updates
+    of its nodes, which also happen when their widgets change their state.
+    Only the changed flows are serialized on the GUI thread.
+    """
+
+    def __init__(self, main_window, directory: str, interval: int):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.session = main_window.core_session
+        self.journal = ProjectJournal(directory)
+
+        self._changed_flows: Set[Flow] = set()
+        self._flows_changed = False
+        self._commands: List[Dict] = []
+        # subscribed callbacks, to unsubscribe on stop
+        self._subscriptions: List[Tuple[Event, object]] = []
+        self._watched_nodes: Set[Node] = set()
+        self._stopped = False
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval * 1000)
+        self.timer.timeout.connect(self.save_changes)
+
+    def start(self):
+        """Takes the initial snapshot and starts watching the project."""
+        self._sub(self.session.flow_created, self._flow_created)
+        self._sub(self.session.flow_deleted, self._flow_structure_changed)
+        self._sub(self.session.flow_renamed, self._flow_renamed)
+        for flow in self.session.flows:
+            self._watch_flow(flow)
+        for flow, flow_view in self.main_window.session_gui.flow_views.items():
+            self.watch_undo_stack(flow, flow_view)
+        self._take_snapshot()
+
+    def _take_snapshot(self):
+        if self._stopped:
+            return
+        if any(v.populating() for v in self.main_window.session_gui.flow_views.values()):
+            # serializing would create the remaining items at once
+            QTimer.singleShot(200, self._take_snapshot)
+            return
+        self.journal.start(self.main_window.project_data())
+        self.timer.start()
+
+    def stop(self):
+        """Journals the remaining changes and waits until they are written."""
+        self._stopped = True
+        self.timer.stop()
+        self.save_changes()
+        for event, callback in self._subscriptions:
+            try:
+                event.unsub(callback)
+            except KeyError:
+                pass  # the node or flow was removed
+        self._subscriptions.clear()
+        self.journal.close()
+
+    def saved(self, project: Dict):
+        """The project was saved; the saved dict becomes the new snapshot."""
+        self._changed_flows.clear()
+        self._flows_changed = False
+        self._commands.clear()
+        self.journal.start(project)
+
+    """
+
+    Watching
+
+    """
+
+    def _sub(self, event: Event, callback):
+        event.sub(callback)
+        self._subscriptions.append((event, callback))
+
+    def _watch_flow(self, flow: Flow):
+        def changed(*args):
+            self._changed_flows.add(flow)
+
+        def node_added(node: Node):
+            changed()
+            self._watch_node(flow, node)
+
+        for event in (flow.node_removed, flow.connection_added, flow.connection_removed):
+            self._sub(event, changed)
+        self._sub(flow.node_added, node_added)
+        for node in flow.nodes:
+            self._watch_node(flow, node)
+
+    def _watch_node(self, flow: Flow, node: Node):
+        if node in self._watched_nodes:
+            return
+        self._watched_nodes.add(node)
+        self._sub(node.updating, lambda inp: self._changed_flows.add(flow))
+
+    def watch_undo_stack(self, flow: Flow, flow_view):
+        stack = flow_view._undo_stack
+
+        def index_changed(index: int):
+            self._changed_flows.add(flow)
+            self._commands.append({
+                'flow': flow.title,
+                'index': index,
+                'command': stack.text(index - 1) if index > 0 else '',
+            })
+
+        stack.indexChanged.connect(index_changed)
+
+    def _flow_created(self, flow: Flow):
+        self._flow_structure_changed(flow)
+        self._watch_flow(flow)
+
+    def _flow_renamed(self, flow: Flow, title: str):
+        self._flow_structure_changed(flow)
+
+    def _flow_structure_changed(self, flow: Flow):
+        self._flows_changed = True
+        self._changed_flows.add(flow)
+
+    """
+
+    Journaling
+
+    """
+
+    def save_changes(self):
+        """Journals the data of the flows which changed since the last call."""
+        if not self._changed_flows and not self._flows_changed and not self._commands:
+            return
+
+        flows = [f for f in self.session.flows if f in self._changed_flows]
+        mw = self.main_window
+        record = {
+            'time': time.time(),
+            'commands': self._commands,
+            'flow order': [f.title for f in self.session.flows],
+            'flows': {f.title: mw.lazy_flows.flow_data(f) for f in flows},
+            'flow_uis': {
+                str(f.global_id): mw.flow_UIs[f].save_state()
+                for f in flows if f in mw.flow_UIs
+            },
+            'addons': mw.lazy_flows.addons_data(),
+            'required packages': mw.required_packages_data(),
+            'geometry': mw.saveGeometry().toHex().data().decode(),
+            'state': mw.saveState().toHex().data().decode(),
+        }
+        self._changed_flows.clear()
+        self._flows_changed = False
+        self._commands = []
+        self.journal.append(record)
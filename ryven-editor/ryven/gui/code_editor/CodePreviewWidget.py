@@ -195,9 +195,9 @@ class CodePreviewWidget(QWidget):
         register_rb(LinkedRadioButton('node', NodeInspectable(node, code)))
 
         # main widget radio button
-        if codes.main_widget_cls is not None:
+        if codes.main_widget_ref is not None:
             mw = node.gui.main_widget()
-            code = codes.main_widget_cls
+            code = codes.main_widget_ref.source()
             code = modif_codes.get(mw, code)
             register_rb(LinkedRadioButton(
                 'main widget',
@@ -210,7 +210,8 @@ class CodePreviewWidget(QWidget):
             if inp in node.gui.input_widgets:
                 name = node.gui.input_widgets[inp]['name']
                 widget = node.gui.item.inputs[i].widget
-                code = codes.custom_input_widget_clss[name]
+                assert codes.input_widget_refs is not None
+                code = codes.input_widget_refs[name].source()
                 code = modif_codes.get(widget, code)
                 register_rb(LinkedRadioButton(
                     f'input {i}', CustomInputWidgetInspectable(node, widget, code)
@@ -1,6 +1,8 @@
 import types
 from typing import Union, List
 
+from ryven.main.node_hooks import set_method
+
 
 def get_method_funcs(cls_def_str: str, obj):
     """
@@ -45,8 +47,8 @@ class SrcCodeUpdater:
         try:
             funcs = get_method_funcs(new_class_src, obj)
             for name, f in funcs.items():  # override all methods
-                setattr(obj, name, types.MethodType(f, obj))
-                # types.MethodType() creates a method bound to obj, from the function f
+                # binds f to obj, below the hooks of profiling instruments, if any
+                set_method(obj, name, f)
             return None
         except Exception as e:
             return e
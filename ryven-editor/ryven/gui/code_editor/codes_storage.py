@@ -1,10 +1,15 @@
 # statically stores source codes of nodes and their widgets
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Type, Optional, Dict, no_type_check
+from typing import Type, Optional, Dict, List, Tuple, Iterator, no_type_check
+import ast
+import hashlib
 import inspect
+import linecache
 
 from ryvencore import Node
 from ryven.main.config import instance
+from ryven.main import startup_profile
 
 
 def register_node_type(n: Type[Node]):
@@ -15,46 +20,165 @@ def register_node_type(n: Type[Node]):
 
     assert instance is not None, 'Ryven instance not initialized.'
 
-    if not instance.defer_code_loading:
-        load_src_code(n)
-    else:
-        class_codes[n] = None
+    with startup_profile.phase('register_node_type'):
+        if not instance.defer_code_loading:
+            with startup_profile.phase('load_src_code'):
+                load_src_code(n)
+        else:
+            class_codes[n] = None
 
 
 @no_type_check
 def load_src_code(n: Type[Node]):
+    """
+    Records where the source code of the node type and its widgets is
+    located. The code itself is only read once it is displayed.
+    """
     # check for custom GUI and main widget
     has_gui = hasattr(n, 'GUI')
     has_mw = has_gui and n.GUI.main_widget_class is not None
-    
-    src = inspect.getsource(n)
-    mw_src = inspect.getsource(n.GUI.main_widget_class) if has_mw else None
-    inp_src = {
-        name: inspect.getsource(cls)
-        for name, cls in n.GUI.input_widget_classes.items()
-    } if has_gui else None
 
     class_codes[n] = NodeTypeCodes(
-        node_cls=src,
-        main_widget_cls=mw_src,
-        custom_input_widget_clss=inp_src,
+        node_ref=source_ref(n),
+        main_widget_ref=source_ref(n.GUI.main_widget_class) if has_mw else None,
+        input_widget_refs={
+            name: source_ref(cls)
+            for name, cls in n.GUI.input_widget_classes.items()
+        } if has_gui else None,
     )
 
     if instance.src_code_edits_enabled:
-        # store full module source code
-        mod_codes[n] = inspect.getsource(inspect.getmodule(n))
+        # full module source code, read on access
+        mod_codes.add(n)
         if has_mw:
-            mod_codes[n.GUI.main_widget_class] = \
-                inspect.getsource(inspect.getmodule(n.GUI.main_widget_class))
+            mod_codes.add(n.GUI.main_widget_class)
             for inp_cls in n.GUI.input_widget_classes.values():
-                mod_codes[inp_cls] = inspect.getsource(inspect.getmodule(inp_cls))
+                mod_codes.add(inp_cls)
+
+
+#
+# source locations
+#
+
+# {file: (lines, {class qualname: (first line, last line)})}, built from the
+# lines linecache holds for the file, so every module is read and parsed once
+_class_spans: Dict[str, Tuple[List[str], Dict[str, Tuple[int, int]]]] = {}
+
+
+def _block_end(lines: List[str], stmt: ast.ClassDef) -> int:
+    """Last line of the class, including trailing comments inside the block (like inspect)."""
+    last = stmt.end_lineno or stmt.lineno
+    i = last
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if stripped.startswith('#') and len(line) - len(line.lstrip()) > stmt.col_offset:
+            last = i + 1
+        elif stripped:
+            break
+        i += 1
+    return last
+
+
+def _index_classes(file: str) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+    lines = linecache.getlines(file)
+    cached = _class_spans.get(file)
+    if cached is not None and cached[0] is lines:
+        return cached
+
+    spans: Dict[str, Tuple[int, int]] = {}
+
+    def visit(body, prefix):
+        for stmt in body:
+            if isinstance(stmt, ast.ClassDef):
+                qualname = prefix + stmt.name
+                first = min([stmt.lineno] + [d.lineno for d in stmt.decorator_list])
+                spans.setdefault(qualname, (first, _block_end(lines, stmt)))
+                visit(stmt.body, qualname + '.')
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # e.g. widget classes created by factory functions
+                visit(stmt.body, f'{prefix}{stmt.name}.<locals>.')
+            else:
+                # e.g. classes defined under `if in_gui_mode():`
+                for field in ('body', 'orelse', 'finalbody', 'handlers'):
+                    visit(getattr(stmt, field, []), prefix)
+
+    try:
+        visit(ast.parse(''.join(lines)).body, '')
+    except (SyntaxError, ValueError):
+        pass
+    _class_spans[file] = (lines, spans)
+    return lines, spans
+
+
+def _digest(lines: List[str]) -> str:
+    return hashlib.sha1(''.join(lines).encode()).hexdigest()
+
+
+@dataclass
+class SourceRef:
+    """
+    Location of the source code of a class: file, line span (1-based,
+    inclusive) and a hash of the content at registration time.
+    """
+    file: str
+    qualname: str
+    first_line: int
+    last_line: int
+    digest: str
+    # only set for classes whose source cannot be located by line span
+    text: Optional[str] = None
+
+    def source(self) -> str:
+        if self.text is not None:
+            return self.text
+        linecache.checkcache(self.file)
+        lines, spans = _index_classes(self.file)
+        code_lines = lines[self.first_line - 1:self.last_line]
+        if _digest(code_lines) != self.digest and self.qualname in spans:
+            # the file changed since the class was loaded, the class may have moved
+            first, last = spans[self.qualname]
+            code_lines = lines[first - 1:last]
+            if _digest(code_lines) != self.digest:
+                print(f'source of {self.qualname} changed on disk since it was loaded')
+        return ''.join(code_lines)
+
+
+def source_ref(cls: type) -> SourceRef:
+    try:
+        file = inspect.getsourcefile(cls)
+    except TypeError:
+        file = None
+    if file is not None:
+        lines, spans = _index_classes(file)
+        if cls.__qualname__ in spans:
+            first, last = spans[cls.__qualname__]
+            return SourceRef(file, cls.__qualname__, first, last, _digest(lines[first - 1:last]))
+
+    # dynamically created or nested in a function, fall back to inspect
+    text = inspect.getsource(cls)
+    return SourceRef(file or '', cls.__qualname__, 0, 0, _digest([text]), text=text)
 
 
 @dataclass
 class NodeTypeCodes:
-    node_cls: str
-    main_widget_cls: Optional[str]
-    custom_input_widget_clss: Dict[str, str]
+    node_ref: SourceRef
+    main_widget_ref: Optional[SourceRef]
+    input_widget_refs: Optional[Dict[str, SourceRef]]
+
+    @property
+    def node_cls(self) -> str:
+        return self.node_ref.source()
+
+    @property
+    def main_widget_cls(self) -> Optional[str]:
+        return self.main_widget_ref.source() if self.main_widget_ref is not None else None
+
+    @property
+    def custom_input_widget_clss(self) -> Optional[Dict[str, str]]:
+        if self.input_widget_refs is None:
+            return None
+        return {name: ref.source() for name, ref in self.input_widget_refs.items()}
 
 
 class Inspectable:
@@ -94,8 +218,31 @@ class_codes: Dict[Type[Node], Optional[NodeTypeCodes]] = {}
 #
 
 
+class ModuleCodes(Mapping):
+    """
+    Maps node- or widget classes to their full module source code. Only
+    the module file is stored per class; the code is read (through
+    linecache, once per module) on access.
+    """
+
+    def __init__(self):
+        self._files: Dict[Type, str] = {}
+
+    def add(self, cls: Type):
+        self._files[cls] = inspect.getsourcefile(cls) or ''
+
+    def __getitem__(self, cls: Type) -> str:
+        return ''.join(linecache.getlines(self._files[cls]))
+
+    def __iter__(self) -> Iterator[Type]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
 # maps node- or widget classes to their full module source code
-mod_codes: Dict[Type, str] = {}
+mod_codes = ModuleCodes()
 
 # maps node- or widget objects to their modified source code
 modif_codes: Dict[object, str] = {}
@@ -9,9 +9,10 @@ from qtpy.QtWidgets import (
     QTabWidget,
     QDockWidget,
     QUndoView,
-    QAction
+    QAction,
+    QActionGroup,
 )
-from qtpy.QtCore import Qt, QByteArray
+from qtpy.QtCore import Qt, QByteArray, QTimer
 
 import ryvencore_qt.src.widgets as GUI
 from ryvencore.RC import FlowAlg
@@ -20,6 +21,7 @@ from ryvencore import Flow
 from ryven.gui.code_editor.CodePreviewWidget import CodePreviewWidget
 from ryven.gui.uic.ui_flow_window import Ui_FlowWindow
 from ryvencore_qt.src.flows.FlowView import FlowView
+from ryvencore_qt.src.flows.FlowViewHeatmap import FlowViewHeatmap
 from ryvencore_qt.src.flows.nodes.NodeInspector import InspectorView
 from typing import List
 
@@ -31,10 +33,14 @@ class FlowUI(QMainWindow):
         FlowAlg.EXEC: 'exec-flow',
     }
 
+    # interval of the heatmap overlay's refresh from the execution tracer
+    heatmap_refresh_ms = 500
+
     def __init__(self, main_window, flow: Flow, flow_view: FlowView):
         super().__init__(main_window)
 
         self.setWindowFlag(Qt.Widget)
+        self.main_window = main_window
         self.flow: Flow = flow
         self.flow_view: FlowView = flow_view
         # UI
@@ -58,6 +64,26 @@ class FlowUI(QMainWindow):
         for w in all_dock_widgets:
             windows_menu.addAction(w.toggleViewAction())
 
+        # execution heatmap overlay
+        self.heatmap = FlowViewHeatmap()
+        self._heatmap_records = -1
+        self.heatmap_timer = QTimer(self)
+        self.heatmap_timer.setInterval(self.heatmap_refresh_ms)
+        self.heatmap_timer.timeout.connect(self.refresh_heatmap)
+        heatmap_menu = flow_view.menu().addMenu('Heatmap')
+        heatmap_action_group = QActionGroup(self)
+        for title, heatmap_mode in (
+            ('Off', None),
+            ('Cumulative Time', FlowViewHeatmap.CUMULATIVE),
+            ('Last Time', FlowViewHeatmap.LAST),
+        ):
+            action = QAction(title, self)
+            action.setCheckable(True)
+            action.setChecked(heatmap_mode is None)
+            action.triggered.connect(lambda _, m=heatmap_mode: self.set_heatmap_mode(m))
+            heatmap_action_group.addAction(action)
+            heatmap_menu.addAction(action)
+
         # set tabs to be on top
         self.setTabPosition(Qt.AllDockWidgetAreas, QTabWidget.North)
         # tabify all right docks
@@ -101,6 +127,8 @@ class FlowUI(QMainWindow):
         # inspector widget
         self.inspector_widget = InspectorView(self.flow_view)
         self.ui.inspector_dock.setWidget(self.inspector_widget)
+        if main_window.memory_accountant.running:
+            self.inspector_widget.set_info_provider(main_window.memory_accountant.node_info_html)
         
         #undo history widget
         self.undo_widget = QUndoView(stack=self.flow_view._undo_stack)  # type: ignore
@@ -131,6 +159,30 @@ class FlowUI(QMainWindow):
         """Disconnects the flow ui from the design or main application signals"""
         self.flow_view.design.performance_mode_changed.disconnect(self.set_performance_mode)
         self.flow_view._undo_stack.clear()
+        self.heatmap_timer.stop()
+
+    def set_heatmap_mode(self, mode):
+        """Shows the heatmap overlay with the times of the execution tracer,
+        which is started if necessary. mode None hides the overlay."""
+        if mode is None:
+            self.heatmap_timer.stop()
+            self.flow_view.set_heatmap(None)
+            return
+
+        if not self.main_window.execution_tracer.running:
+            self.main_window.ac_trace_execution.setChecked(True)
+        self.heatmap.set_mode(mode)
+        self._heatmap_records = -1
+        self.refresh_heatmap()
+        self.heatmap_timer.start()
+
+    def refresh_heatmap(self):
+        tracer = self.main_window.execution_tracer
+        if tracer.num_records == self._heatmap_records:
+            return
+        self._heatmap_records = tracer.num_records
+        self.heatmap.set_data(*tracer.flow_stats(self.flow))
+        self.flow_view.set_heatmap(self.heatmap)
 
     def set_performance_mode(self, mode: str):
         if mode == 'fast':
@@ -7,7 +7,7 @@ from ryven.gui.code_editor.CodeEditorWidget import CodeEditorWidget
 
 from qtpy.QtWidgets import QWidget, QLineEdit, QGridLayout, QPlainTextEdit, QLabel, QPushButton, QGroupBox, \
     QVBoxLayout, QHBoxLayout
-from qtpy.QtCore import Signal, QEvent, Qt
+from qtpy.QtCore import Signal, QEvent, Qt, QThread
 from qtpy.QtGui import QTextCharFormat, QBrush, QColor, QFont, QFontMetrics
 
 
@@ -23,6 +23,9 @@ class MainConsole(QWidget):
 
     instance = None
 
+    # output written from other threads, e.g. by nodes running in parallel
+    output_written = Signal(str, object)
+
     def __init__(
             self,
             window_theme,
@@ -36,6 +39,7 @@ class MainConsole(QWidget):
         self.window_theme = window_theme
 
         self.init_ui(history, blockcount)
+        self.output_written.connect(self.writeoutput)
 
 
     def init_ui(self, history, blockcount):
@@ -172,6 +176,9 @@ class MainConsole(QWidget):
 
     def writeoutput(self, line: str, fmt: Optional[QTextCharFormat] = None) -> None:
         """prints to outdisplay"""
+        if QThread.currentThread() != self.thread():
+            self.output_written.emit(line, fmt)
+            return
         if fmt is not None:
             self.out_display.setCurrentCharFormat(fmt)
         self.out_display.appendPlainText(line.rstrip())
@@ -1,8 +1,11 @@
-from typing import Set, Dict, List, Optional, Type, Union
+from typing import Set, Dict, List, Optional, Tuple, Type, Union
 
+import re
 import sys
 import os
 import os.path
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from qtpy.QtGui import QIcon, QKeySequence
 from qtpy.QtWidgets import (
@@ -17,17 +20,33 @@ from qtpy.QtWidgets import (
     QDockWidget,
 )
 from ryvencore_qt import NodeGUI
-from qtpy.QtCore import Qt, QByteArray, QFileSystemWatcher
+from qtpy.QtCore import Qt, QByteArray, QTimer
 
 from ryven.gui.main_console import MainConsole
 from ryven.gui.flow_ui import FlowUI
+from ryven.gui.autosaver import Autosaver, autosave_dir
+from ryven.gui.package_watcher import PackageWatcher
 from ryven.main.config import Config
-from ryven.main.packages.nodes_package import NodesPackage, reload_nodes_package
+from ryven.main.packages.nodes_package import NodesPackage, reload_nodes_package, load_package_guis
+from ryven.main.packages.manifest import load_manifest, placeholder_node_types, is_placeholder
+from ryven.main.packages.preimport import preimport_dependencies
+from ryven.main.parallel_execution import enable_parallel_execution
+from ryven.main.execution_trace import ExecutionTracer
+from ryven.main.sampling_profiler import SamplingProfiler
+from ryven.main.memory_accounting import MemoryAccountant
+from ryven.main.project_archive import ARCHIVE_SUFFIX, write_archive
+from ryven.main.payload_store import externalize_payloads, remove_unreferenced_payloads
+from ryven.main.autosave import recover
+from ryven.main.lazy_flows import LazyFlows
+from ryven.main.project_summary import ProjectSummary, dump_project
+from ryven.main import startup_profile
 from ryven.gui.uic.ui_main_window import Ui_MainWindow
 from ryven.main.utils import (
     abs_path_from_package_dir,
     abs_path_from_ryven_dir,
     ryven_version,
+    stop_and_report,
+    write_atomic,
 )
 from ryven import import_nodes_package
 from ryven.gui.dialogs import GetTextDialog, ChooseFlowDialog
@@ -37,6 +56,11 @@ import ryvencore_qt as rc
 import ryvencore_qt.src.widgets as rc_GUI
 
 from ryvencore import InfoMsgs, Flow, Session as CoreSession
+from ryvencore.utils import node_from_identifier
+
+
+# number of threads importing package dependencies with --background-import
+PREIMPORT_WORKERS = 4
 
 
 class MainWindow(QMainWindow):
@@ -51,6 +75,11 @@ class MainWindow(QMainWindow):
     ):
         super().__init__(parent)
 
+        self._startup_time = time.perf_counter()
+        self._shown_time: Optional[float] = None
+        # steps after which the startup is complete (see --profile-startup)
+        self._startup_pending: Set[str] = {'first paint', 'packages'}
+
         self.config = config
         self.session_gui: rc.SessionGUI
         self.core_session: CoreSession
@@ -59,12 +88,37 @@ class MainWindow(QMainWindow):
         self.flow_UIs: Dict[Flow, FlowUI] = {}
         self.flow_ui_template: Optional[Dict[str, Union[QByteArray, Dict]]] = None
         self._project_content: Optional[Dict] = None
-        self._package_dirs: Dict[str, NodesPackage] = {}
+        # packages whose nodes are listed from their manifest but not imported yet
+        self._lazy_packages: Dict[str, NodesPackage] = {}
+        # packages waiting to be registered with --background-import
+        self._pending_imports: List[Tuple[NodesPackage, bool, Future]] = []
+        self._preimport_pool: Optional[ThreadPoolExecutor] = None
 
         # Init Session GUI
 
         self.session_gui = rc.SessionGUI(self)
         self.core_session = self.session_gui.core_session
+        if self.config.parallel_workers > 0:
+            enable_parallel_execution(self.core_session, self.config.parallel_workers)
+        self.execution_tracer = ExecutionTracer(self.core_session)
+        if self.config.trace_execution:
+            self.execution_tracer.start()
+        self.flow_profiler: Optional[SamplingProfiler] = None
+        self.memory_accountant = MemoryAccountant(self.core_session)
+        if self.config.memory_accounting:
+            self.memory_accountant.start()
+        # refreshes the memory statistics in the node inspector
+        self.memory_info_timer = QTimer(self)
+        self.memory_info_timer.setInterval(1000)
+        self.memory_info_timer.timeout.connect(self.refresh_memory_info)
+        if self.memory_accountant.running:
+            self.memory_info_timer.start()
+        # started once the project is loaded
+        self.autosaver: Optional[Autosaver] = None
+        # flows whose contents are loaded once their tab is shown
+        self.lazy_flows = LazyFlows(self.core_session)
+        self.session_gui.node_class_resolver = self._resolve_node_class
+        self.session_gui.node_gui_loader = self._load_node_guis
         if self.config.verbose:
             self.core_session._info_messenger().enable(traceback=True)
         else:
@@ -90,6 +144,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(self.config.window_title)
         self.setWindowIcon(QIcon(abs_path_from_package_dir('resources/pics/Ryven_icon.png')))
         self.ui.flows_tab_widget.removeTab(0)  # remove placeholder tab
+        self.ui.flows_tab_widget.currentChanged.connect(self._flow_tab_changed)
 
         # Configure window-wide Shortcuts
 
@@ -126,39 +181,46 @@ The editor console can still be used for commands.
 
         # Setup ryvencore Session and load project
 
-        self.nodes_watcher = QFileSystemWatcher(self)
-        self.nodes_watcher.fileChanged.connect(self._on_nodes_file_changed)
+        self.package_watcher: PackageWatcher = PackageWatcher(self)
+        self.package_watcher.package_changed.connect(self._on_package_files_changed)
 
         self.import_nodes(path=abs_path_from_package_dir('main/packages/built_in/'))
 
         # Requested packages take precedence over other packages
-        print('importing requested packages...')
         if requested_packages is None:
             requested_packages = set()
-        self.import_packages(requested_packages)
         if project_content is not None:
             assert required_packages is not None, 'required_packages must be provided when loading a project'
             self._project_content = project_content
-            print('importing required packages...')
-            self.import_packages(required_packages)
-            print('loading project...')
-            self.core_session.load(project_content)
-            # load the flow_ui_template if it exists
-            self.set_flow_ui_template(project_content.get('flow_ui_template'))
-            # After everything has loaded, load previous UI geometry and state
-            self.load_qt_window(project_content)
-            for flow_ui in self.flow_UIs.values():
-                self.load_flow_ui(flow_ui)
-            print('done')
         else:
             self.core_session.create_flow(title='hello world')
 
+        if self.config.background_import:
+            self.import_packages_in_background(requested_packages, required_packages or set())
+        else:
+            print('importing requested packages...')
+            self.import_packages(requested_packages, lazy=self.config.lazy_packages)
+            if project_content is not None:
+                print('importing required packages...')
+                self.import_packages(required_packages)
+            self._packages_imported()
+
         self.resize(1500, 800)  # FIXME: this renders the --geometry argument useless, no?
         # self.showMaximized()
     
     def closeEvent(self, event):
         for flow_ui in self.flow_UIs.values():
             flow_ui.unload()
+        # the console is gone, reports belong to the terminal
+        if self.execution_tracer.running:
+            self.stop_execution_trace(out=sys.__stdout__ or sys.stdout)
+        if self.flow_profiler is not None:
+            self.stop_flow_profiler(out=sys.__stdout__ or sys.stdout)
+        if self.memory_accountant.running:
+            self.stop_memory_accounting(out=sys.__stdout__ or sys.stdout)
+        if self.autosaver is not None:
+            self.autosaver.stop()
+            self.autosaver = None
         
     def print_info(self):
         print('''
@@ -327,6 +389,26 @@ CONTROLS
 
         self.ui.menuView.addMenu(animations_menu)
 
+        # execution tracing
+        self.ac_trace_execution = QAction('Trace Execution', self)
+        self.ac_trace_execution.setCheckable(True)
+        self.ac_trace_execution.setChecked(self.execution_tracer.running)
+        self.ac_trace_execution.toggled.connect(self.on_trace_execution_toggled)
+        self.ui.menuDebugging.addAction(self.ac_trace_execution)
+
+        # sampling profiler
+        self.ac_profile_flow = QAction('Profile Current Flow', self)
+        self.ac_profile_flow.setCheckable(True)
+        self.ac_profile_flow.toggled.connect(self.on_profile_flow_toggled)
+        self.ui.menuDebugging.addAction(self.ac_profile_flow)
+
+        # memory accounting
+        self.ac_memory_accounting = QAction('Memory Accounting', self)
+        self.ac_memory_accounting.setCheckable(True)
+        self.ac_memory_accounting.setChecked(self.memory_accountant.running)
+        self.ac_memory_accounting.toggled.connect(self.on_memory_accounting_toggled)
+        self.ui.menuDebugging.addAction(self.ac_memory_accounting)
+
     def load_stylesheet(self, ss):
         ss_content = ''
         try:
@@ -339,9 +421,17 @@ CONTROLS
 
     # necessary for proper flow view loading
     def showEvent(self, event):
+        if self._shown_time is None:
+            self._shown_time = time.perf_counter()
         for flow_ui in self.flow_UIs.values():
             flow_ui.flow_view.reload()
         
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if 'first paint' in self._startup_pending:
+            startup_profile.instant('first paint')
+            self._startup_step_done('first paint')
+
     # events
     
     def on_performance_mode_value_changed(self, mode: str):
@@ -394,6 +484,66 @@ CONTROLS
     def on_disable_info_msgs_triggered(self):
         InfoMsgs.disable()
 
+    def on_trace_execution_toggled(self, enabled: bool):
+        if enabled:
+            self.execution_tracer.clear()
+            self.execution_tracer.start()
+        else:
+            self.stop_execution_trace()
+
+    def stop_execution_trace(self, out=None):
+        """Stops tracing, prints the nodes which took the most time and
+        writes the trace file."""
+        path = self.config.trace_execution or abs_path_from_ryven_dir('execution_trace.json')
+        stop_and_report(self.execution_tracer, path, 'execution trace', out)
+
+    def on_profile_flow_toggled(self, enabled: bool):
+        if enabled:
+            flow_ui = self.ui.flows_tab_widget.currentWidget()
+            if flow_ui is None:
+                self.ac_profile_flow.setChecked(False)
+                return
+            self.flow_profiler = SamplingProfiler(self.core_session, [flow_ui.flow])
+            self.flow_profiler.start()
+            print(f'profiling flow {flow_ui.flow.title}')
+        elif self.flow_profiler is not None:
+            self.stop_flow_profiler()
+
+    def stop_flow_profiler(self, out=None):
+        """Stops the sampling profiler, prints the per-node summary and writes
+        the collapsed stacks for a flamegraph."""
+        profiler = self.flow_profiler
+        self.flow_profiler = None
+        flow_title = next(iter(profiler.flows)).title
+        path = abs_path_from_ryven_dir(
+            f'profiles/{re.sub(r"[^0-9a-zA-Z_-]+", "_", flow_title)}_{time.strftime("%Y%m%d-%H%M%S")}.collapsed'
+        )
+        stop_and_report(profiler, path, 'flamegraph stacks', out)
+
+    def on_memory_accounting_toggled(self, enabled: bool):
+        if enabled:
+            self.memory_accountant.clear()
+            self.memory_accountant.start()
+            for flow_ui in self.flow_UIs.values():
+                flow_ui.inspector_widget.set_info_provider(self.memory_accountant.node_info_html)
+            self.memory_info_timer.start()
+        else:
+            self.stop_memory_accounting()
+
+    def refresh_memory_info(self):
+        flow_ui = self.ui.flows_tab_widget.currentWidget()
+        if flow_ui is not None and flow_ui.inspector_widget.isVisible():
+            flow_ui.inspector_widget.refresh_info()
+
+    def stop_memory_accounting(self, out=None):
+        """Stops memory accounting, prints the nodes retaining the most
+        memory and writes the report."""
+        self.memory_info_timer.stop()
+        for flow_ui in self.flow_UIs.values():
+            flow_ui.inspector_widget.set_info_provider(None)
+        path = self.config.memory_accounting or abs_path_from_ryven_dir('memory_report.json')
+        stop_and_report(self.memory_accountant, path, 'memory report', out)
+
     def on_save_scene_pic_viewport_triggered(self):
         """Saves a picture of the currently visible viewport."""
         if len(self.core_session.flows) == 0:
@@ -417,17 +567,18 @@ CONTROLS
         img.save(file_path)
 
     def on_save_project_triggered(self):
-        file_name = QFileDialog.getSaveFileName(
+        file_name, file_filter = QFileDialog.getSaveFileName(
             self,
             'select location and give file name',
             abs_path_from_ryven_dir('saves'),
-            'JSON(*.json)',
-        )[0]
-        if not file_name.endswith('.json'):
-            file_name += '.json'
+            f'JSON(*.json);;Ryven Archive(*{ARCHIVE_SUFFIX})',
+        )
+        if file_name == '':
+            return
+        if not file_name.endswith(('.json', ARCHIVE_SUFFIX)):
+            file_name += ARCHIVE_SUFFIX if ARCHIVE_SUFFIX in file_filter else '.json'
 
-        if file_name != '':
-            self.save_project(file_name)
+        self.save_project(file_name)
 
     def on_new_flow_triggered(self):
         new_flow_title = GetTextDialog('choose unique title', '', 'new flow title', self).get_text()
@@ -472,6 +623,8 @@ CONTROLS
         flow_view.menu().addMenu(self.flow_ui_template_menu)
         if self.flow_ui_template:
             flow_widget.load_directly(self.flow_ui_template)
+        if self.autosaver is not None:
+            self.autosaver.watch_undo_stack(flow, flow_view)
 
         self.focus_on_flow(flow)
 
@@ -491,25 +644,56 @@ CONTROLS
     def focus_on_flow(self, flow):
         self.ui.flows_tab_widget.setCurrentWidget(self.flow_UIs[flow])
 
-    def import_packages(self, packages_list: List[NodesPackage]):
+    def _flow_tab_changed(self, index: int):
+        flow_ui = self.ui.flows_tab_widget.widget(index)
+        if flow_ui is not None:
+            self.load_pending_flow(flow_ui.flow)
+
+    def load_pending_flow(self, flow: Flow):
+        """Loads the contents of the flow if they were deferred, see --lazy-flows."""
+        if not self.lazy_flows.is_pending(flow):
+            return
+        t = time.perf_counter()
+        self.lazy_flows.load_flow(flow)
+        print(f'loaded flow "{flow.title}" in {time.perf_counter() - t:.3f} s')
+
+    def import_packages(self, packages_list: List[NodesPackage], lazy: bool = False):
         for p in packages_list:
-            self.import_nodes(p)
+            self.import_nodes(p, lazy=lazy)
 
-    def import_nodes(self, package: Optional[NodesPackage] = None, path: Optional[str] = None):
+    def import_nodes(
+        self,
+        package: Optional[NodesPackage] = None,
+        path: Optional[str] = None,
+        lazy: bool = False,
+    ):
         if package is not None:
             p = package
         else:
             assert path is not None, 'either package or path must be provided'
             p = NodesPackage(path)
 
+        if p.name in self._lazy_packages:
+            if not lazy:
+                self._import_lazy_package(self._lazy_packages[p.name])
+            return
+
         if p in self.node_packages.values():
             # never import package twice!
             # different packages with same name are forbidden
             print('package with this name already exists')
             return
 
+        if lazy:
+            manifest = load_manifest(p)
+            if manifest is not None:
+                self._lazy_packages[p.name] = p
+                self._register_nodes_for_package(p, placeholder_node_types(p, manifest), [])
+                return
+            # no manifest available, import the package right away
+
         try:
-            nodes, data_types = import_nodes_package(p)
+            nodes, data_types = import_nodes_package(p, defer_guis=True)
         except ModuleNotFoundError as e:
             msg_box = QMessageBox(
                 QMessageBox.Warning,
@@ -524,6 +708,154 @@ CONTROLS
         self._register_nodes_for_package(p, nodes, data_types)
         self._watch_package_files(p)
 
+    def import_packages_in_background(self, requested: Set[NodesPackage], required: Set[NodesPackage]):
+        """
+        Imports the dependencies of the packages on background threads and
+        registers each package on the GUI thread once they are ready. The
+        project (if any) is loaded after the last package.
+        """
+        print('importing packages in the background...')
+        lazy = self.config.lazy_packages
+        self._preimport_pool = ThreadPoolExecutor(max_workers=PREIMPORT_WORKERS)
+        # requested packages take precedence, so they are queued first;
+        # lazy packages only need their manifest
+        for p, p_lazy in [*((p, lazy) for p in requested), *((p, False) for p in required)]:
+            job = load_manifest if p_lazy else preimport_dependencies
+            self._pending_imports.append((p, p_lazy, self._preimport_pool.submit(job, p)))
+
+        self._import_timer = QTimer(self)
+        self._import_timer.setInterval(10)
+        self._import_timer.timeout.connect(self._import_ready_package)
+        self._import_timer.start()
+
+    def _import_ready_package(self):
+        """Registers one package whose dependencies finished importing."""
+        for i, (p, lazy, future) in enumerate(self._pending_imports):
+            if not future.done():
+                continue
+            if any(q.name == p.name for q, _, _ in self._pending_imports[:i]):
+                continue  # a package with the same name has precedence
+            del self._pending_imports[i]
+            self.import_nodes(p, lazy=lazy)
+            break
+
+        if not self._pending_imports:
+            self._import_timer.stop()
+            self._preimport_pool.shutdown(wait=False)
+            self._preimport_pool = None
+            self._packages_imported()
+
+    def _packages_imported(self):
+        """Loads the project after all packages are registered."""
+        project_content = self._project_content
+        if project_content is not None:
+            self._import_lazy_packages_for_project(project_content)
+            # nodes may access their gui classes already when they are created
+            for flow_data in project_content.get('flows', {}).values():
+                self.session_gui.load_node_guis_for_data(flow_data.get('nodes', []))
+            print('loading project...')
+            summary = ProjectSummary('loaded project')
+            with startup_profile.phase('project load'), summary.phase('flows'):
+                if self.config.lazy_flows:
+                    self.lazy_flows.load_project(project_content)
+                    # only the flow shown
+                    flow_ui = self.ui.flows_tab_widget.currentWidget()
+                    if flow_ui is not None:
+                        self.lazy_flows.load_flow(flow_ui.flow)
+                else:
+                    self.core_session.load(project_content)
+            with summary.phase('window'):
+                # load the flow_ui_template if it exists
+                self.set_flow_ui_template(project_content.get('flow_ui_template'))
+                # After everything has loaded, load previous UI geometry and state
+                self.load_qt_window(project_content)
+                for flow_ui in self.flow_UIs.values():
+                    self.load_flow_ui(flow_ui)
+            summary.print(project_content)
+
+        if self.config.autosave is not None:
+            self.start_autosave()
+
+        # time-to-interactive, from the creation of the window
+        now = time.perf_counter()
+        shown = (
+            f', window shown after {self._shown_time - self._startup_time:.2f} s'
+            if self._shown_time is not None else ''
+        )
+        print(f'startup: interactive after {now - self._startup_time:.2f} s{shown}')
+        self._startup_step_done('packages')
+
+    def start_autosave(self):
+        """Starts journaling the project's changes. Unsaved changes of the
+        previous session are written to a recovered project file first."""
+        import json
+
+        directory = autosave_dir(self.config.project)
+        try:
+            recovered = recover(directory)
+        except (OSError, ValueError) as e:
+            print(f'autosave: could not recover the previous session: {e}')
+            recovered = None
+        if recovered is not None:
+            path = os.path.join(directory, f'recovered_{time.strftime("%Y%m%d-%H%M%S")}.json')
+            write_atomic(path, json.dumps(recovered, indent=4))
+            print(f'autosave: unsaved changes of the previous session were recovered to {path}')
+
+        self.autosaver = Autosaver(self, directory, self.config.autosave)
+        self.autosaver.start()
+
+    def _startup_step_done(self, step: str):
+        self._startup_pending.discard(step)
+        if not self._startup_pending:
+            startup_profile.finish()
+
+    def _import_lazy_package(self, package: NodesPackage) -> bool:
+        """Replaces the placeholder nodes of a lazily listed package by the real ones."""
+        print(f'importing package {package.name}...')
+        try:
+            nodes, data_types = import_nodes_package(package, defer_guis=True)
+        except Exception as e:
+            QMessageBox.warning(self, 'Could not import nodes package', f'{package.name}: {e}')
+            return False
+
+        del self._lazy_packages[package.name]
+        for node_cls in [n for n, pkg in list(self.node_packages.items()) if pkg == package]:
+            self.core_session.unregister_node(node_cls)
+            del self.node_packages[node_cls]
+
+        self._register_nodes_for_package(package, nodes, data_types)
+        self._watch_package_files(package)
+        return True
+
+    def _import_lazy_packages_for_project(self, project_content: Dict) -> None:
+        """Imports lazily listed packages whose nodes are used in the project."""
+        for flow_data in project_content.get('flows', {}).values():
+            for node_data in flow_data.get('nodes', []):
+                try:
+                    node_class = node_from_identifier(node_data['identifier'], list(self.core_session.nodes))
+                except Exception:
+                    continue  # reported by the session when loading
+                if is_placeholder(node_class) and node_class.lazy_package.name in self._lazy_packages:
+                    self._import_lazy_package(node_class.lazy_package)
+
+    def _resolve_node_class(self, node_class: Type[rc.Node]) -> Optional[Type[rc.Node]]:
+        """Imports the package of a placeholder node class on first placement."""
+        if not is_placeholder(node_class):
+            return node_class
+        package: NodesPackage = getattr(node_class, 'lazy_package')
+        if package.name in self._lazy_packages and not self._import_lazy_package(package):
+            return None
+        try:
+            resolved: Type[rc.Node] = node_from_identifier(node_class.identifier, list(self.core_session.nodes))
+        except Exception as e:
+            print(e)
+            return None
+        return resolved
+
+    def _load_node_guis(self, node_class: Type[rc.Node]):
+        """Imports the deferred gui modules of the node's package before its first node is shown."""
+        load_package_guis(node_class)
+
     def _register_nodes_for_package(
         self,
         package: NodesPackage,
@@ -536,26 +868,13 @@ CONTROLS
         for n in nodes:
             self.node_packages[n] = package
 
-        self._package_dirs[package.directory] = package
-
         self.nodes_list_widget.update_list(self.core_session.nodes)
         self.nodes_list_widget.make_pack_hier()
 
     def _watch_package_files(self, package: NodesPackage) -> None:
-        nodes_path = package.file_path
-        gui_path = os.path.join(package.directory, 'gui.py')
-        init_path = os.path.join(package.directory, '__init__.py')
-
-        for path in (nodes_path, gui_path, init_path):
-            if os.path.exists(path) and path not in self.nodes_watcher.files():
-                self.nodes_watcher.addPath(path)
-
-    def _on_nodes_file_changed(self, path: str) -> None:
-        package_dir = os.path.dirname(path)
-        package = self._package_dirs.get(package_dir)
-        if package is None:
-            return
+        self.package_watcher.watch(package)
 
+    def _on_package_files_changed(self, package: NodesPackage) -> None:
         # Remove existing node classes for this package
         nodes_to_remove = [n for n, pkg in list(self.node_packages.items()) if pkg == package]
         for node_cls in nodes_to_remove:
@@ -569,11 +888,9 @@ CONTROLS
             nodes, data_types = reload_nodes_package(package)
         except Exception as e:
             print(f'Failed to reload package {package.name}: {e}')
-            self._watch_package_files(package)
             return
 
         self._register_nodes_for_package(package, nodes, data_types)
-        self._watch_package_files(package)
 
     # should be dict[str, str] | dict[str, QByteArray | dict] | None in 3.9+
     def set_flow_ui_template(self, template):
@@ -612,34 +929,36 @@ CONTROLS
             # print(f'Could not load previous UI state for flow with previous id: {flow_ui.flow.prev_global_id}')
             pass
 
-    def save_project(self, file_name: str) -> None:
-        import json
+    def required_packages_data(self) -> List[Dict]:
+        node_classes = {node.__class__ for node in self.core_session.all_node_objects()}
+        # nodes of flows which were not loaded yet
+        for identifier in set(self.lazy_flows.pending_node_identifiers()):
+            try:
+                node_classes.add(node_from_identifier(identifier, list(self.core_session.nodes)))
+            except Exception:
+                continue
 
-        file = None
-        try:
-            if os.path.exists(file_name):
-                os.remove(file_name)
-            file = open(file_name, 'w')
-        except FileNotFoundError:
-            InfoMsgs.write('couldn\'t open file')
-            return
+        required_packages = set()
+        for node_class in node_classes:
+            if (
+                node_class not in self.node_packages.keys()
+                or self.node_packages[node_class] is None
+                or self.node_packages[node_class].name == 'built_in'
+            ):
+                continue
+            required_packages.add(self.node_packages[node_class])
+        return [p.config_data() for p in required_packages]
 
+    def project_data(self) -> Dict:
+        """Serializes the whole project, including the window and flow UI
+        states."""
         general_project_info_dict = {
             'type': 'Ryven project file',
             'ryven version': str(ryven_version()),
         }
 
         flows_data = self.core_session.serialize()
-
-        required_packages = set()
-        for node in self.core_session.all_node_objects():
-            if (
-                node.__class__ not in self.node_packages.keys()
-                or self.node_packages[node.__class__] is None
-                or self.node_packages[node.__class__].name == 'built_in'
-            ):
-                continue
-            required_packages.add(self.node_packages[node.__class__])
+        self.lazy_flows.complete_project(flows_data)
 
         # Serialization of the main window
         geometry = self.saveGeometry().toHex().data().decode()
@@ -653,7 +972,7 @@ CONTROLS
 
         whole_project_dict = {
             'general info': general_project_info_dict,
-            'required packages': [p.config_data() for p in required_packages],
+            'required packages': self.required_packages_data(),
             **flows_data,
             'geometry': geometry,
             'state': state,
@@ -668,8 +987,49 @@ CONTROLS
                 'view': self.flow_ui_template['view']
             }
 
-        data = json.dumps(whole_project_dict, indent=4)
-        InfoMsgs.write(data)
+        return whole_project_dict
+
+    def save_project(self, file_name: str) -> None:
+        """Saves the project as JSON file, or as archive if the file name
+        ends with .ryvenz (see ryven.main.project_archive). The previous file
+        is only replaced once the new one is written completely."""
+        import json
+
+        summary = ProjectSummary('saved', file_name)
+        with summary.phase('serialize'):
+            whole_project_dict = self.project_data()
+
+        payload_files = None
+        if self.config.external_payloads is not None:
+            try:
+                with summary.phase('payloads'):
+                    whole_project_dict, payload_files, written = externalize_payloads(
+                        whole_project_dict, file_name, self.config.external_payloads * 1024)
+            except OSError as e:
+                InfoMsgs.write_err(f'couldn\'t write payloads, saving them inline: {e}')
+
+        try:
+            if file_name.endswith(ARCHIVE_SUFFIX):
+                with summary.phase('write'):
+                    write_archive(file_name, whole_project_dict)
+            else:
+                with summary.phase('encode'):
+                    data = json.dumps(whole_project_dict, indent=4)
+                if self.config.dump_project is not None:
+                    dump_project(data, self.config.dump_project * 1024)
+                with summary.phase('write'):
+                    write_atomic(file_name, data)
+        except OSError as e:
+            InfoMsgs.write(f'couldn\'t write file: {e}')
+            return
+
+        if payload_files is not None:
+            removed = remove_unreferenced_payloads(file_name, payload_files)
+            if payload_files or removed:
+                print(f'payloads: {written} written, {len(payload_files) - written} unchanged, {removed} removed')
+
+        summary.file_size = os.path.getsize(file_name)
+        summary.print(whole_project_dict)
 
-        file.write(data)
-        file.close()
+        if self.autosaver is not None:
+            self.autosaver.saved(whole_project_dict)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+from typing import Dict, Optional
+
+from qtpy.QtCore import QObject, QTimer, Signal, QFileSystemWatcher
+
+from ryven.main.packages.nodes_package import NodesPackage
+
+# the files of a package which trigger a reload when they change
+WATCHED_FILES = ('nodes.py', 'gui.py', '__init__.py')
+# changes of one package within this interval are merged into one reload
+DEBOUNCE_MS = 300
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class PackageWatcher(QObject):
+    """
+    Watches the files of nodes packages and emits `package_changed` once per
+    batch of changes to a package.
+
+    Events are debounced per package, so saving several files (or an editor
+    saving through a temporary file) causes only one reload. Changes that
+    don't modify the content of any file are ignored. Package directories are
+    watched as well, to re-arm watches on files that were replaced by a rename
+    (which QFileSystemWatcher stops watching).
+    """
+
+    package_changed = Signal(object)  # NodesPackage
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+        self._watcher.directoryChanged.connect(self._on_path_changed)
+
+        self._packages: Dict[str, NodesPackage] = {}    # {directory: package}
+        self._hashes: Dict[str, Optional[str]] = {}     # {file: content hash}
+        self._timers: Dict[str, QTimer] = {}            # {directory: debounce timer}
+
+    def watch(self, package: NodesPackage):
+        """Starts watching the package, or updates the reference state of its files."""
+        directory = os.path.normpath(package.directory)
+        self._packages[directory] = package
+        for path in self._files(directory):
+            self._hashes[path] = _file_hash(path)
+        self._arm(directory)
+
+    def unwatch(self, package: NodesPackage):
+        directory = os.path.normpath(package.directory)
+        if self._packages.pop(directory, None) is None:
+            return
+        paths = [p for p in [directory, *self._files(directory)] if p in self._watched()]
+        if paths:
+            self._watcher.removePaths(paths)
+        for path in self._files(directory):
+            self._hashes.pop(path, None)
+        timer = self._timers.pop(directory, None)
+        if timer is not None:
+            timer.stop()
+
+    def _files(self, directory: str):
+        return [os.path.join(directory, name) for name in WATCHED_FILES]
+
+    def _watched(self):
+        return set(self._watcher.files()) | set(self._watcher.directories())
+
+    def _arm(self, directory: str):
+        watched = self._watched()
+        for path in [directory, *self._files(directory)]:
+            if path not in watched and os.path.exists(path):
+                self._watcher.addPath(path)
+
+    def _on_path_changed(self, path: str):
+        path = os.path.normpath(path)
+        directory = path if path in self._packages else os.path.dirname(path)
+        if directory not in self._packages:
+            return
+
+        # files replaced through a rename are not watched anymore
+        self._arm(directory)
+
+        timer = self._timers.get(directory)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(DEBOUNCE_MS)
+            timer.timeout.connect(lambda d=directory: self._flush(d))
+            self._timers[directory] = timer
+        timer.start()  # restarts a running timer
+
+    def _flush(self, directory: str):
+        package = self._packages.get(directory)
+        if package is None:
+            return
+        self._arm(directory)
+
+        changed = False
+        for path in self._files(directory):
+            new_hash = _file_hash(path)
+            if new_hash != self._hashes.get(path):
+                self._hashes[path] = new_hash
+                changed = True
+
+        if changed:
+            self.package_changed.emit(package)
@@ -23,7 +23,7 @@ from qtpy.QtWidgets import (
     QStyle,
     QLineEdit,
 )
-from qtpy.QtCore import Qt, QSize
+from qtpy.QtCore import Qt, QSize, QTimer
 from qtpy.QtGui import QIcon, QPainter
 
 from ryven.main.args_parser import unparse_sys_args
@@ -34,6 +34,8 @@ from ryven.main.utils import (
     ryven_dir_path,
 )
 from ryven.main.packages.nodes_package import process_nodes_packages
+from ryven.main.project_archive import ARCHIVE_SUFFIX
+from ryven.main.packages import discovery
 from ryven.gui.styling.window_theme import apply_stylesheet
 
 
@@ -388,6 +390,29 @@ class StartupDialog(QDialog):
         )
         defer_code_cb.toggled.connect(self.on_defer_toggled)
         fbox.addRow(defer_code_label, defer_code_cb)
+
+        # Lazy package import
+        lazy_packages_label = QLabel('Lazy packages:')
+        lazy_packages_cb = QCheckBox('Import packages when their nodes are placed')
+        lazy_packages_cb.setToolTip(
+            f'''Choose whether requested packages are imported on
+            startup or listed from a cached manifest and imported
+            once one of their nodes is placed. Packages required
+            by the project are always imported.'''
+        )
+        lazy_packages_cb.toggled.connect(self.on_lazy_packages_toggled)
+        fbox.addRow(lazy_packages_label, lazy_packages_cb)
+
+        # Lazy flow loading
+        lazy_flows_label = QLabel('Lazy flows:')
+        lazy_flows_cb = QCheckBox('Load flows when their tab is shown')
+        lazy_flows_cb.setToolTip(
+            f'''Choose whether all flows of the project are loaded on
+            startup or only the one shown, and the others once
+            their tab is first shown.'''
+        )
+        lazy_flows_cb.toggled.connect(self.on_lazy_flows_toggled)
+        fbox.addRow(lazy_flows_label, lazy_flows_cb)
         
         layout.addLayout(fbox)
 
@@ -446,6 +471,12 @@ class StartupDialog(QDialog):
 
         # Set defer code loading
         defer_code_cb.setChecked(self.conf.defer_code_loading)
+
+        # Set lazy package import
+        lazy_packages_cb.setChecked(self.conf.lazy_packages)
+
+        # Set lazy flow loading
+        lazy_flows_cb.setChecked(self.conf.lazy_flows)
         
         # Set window title and icon
         self.setWindowTitle('Ryven')
@@ -453,10 +484,31 @@ class StartupDialog(QDialog):
             QIcon(abs_path_from_package_dir('resources/pics/Ryven_icon.png'))
         )
 
+        # The lists above were populated from the cached packages index;
+        # rescan the package dirs and update them if something changed
+        self.discovery_future = discovery.refresh_in_background()
+        self.discovery_timer = QTimer(self)
+        self.discovery_timer.timeout.connect(self.on_discovery_refresh_check)
+        self.discovery_timer.start(50)
+
     #
     # Call-back methods
     #
 
+    def on_discovery_refresh_check(self):
+        """Call-back method, polling the background rescan of the package dirs."""
+        if not self.discovery_future.done():
+            return
+        self.discovery_timer.stop()
+        try:
+            changed = self.discovery_future.result()
+        except Exception as e:
+            print(f'could not refresh packages index: {e}')
+            return
+        if changed:
+            self.load_project(self.conf.project)
+            self.auto_import_default_packages()
+
     # Project
 
     def on_create_project_button_clicked(self):
@@ -592,6 +644,16 @@ class StartupDialog(QDialog):
     def on_defer_toggled(self, check):
         """Call-back method, whenever the defer source code loading checkbox was toggled"""
         self.conf.defer_code_loading = check
+
+    # Lazy Package Import
+    def on_lazy_packages_toggled(self, check):
+        """Call-back method, whenever the lazy package import checkbox was toggled"""
+        self.conf.lazy_packages = check
+
+    # Lazy Flow Loading
+    def on_lazy_flows_toggled(self, check):
+        """Call-back method, whenever the lazy flow loading checkbox was toggled"""
+        self.conf.lazy_flows = check
     #
     # Helper/Working methods
     #
@@ -617,7 +679,7 @@ class StartupDialog(QDialog):
         """
         # Get the file from the user
         file_name = QFileDialog.getOpenFileName(
-            self, title, str(base_dir), 'JSON (*.json)'
+            self, title, str(base_dir), f'Ryven Project (*.json *{ARCHIVE_SUFFIX})'
         )[0]
 
         if file_name:
@@ -693,12 +755,9 @@ class StartupDialog(QDialog):
         ]
 
         # Search for missing packages under `package_dir`
-        for entry in filter(lambda e: e.is_dir(), os.scandir(packages_dir)):
-            path = pathlib.Path(entry.path)
-            if path.name in missing_packages:
-                node_path = path.joinpath('nodes.py')
-                if node_path.exists():
-                    self.conf.nodes.add(path)
+        for name, directory in discovery.packages_in(packages_dir).items():
+            if name in missing_packages:
+                self.conf.nodes.add(pathlib.Path(directory))
 
     def update_packages_lists(self):
         """Update the packages lists and buttons.
@@ -764,12 +823,13 @@ class StartupDialog(QDialog):
         
         # Define the packages to auto-import
         default_packages = ['user_nodes', 'vipp_nodes']
+        available_packages = discovery.packages_in(ryven_dir)
         
         for package_name in default_packages:
             package_path = ryven_dir / package_name
             
             # Check if the package directory exists and contains nodes.py
-            if package_path.exists() and (package_path / 'nodes.py').exists():
+            if package_name in available_packages:
                 # Check if this package is not already imported
                 package_already_imported = False
                 for existing_pkg in self.conf.nodes:
@@ -1,8 +1,10 @@
 import os
 import sys
+import time
 
 import ryven.main.packages.nodes_package
 from ryven.main import utils
+from ryven.main import startup_profile
 from ryven.main.config import Config
 from ryven.main.args_parser import process_args
 
@@ -95,48 +97,54 @@ def run(*args_,
     None|Main Window
     """
                 
+    t0 = time.perf_counter()
+
     # Process command line and method's arguments
     conf: Config = process_args(use_sysargs, *args_, **kwargs)
+    if conf.profile_startup:
+        startup_profile.start(conf.profile_startup, t0)
 
     #
     # Qt application setup
     #
 
-    # Init environment
-    check_pyside_available(conf.qt_api)
-    os.environ['RYVEN_MODE'] = 'gui'
-    os.environ['QT_API'] = conf.qt_api
-    from ryven.node_env import init_node_env
-    from ryven.gui_env import init_node_guis_env  # Qt dependency
-    init_node_env()
-    init_node_guis_env()
-
-    # Import GUI sources (must come after setting `os.environ['QT_API']`)
-    from ryven.gui.main_console import init_main_console
-    from ryven.gui.main_window import MainWindow
-    from ryven.gui.styling.window_theme import apply_stylesheet
-
-    # Init Qt application
-    if qt_app is None:
-        from qtpy.QtWidgets import QApplication
-        if conf.window_geometry:
-            # Pass '--geometry' argument to Qt
-            qt_args = [sys.argv[0], '-geometry', conf.window_geometry]
+    with startup_profile.phase('Qt init'):
+        # Init environment
+        check_pyside_available(conf.qt_api)
+        os.environ['RYVEN_MODE'] = 'gui'
+        os.environ['QT_API'] = conf.qt_api
+        from ryven.node_env import init_node_env
+        from ryven.gui_env import init_node_guis_env  # Qt dependency
+        init_node_env()
+        init_node_guis_env()
+
+        # Import GUI sources (must come after setting `os.environ['QT_API']`)
+        from ryven.gui.main_console import init_main_console
+        from ryven.gui.main_window import MainWindow
+        from ryven.gui.styling.window_theme import apply_stylesheet
+
+        # Init Qt application
+        if qt_app is None:
+            from qtpy.QtWidgets import QApplication
+            if conf.window_geometry:
+                # Pass '--geometry' argument to Qt
+                qt_args = [sys.argv[0], '-geometry', conf.window_geometry]
+            else:
+                qt_args = [sys.argv[0]]
+            app = QApplication(qt_args)
         else:
-            qt_args = [sys.argv[0]]
-        app = QApplication(qt_args)
-    else:
-        app = qt_app
+            app = qt_app
 
     # Register fonts
-    from qtpy.QtGui import QFontDatabase
-    db = QFontDatabase()
-    db.addApplicationFont(
-        utils.abs_path_from_package_dir('resources/fonts/poppins/Poppins-Medium.ttf'))
-    db.addApplicationFont(
-        utils.abs_path_from_package_dir('resources/fonts/source_code_pro/SourceCodePro-Regular.ttf'))
-    db.addApplicationFont(
-        utils.abs_path_from_package_dir('resources/fonts/asap/Asap-Regular.ttf'))
+    with startup_profile.phase('font registration'):
+        from qtpy.QtGui import QFontDatabase
+        db = QFontDatabase()
+        db.addApplicationFont(
+            utils.abs_path_from_package_dir('resources/fonts/poppins/Poppins-Medium.ttf'))
+        db.addApplicationFont(
+            utils.abs_path_from_package_dir('resources/fonts/source_code_pro/SourceCodePro-Regular.ttf'))
+        db.addApplicationFont(
+            utils.abs_path_from_package_dir('resources/fonts/asap/Asap-Regular.ttf'))
 
     #
     # Editor configuration
@@ -150,14 +158,16 @@ def run(*args_,
 
         # Get packages and project file interactively and update arguments accordingly
 
-        sw = StartupDialog(config=conf, parent=gui_parent)
-        # Exit if dialog couldn't initialize or is exited
-        if sw.exec_() <= 0:
-            sys.exit('Start-up screen dismissed')
+        with startup_profile.phase('startup dialog'):
+            sw = StartupDialog(config=conf, parent=gui_parent)
+            # Exit if dialog couldn't initialize or is exited
+            if sw.exec_() <= 0:
+                sys.exit('Start-up screen dismissed')
 
     # Replace node directories with `NodePackage` instances
     if len(conf.nodes) > 0:
-        conf.nodes, pkgs_not_found, _ = ryven.main.packages.nodes_package.process_nodes_packages(list(conf.nodes))
+        with startup_profile.phase('package resolution'):
+            conf.nodes, pkgs_not_found, _ = ryven.main.packages.nodes_package.process_nodes_packages(list(conf.nodes))
         if pkgs_not_found:
             sys.exit(
                 f'Error: Nodes packages not found: {", ".join([str(p) for p in pkgs_not_found])}')
@@ -166,7 +176,8 @@ def run(*args_,
 
     # Store WindowTheme object
     assert isinstance(conf.window_theme, str)
-    conf.window_theme = apply_stylesheet(conf.window_theme)
+    with startup_profile.phase('stylesheet'):
+        conf.window_theme = apply_stylesheet(conf.window_theme)
 
     # Adjust flow theme if not set
     if conf.flow_theme is None:
@@ -182,10 +193,11 @@ def run(*args_,
 
     # Get packages required by the project
     if conf.project:
-        pkgs, pkgs_not_found, project_dict = ryven.main.packages.nodes_package.process_nodes_packages(
-            conf.project,
-            requested_packages=list(conf.nodes)  # type: ignore
-        )
+        with startup_profile.phase('package resolution'):
+            pkgs, pkgs_not_found, project_dict = ryven.main.packages.nodes_package.process_nodes_packages(
+                conf.project,
+                requested_packages=list(conf.nodes)  # type: ignore
+            )
 
         if pkgs_not_found:
             str_missing_pkgs = ', '.join([str(p.name) for p in pkgs_not_found])
@@ -211,18 +223,20 @@ def run(*args_,
     #
 
     # Init main console
-    (console_stdout_redirect, console_errout_redirect) = \
-        init_main_console(conf.window_theme)
+    with startup_profile.phase('main console'):
+        (console_stdout_redirect, console_errout_redirect) = \
+            init_main_console(conf.window_theme)
 
     # Init main window
-    editor = MainWindow(
-        config=conf,
-        requested_packages=requested_packages,
-        required_packages=required_packages,
-        project_content=project_content,
-        parent=gui_parent
-    )
-    editor.show()
+    with startup_profile.phase('main window'):
+        editor = MainWindow(
+            config=conf,
+            requested_packages=requested_packages,
+            required_packages=required_packages,
+            project_content=project_content,
+            parent=gui_parent
+        )
+        editor.show()
 
     # Start application
     if qt_app is None:
@@ -0,0 +1,403 @@
+"""
+This module includes the Ryven Compile application, which compiles the data
+flows of a Ryven project into a plain Python module.
+
+The generated module embeds the project's data and imports the node classes
+from their packages. For every flow, it contains a function which calls the
+nodes' `update_event()` in topological order and passes output values
+directly to the inputs of the connected nodes, bypassing ryvencore's flow
+executors (event dispatch, propagation and execution analysis).
+
+Semantics follow the 'data opt' algorithm mode: source nodes are updated
+once, and every node is updated once per connected input after all of its
+predecessors ran. Exceptions raised by nodes are reported through
+`Node.update_err()`, as in the interpreted session. Unlike there, successors
+of a node run even if it did not set its outputs. Exec connections are not
+supported.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional, Tuple
+
+from ryvencore import Session, Node, Flow
+from ryvencore.FlowExecutor import FlowExecutor
+from ryvencore.NodePort import NodeInput
+
+from ryven.main.RyvenConsole import create_session, find_node_packages
+from ryven.main.RyvenRun import Output, default_outputs, execute, timing_stats
+from ryven.main.packages.nodes_package import NodesPackage
+
+
+class CompileError(Exception):
+    """The project cannot be compiled."""
+    pass
+
+
+#
+# runtime, used by the generated modules
+#
+
+# marks inputs which are not connected
+_UNCONNECTED = object()
+
+
+def _input_value(flow: Flow, inp: NodeInput):
+    """The value on the output connected to the input, _UNCONNECTED if none is."""
+    out = flow.connected_output(inp)
+    return _UNCONNECTED if out is None else out.val
+
+
+class CompiledExecutor(FlowExecutor):
+    """
+    Executor installed on the flows of a compiled project. It does not
+    propagate anything; the compiled flow function sets the input values
+    in `inputs` and invokes the nodes.
+    """
+
+    def __init__(self, flow: Flow, interpreted: FlowExecutor):
+        super().__init__(flow)
+        # the executor the flow had before, see `benchmark()`
+        self.interpreted = interpreted
+        # {node: [input values]}
+        self.inputs: Dict[Node, List] = {n: [_input_value(flow, inp) for inp in n.inputs] for n in flow.nodes}
+
+    def update_node(self, node: Node, inp: int):
+        try:
+            node.update_event(inp)
+        except Exception as e:
+            node.update_err(e)
+
+    def input(self, node: Node, index: int):
+        val = self.inputs[node][index]
+        return node.inputs[index].default if val is _UNCONNECTED else val
+
+    def set_output_val(self, node: Node, index: int, data):
+        node.outputs[index].val = data
+
+    def exec_output(self, node: Node, index: int):
+        pass
+
+
+def build_session(
+    package_dirs: List[str], project: Dict
+) -> Tuple[Session, Dict[str, Tuple[List[Node], List[List]]]]:
+    """Creates a session of the project for the compiled flow functions.
+
+    :return: The session, and for every flow title the nodes and their input
+        values in the order of the project data.
+    """
+
+    session = create_session([NodesPackage(d) for d in package_dirs])
+
+    flows = {}
+    for flow in session.load(project):
+        if len(flow.nodes) != len(project['flows'][flow.title]['nodes']):
+            raise CompileError(f'could not create all nodes of flow {flow.title!r}')
+        executor = CompiledExecutor(flow, flow.executor)
+        flow.executor = executor
+        flows[flow.title] = (flow.nodes, [executor.inputs[n] for n in flow.nodes])
+
+    return session, flows
+
+
+#
+# compiler
+#
+
+def topological_order(flow_data: Dict) -> List[int]:
+    """Node indices of the flow in topological order, keeping the order of
+    the project data where possible. Nodes on cycles are left out."""
+
+    num_nodes = len(flow_data['nodes'])
+    successors: List[List[int]] = [[] for _ in range(num_nodes)]
+    in_degree = [0] * num_nodes
+    for c in flow_data['connections']:
+        if c['connected node'] is None:
+            continue
+        successors[c['parent node index']].append(c['connected node'])
+        in_degree[c['connected node']] += 1
+
+    order = []
+    ready = [i for i in range(num_nodes) if in_degree[i] == 0]
+    while ready:
+        ready.sort(reverse=True)
+        i = ready.pop()
+        order.append(i)
+        for s in successors[i]:
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                ready.append(s)
+
+    return order
+
+
+def _comment(text: str) -> str:
+    return re.sub(r'\s+', ' ', str(text)).strip()
+
+
+def compile_flow(index: int, title: str, flow_data: Dict) -> str:
+    """Source of the factory function of the flow's compiled function."""
+
+    if flow_data['algorithm mode'] == 'exec':
+        raise CompileError(f'flow {title!r} is in exec mode')
+
+    nodes = flow_data['nodes']
+    for c in flow_data['connections']:
+        if c['connected node'] is None:
+            continue
+        out_type = nodes[c['parent node index']]['outputs'][c['output port index']]['type']
+        inp_type = nodes[c['connected node']]['inputs'][c['connected input port index']]['type']
+        if out_type != 'data' or inp_type != 'data':
+            raise CompileError(f'flow {title!r} contains exec connections')
+
+    # {node index: [(input index, parent node index, output index)]}
+    node_inputs: Dict[int, List[Tuple[int, int, int]]] = {}
+    for c in flow_data['connections']:
+        if c['connected node'] is None:
+            continue
+        node_inputs.setdefault(c['connected node'], []).append(
+            (c['connected input port index'], c['parent node index'], c['output port index']))
+
+    lines = [
+        f'def _flow_{index}(nodes, inputs):',
+        f'    """{_comment(title)}"""',
+    ]
+    if nodes:
+        names = ', '.join(f'n{i}' for i in range(len(nodes)))
+        lines.append(f'    {names}, = nodes')
+    for i in sorted(node_inputs):
+        lines.append(f'    i{i} = inputs[{i}]')
+    lines += ['', '    def run():']
+
+    order = topological_order(flow_data)
+    if len(order) != len(nodes):
+        raise CompileError(f'flow {title!r} contains a cycle')
+
+    for i in order:
+        n = nodes[i]
+        lines.append(f'        # {_comment(n.get("display title") or n["identifier"])} ({n["identifier"]})')
+        conns = sorted(node_inputs.get(i, []))
+        for inp, parent, out in conns:
+            lines.append(f'        i{i}[{inp}] = n{parent}.outputs[{out}].val')
+        for inp in dict.fromkeys(inp for inp, _, _ in conns) if conns else [-1]:
+            lines += [
+                f'        try:',
+                f'            n{i}.update_event({inp})',
+                f'        except Exception as e:',
+                f'            n{i}.update_err(e)',
+            ]
+
+    if not nodes:
+        lines.append('        pass')
+    lines += ['', '    return run']
+    return '\n'.join(lines)
+
+
+MODULE_TEMPLATE = '''"""
+Compiled Ryven project, generated by ryven-compile from
+    {project_path}
+
+Call `load()` once to create the session, and `run()` to execute the flows.
+The nodes can be accessed through `session`.
+"""
+import json
+from typing import Optional
+
+from ryven.main.RyvenCompile import build_session
+
+PACKAGES = {packages!r}
+
+PROJECT = json.loads({project!r})
+
+session = None
+flows = {{}}
+
+
+{flow_functions}
+
+
+_FACTORIES = {{
+{factories}
+}}
+
+
+def load():
+    global session
+    session, flow_nodes = build_session(PACKAGES, PROJECT)
+    for title, factory in _FACTORIES.items():
+        flows[title] = factory(*flow_nodes[title])
+    return session
+
+
+def run(flow: Optional[str] = None):
+    """Executes all flows, or the flow with the given title."""
+    if session is None:
+        load()
+    if flow is not None:
+        flows[flow]()
+        return
+    for run_flow in flows.values():
+        run_flow()
+'''
+
+
+def compile_project(project_path: str, requested_nodes: List[str]) -> str:
+    """Returns the source code of the compiled project."""
+
+    node_packages, project = find_node_packages(project_path, requested_nodes)
+
+    flow_functions = []
+    factories = []
+    for i, (title, flow_data) in enumerate(project['flows'].items()):
+        flow_functions.append(compile_flow(i, title, flow_data))
+        factories.append(f'    {title!r}: _flow_{i},')
+
+    return MODULE_TEMPLATE.format(
+        project_path=os.path.abspath(project_path),
+        packages=sorted(os.path.abspath(p.directory) for p in node_packages),
+        project=json.dumps(project),
+        flow_functions='\n\n\n'.join(flow_functions),
+        factories='\n'.join(factories),
+    )
+
+
+def load_compiled(path: str):
+    """Imports a compiled project module from its file."""
+    name = f'ryven_compiled_{re.sub(r"[^0-9a-zA-Z_]", "_", os.path.splitext(os.path.basename(path))[0])}'
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def benchmark(module, runs: int) -> Dict:
+    """Runs the project `runs` times in the interpreted session and with the
+    compiled flow functions, on the same nodes, and returns timing statistics
+    of both, and whether the values of the result nodes agree."""
+
+    session = module.load()
+    compiled = {f: f.executor for f in session.flows}
+    outputs = [Output(session, name) for name in default_outputs(session)]
+
+    results: Dict[str, Dict] = {}
+    for mode in ('interpreted', 'compiled'):
+        for f, executor in compiled.items():
+            f.executor = executor.interpreted if mode == 'interpreted' else executor
+        times = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            if mode == 'interpreted':
+                execute(session, [])
+            else:
+                module.run()
+            times.append(time.perf_counter() - t)
+        results[mode] = {
+            'timing': timing_stats(times),
+            'outputs': {o.name: repr(o.value()) for o in outputs},
+        }
+
+    for f, executor in compiled.items():
+        f.executor = executor
+
+    return {
+        'interpreted': results['interpreted']['timing'],
+        'compiled': results['compiled']['timing'],
+        'speedup': results['interpreted']['timing']['mean'] / results['compiled']['timing']['mean'],
+        'outputs agree': results['interpreted']['outputs'] == results['compiled']['outputs'],
+    }
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    :return: args: The parsed command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='''
+            Compiles the data flows of a ryven project into a python module
+            which executes them without ryvencore's flow executors.
+            ''',
+    )
+
+    parser.add_argument(
+        dest='project',
+        metavar='PROJECT',
+        help='the project file to be compiled'
+    )
+
+    parser.add_argument(
+        '-n', '--nodes',
+        action='append',
+        default=[],
+        dest='nodes',
+        metavar='NODES_PKG',
+        help='''
+            use a nodes package, which takes precedence over the nodes
+            package with the same name specified in the project file
+            '''
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        dest='output',
+        metavar='FILE',
+        help='the python module to be written (default: <project name>_compiled.py)'
+    )
+
+    parser.add_argument(
+        '--benchmark',
+        type=int,
+        default=0,
+        dest='benchmark',
+        metavar='N',
+        help='''
+            afterwards, execute the project N times compiled and interpreted,
+            and compare the timings
+            '''
+    )
+
+    return parser.parse_args(args)
+
+
+def run(argv: Optional[List[str]] = None):
+
+    args = parse_args(argv)
+
+    output = args.output or f'{os.path.splitext(os.path.basename(args.project))[0]}_compiled.py'
+
+    with redirect_stdout(sys.stderr):
+        os.environ['RYVEN_MODE'] = 'no-gui'
+        try:
+            source = compile_project(args.project, args.nodes)
+        except CompileError as e:
+            sys.exit(f'ryven-compile: {e}')
+
+    with open(output, 'w') as f:
+        f.write(source)
+    print(f'compiled {args.project} to {output}')
+
+    if args.benchmark > 0:
+        with redirect_stdout(sys.stderr):
+            result = benchmark(load_compiled(output), args.benchmark)
+        for mode in ('interpreted', 'compiled'):
+            stats = result[mode]
+            print(
+                f'{mode:>11}: '
+                f'mean {stats["mean"] * 1000:.3f} ms, '
+                f'median {stats["median"] * 1000:.3f} ms, '
+                f'min {stats["min"] * 1000:.3f} ms '
+                f'({stats["runs"]} runs)'
+            )
+        print(f'speedup: {result["speedup"]:.2f}x, result nodes agree: {result["outputs agree"]}')
+
+
+if __name__ == '__main__':
+    run()
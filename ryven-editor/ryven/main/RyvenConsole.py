@@ -12,13 +12,18 @@ from os.path import join, dirname
 import json
 import sys
 import code
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from ryvencore import *
 
 # import ryven utils to load node packages and parse projects
 from ryven.main.packages.nodes_package  import NodesPackage, process_nodes_packages, import_nodes_package
 from ryven.main.packages.node_env       import init_node_env
-from ryven.main.utils                   import find_project
+from ryven.main.utils                   import find_project, stop_and_report
+from ryven.main.execution_trace         import ExecutionTracer
+from ryven.main.sampling_profiler       import SamplingProfiler
+from ryven.main.memory_accounting       import MemoryAccountant
 
 
 def parse_args() -> argparse.Namespace:
@@ -58,13 +63,55 @@ def parse_args() -> argparse.Namespace:
             '''
     )
 
+    parser.add_argument(
+        '--trace',
+        dest='trace',
+        metavar='TRACE_FILE',
+        help='''
+            trace the execution of all nodes; the tracer is available as
+            `tracer` in the REPL, and on exit the nodes which took the most
+            time are printed and a Chrome trace JSON file is written
+            '''
+    )
+
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        metavar='STACKS_FILE',
+        help='''
+            sample the code running inside nodes; the profiler is available
+            as `profiler` in the REPL, and on exit a per-node summary is
+            printed and the collapsed stacks are written for a flamegraph
+            '''
+    )
+
+    parser.add_argument(
+        '--memory',
+        dest='memory',
+        metavar='REPORT_FILE',
+        help='''
+            measure the memory allocated by the nodes' updates and retained
+            by their state; the accountant is available as `memory` in the
+            REPL, and on exit the nodes retaining the most memory are printed
+            and a JSON report is written
+            '''
+    )
+
     args, remaining_args = parser.parse_known_args()
 
     return args
 
 
-def repl(session: Session):
-    context = {'session': session}
+def repl(session: Session, tracer: Optional[ExecutionTracer] = None,
+         profiler: Optional[SamplingProfiler] = None,
+         memory: Optional[MemoryAccountant] = None):
+    context: Dict[str, object] = {'session': session}
+    if tracer is not None:
+        context['tracer'] = tracer
+    if profiler is not None:
+        context['profiler'] = profiler
+    if memory is not None:
+        context['memory'] = memory
     
     code.interact(local=context, banner=
                   f'Welcome to the Ryven Console! Your project has been loaded.\n'
@@ -73,13 +120,13 @@ def repl(session: Session):
                   f'\n\n')
 
 
-def run():
-
-    args = parse_args()
+def create_session(node_packages: Iterable[NodesPackage]) -> Session:
+    """Creates a session without GUI, and registers the built-in nodes and
+    the nodes of the given packages.
 
-    #
-    # initialize session
-    #
+    :param node_packages: The node packages to be imported.
+    :return: The session.
+    """
 
     os.environ['RYVEN_MODE'] = 'no-gui'
     init_node_env()
@@ -94,31 +141,92 @@ def run():
     session.register_data_types(data_types)
     session.register_node_types(nodes)
 
-    # 
-    # load project and node packages
-    # 
+    for np in node_packages:
+        nodes, data_types = import_nodes_package(package=np)
+        session.register_data_types(data_types)
+        session.register_node_types(nodes)
+
+    return session
+
+
+def find_node_packages(project_path: str, requested_nodes: List[str]) -> Tuple[Set[NodesPackage], Dict]:
+    """Finds the node packages required by the project. Exits if packages are missing.
+
+    :param project_path: The project file.
+    :param requested_nodes: Paths of additional node packages, which take
+        precedence over the packages with the same name specified in the project.
+    :return: The node packages and the contents of the project file.
+    """
+
+    requested: List[Union[str, Path, NodesPackage]] = list(requested_nodes)
+    requested_packages, nodes_not_found, _ = process_nodes_packages(requested)
+    if nodes_not_found:
+        exit_missing_nodes(nodes_not_found)
 
-    project_path = args.project[0]
     node_packages, nodes_not_found, project = process_nodes_packages(
         project_or_nodes=project_path, 
-        requested_packages=args.nodes
+        requested_packages=list(requested_packages)
     )
 
     if nodes_not_found:
         exit_missing_nodes(nodes_not_found)
+    assert project is not None
 
-    for np in node_packages:
-        nodes, data_types = import_nodes_package(package=np)
-        session.register_data_types(data_types)
-        session.register_node_types(nodes)
-    
+    # requested packages take precedence over the project's ones
+    return requested_packages | node_packages, project
+
+
+def init_session(project_path: str, requested_nodes: List[str]) -> Tuple[Session, Dict]:
+    """Creates a session without GUI, imports the built-in nodes and the
+    packages required by the project, and loads the project.
+
+    :param project_path: The project file to be loaded.
+    :param requested_nodes: Paths of additional node packages, which take
+        precedence over the packages with the same name specified in the project.
+    :return: The session and the contents of the project file.
+    """
+
+    node_packages, project = find_node_packages(project_path, requested_nodes)
+
+    session = create_session(node_packages)
     session.load(project)
 
+    return session, project
+
+
+def run():
+
+    args = parse_args()
+
+    session, _ = init_session(args.project[0], args.nodes)
+
+    tracer = None
+    if args.trace:
+        tracer = ExecutionTracer(session)
+        tracer.start()
+
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler(session)
+        profiler.start()
+
+    memory = None
+    if args.memory:
+        memory = MemoryAccountant(session)
+        memory.start()
+
     #
     # deploy REPL
     #
 
-    repl(session)
+    repl(session, tracer, profiler, memory)
+
+    if tracer is not None:
+        stop_and_report(tracer, args.trace, 'execution trace')
+    if profiler is not None:
+        stop_and_report(profiler, args.profile, 'flamegraph stacks')
+    if memory is not None:
+        stop_and_report(memory, args.memory, 'memory report')
 
 
 def exit_missing_nodes(nodes_not_found):
@@ -0,0 +1,498 @@
+"""
+This module includes the Ryven Run application, which executes a Ryven
+project once (or repeatedly) without any GUI and exits.
+
+Designated inputs (node inputs, nodes holding a value like `val`, or flow
+variables) are set from the command line or a JSON file, the flow is
+executed, and designated outputs are written as JSON. Values which cannot be
+represented in JSON can be written to files instead.
+"""
+import argparse
+import json
+import os
+import pickle
+import re
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+from ryvencore import Session, Flow, Node, Data
+
+from ryven.main.RyvenConsole import init_session
+from ryven.main.parallel_execution import enable_parallel_execution
+from ryven.main.execution_trace import ExecutionTracer
+from ryven.main.sampling_profiler import SamplingProfiler
+from ryven.main.memory_accounting import MemoryAccountant
+from ryven.main.utils import stop_and_report
+
+# exit codes
+EXIT_OK = 0
+EXIT_NODE_ERRORS = 1
+EXIT_USAGE = 2
+
+
+class DesignationError(Exception):
+    """A designated input or output could not be found in the project."""
+    pass
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    :return: args: The parsed command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='''
+            Runs a ryven project without any GUI components and writes
+            designated outputs as JSON.
+            ''',
+        epilog='''
+            Inputs and outputs are designated as [FLOW/]$VARIABLE for flow
+            variables, or as [FLOW/]NODE[:PORT] for nodes, where NODE is a
+            node title or #ID with the node's id from the project file, and
+            PORT is the index of a node input or output. Without a port, the
+            value of a node like `val` or `result`, or of its only port is
+            used. The flow can be omitted if the designation is unique.
+            ''',
+    )
+
+    parser.add_argument(
+        dest='project',
+        metavar='PROJECT',
+        help='the project file to be loaded'
+    )
+
+    parser.add_argument(
+        '-n', '--nodes',
+        action='append',
+        default=[],
+        dest='nodes',
+        metavar='NODES_PKG',
+        help='''
+            load a nodes package, which takes precedence over the nodes
+            package with the same name specified in the project file
+            '''
+    )
+
+    parser.add_argument(
+        '-i', '--input',
+        action='append',
+        default=[],
+        dest='inputs',
+        metavar='NAME=VALUE',
+        help='''
+            set a designated input before the execution; VALUE is parsed
+            as JSON, and used as string if it is not valid JSON
+            '''
+    )
+
+    parser.add_argument(
+        '--inputs-file',
+        dest='inputs_file',
+        metavar='FILE',
+        help='JSON object of designated inputs and values, "-" reads from stdin'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        action='append',
+        default=[],
+        dest='outputs',
+        metavar='NAME',
+        help='''
+            collect a designated output after the execution; by default
+            all result nodes are collected
+            '''
+    )
+
+    parser.add_argument(
+        '--output-file',
+        dest='output_file',
+        metavar='FILE',
+        help='write the JSON result to FILE instead of stdout'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        dest='output_dir',
+        metavar='DIR',
+        help='''
+            write output values which cannot be represented in JSON to files
+            in DIR (raw bytes, or pickled objects); otherwise, their repr is used
+            '''
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=1,
+        dest='repeat',
+        metavar='N',
+        help='execute the flow N times and report timing statistics'
+    )
+
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=0,
+        dest='parallel',
+        metavar='N',
+        help='execute independent branches of data flows on N threads'
+    )
+
+    parser.add_argument(
+        '--trace',
+        dest='trace',
+        metavar='TRACE_FILE',
+        help='''
+            trace the execution of all nodes, print the nodes which took the
+            most time and write a Chrome trace JSON file
+            '''
+    )
+
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        metavar='STACKS_FILE',
+        help='''
+            sample the code running inside nodes, print a per-node summary
+            and write the collapsed stacks for a flamegraph
+            '''
+    )
+
+    parser.add_argument(
+        '--memory',
+        dest='memory',
+        metavar='REPORT_FILE',
+        help='''
+            measure the memory allocated by the nodes' updates and retained
+            by their state, print the nodes retaining the most memory and
+            write a JSON report
+            '''
+    )
+
+    return parser.parse_args(args)
+
+
+#
+# designations
+#
+
+def _split_flow(session: Session, name: str) -> Tuple[List[Flow], str]:
+    for flow in session.flows:
+        if name.startswith(f'{flow.title}/'):
+            return [flow], name[len(flow.title) + 1:]
+    return list(session.flows), name
+
+
+def find_variable(session: Session, name: str):
+    """Returns the flow variable designated by `[FLOW/]$VARIABLE`."""
+    flows, rest = _split_flow(session, name)
+    vars_addon = session.addons['Variables']
+    matches = [vars_addon.var(f, rest[1:]) for f in flows if vars_addon.var_exists(f, rest[1:])]
+    if len(matches) != 1:
+        raise DesignationError(
+            f'{"no" if not matches else "more than one"} flow variable matches {name!r}')
+    return matches[0]
+
+
+def find_node(session: Session, name: str) -> Tuple[Node, Optional[int]]:
+    """Returns the node and port index designated by `[FLOW/]NODE[:PORT]`."""
+    flows, rest = _split_flow(session, name)
+    port = None
+    m = re.fullmatch(r'(.*):(\d+)', rest)
+    if m:
+        rest, port = m.group(1), int(m.group(2))
+
+    if rest.startswith('#') and rest[1:].isdigit():
+        node_id = int(rest[1:])
+        matches = [n for f in flows for n in f.nodes if n.prev_global_id == node_id]
+    else:
+        matches = [n for f in flows for n in f.nodes if n.title == rest]
+
+    if len(matches) != 1:
+        raise DesignationError(
+            f'{"no" if not matches else "more than one"} node matches {name!r}'
+            + (', use #ID to select one' if matches else ''))
+    return matches[0], port
+
+
+def _data_ports(ports) -> List[int]:
+    return [i for i, p in enumerate(ports) if p.type_ == 'data']
+
+
+def _is_value_node(node: Node) -> bool:
+    """Nodes like `val` or `result` which hold their value in `val`."""
+    return hasattr(node, 'val')
+
+
+class Input:
+    """A designated input, which is set and triggers an update of its node."""
+
+    def __init__(self, session: Session, name: str, value: Any):
+        self.name = name
+        self.value = value
+        self.var = None
+        self.node = None
+        self.port = None
+
+        if _split_flow(session, name)[1].startswith('$'):
+            self.var = find_variable(session, name)
+            return
+
+        self.node, self.port = find_node(session, name)
+        if self.port is None and not (_is_value_node(self.node) and not _data_ports(self.node.inputs)):
+            data_inputs = _data_ports(self.node.inputs)
+            if len(data_inputs) != 1:
+                raise DesignationError(f'specify the input port of {name!r}')
+            self.port = data_inputs[0]
+        if self.port is not None:
+            if not 0 <= self.port < len(self.node.inputs):
+                raise DesignationError(f'{name!r} has no input {self.port}')
+            if self.node.flow.connected_output(self.node.inputs[self.port]) is not None:
+                raise DesignationError(f'input {self.port} of {name!r} is connected')
+
+    def apply(self):
+        if self.var is not None:
+            # notifies the nodes subscribed to the variable
+            self.var.set(self.value)
+        elif self.port is None:
+            self.node.val = Data(self.value)
+            self.node.update()
+        else:
+            self.node.inputs[self.port].default = Data(self.value)
+            self.node.update(self.port)
+
+
+class Output:
+    """A designated output, whose value is read after the execution."""
+
+    def __init__(self, session: Session, name: str):
+        self.name = name
+        self.var = None
+        self.node: Optional[Node] = None
+        self.port: Optional[int] = None
+
+        if _split_flow(session, name)[1].startswith('$'):
+            self.var = find_variable(session, name)
+            return
+
+        self.node, self.port = find_node(session, name)
+        if self.port is None and not _is_value_node(self.node):
+            data_outputs = _data_ports(self.node.outputs)
+            if len(data_outputs) != 1:
+                raise DesignationError(f'specify the output port of {name!r}')
+            self.port = data_outputs[0]
+        if self.port is not None and not 0 <= self.port < len(self.node.outputs):
+            raise DesignationError(f'{name!r} has no output {self.port}')
+
+    def value(self) -> Any:
+        if self.var is not None:
+            return self.var.get()
+        assert self.node is not None
+        if self.port is None:
+            val = getattr(self.node, 'val')  # a value node, see _is_value_node()
+        else:
+            val = self.node.outputs[self.port].val
+        return val.payload if isinstance(val, Data) else val
+
+
+def default_outputs(session: Session) -> List[str]:
+    """Designations of all result nodes in the project."""
+    return [
+        f'{f.title}/#{n.prev_global_id}'
+        for f in session.flows
+        for n in f.nodes
+        if n.title == 'result' and n.prev_global_id is not None
+    ]
+
+
+def parse_inputs(args: argparse.Namespace) -> Dict[str, Any]:
+    inputs = {}
+    if args.inputs_file:
+        if args.inputs_file == '-':
+            inputs.update(json.load(sys.stdin))
+        else:
+            with open(args.inputs_file) as f:
+                inputs.update(json.load(f))
+    for item in args.inputs:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise DesignationError(f'input {item!r} is not of the form NAME=VALUE')
+        try:
+            inputs[name] = json.loads(value)
+        except ValueError:
+            inputs[name] = value
+    return inputs
+
+
+#
+# execution
+#
+
+def source_nodes(session: Session) -> List[Node]:
+    """Nodes without connected inputs, which start the execution of a flow."""
+    return [
+        n
+        for f in session.flows
+        for n in f.nodes
+        if all(f.connected_output(inp) is None for inp in n.inputs)
+    ]
+
+
+def execute(session: Session, inputs: List[Input]):
+    """Sets the inputs, or updates all source nodes if there are none."""
+    if inputs:
+        for inp in inputs:
+            inp.apply()
+    else:
+        for node in source_nodes(session):
+            node.update()
+
+
+def timing_stats(times: List[float]) -> Dict[str, float]:
+    return {
+        'runs': len(times),
+        'total': sum(times),
+        'min': min(times),
+        'max': max(times),
+        'mean': statistics.mean(times),
+        'median': statistics.median(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def json_value(name: str, value: Any, output_dir: Optional[str]) -> Any:
+    """The value itself if it can be represented in JSON, otherwise a
+    reference to the file it was written to, or its repr."""
+    if hasattr(value, 'tolist'):    # numpy arrays and scalars
+        value = value.tolist()
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        pass
+
+    if output_dir is None:
+        return {'repr': repr(value)}
+
+    os.makedirs(output_dir, exist_ok=True)
+    file_name = re.sub(r'[^\w.-]+', '_', name).strip('_') or 'output'
+    if isinstance(value, (bytes, bytearray)):
+        path = os.path.join(output_dir, f'{file_name}.bin')
+        with open(path, 'wb') as f:
+            f.write(value)
+    else:
+        path = os.path.join(output_dir, f'{file_name}.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump(value, f)
+    return {'file': path}
+
+
+def execute_project(
+    session: Session,
+    inputs: Dict[str, Any],
+    outputs: Optional[List[str]] = None,
+    repeat: int = 1,
+    output_dir: Optional[str] = None,
+) -> Dict:
+    """Sets the designated inputs, executes the flows `repeat` times and returns
+    the designated outputs (default: all result nodes), the errors raised by
+    nodes and timing statistics. Raises a DesignationError if an input or
+    output cannot be found."""
+
+    inputs_ = [Input(session, name, value) for name, value in inputs.items()]
+    outputs_ = [Output(session, name) for name in (outputs or default_outputs(session))]
+
+    errors = []
+    subscriptions = []
+    for node in session.all_node_objects():
+        cb = lambda e, n=node: errors.append({'node': n.title, 'error': f'{type(e).__name__}: {e}'})
+        node.update_error.sub(cb)
+        subscriptions.append((node, cb))
+
+    times = []
+    try:
+        for _ in range(repeat):
+            t = time.perf_counter()
+            execute(session, inputs_)
+            times.append(time.perf_counter() - t)
+    finally:
+        for node, cb in subscriptions:
+            node.update_error.unsub(cb)
+
+    return {
+        'outputs': {o.name: json_value(o.name, o.value(), output_dir) for o in outputs_},
+        'errors': errors,
+        'timing': timing_stats(times),
+    }
+
+
+def run(argv: Optional[List[str]] = None):
+
+    args = parse_args(argv)
+    if args.repeat < 1:
+        sys.exit('--repeat must be at least 1')
+
+    # node packages may print freely; only the result goes to stdout
+    with redirect_stdout(sys.stderr):
+        session, _ = init_session(args.project, args.nodes)
+        if args.parallel > 0:
+            enable_parallel_execution(session, args.parallel)
+
+        tracer = None
+        if args.trace:
+            tracer = ExecutionTracer(session)
+            tracer.start()
+
+        profiler = None
+        if args.profile:
+            profiler = SamplingProfiler(session)
+            profiler.start()
+
+        memory = None
+        if args.memory:
+            memory = MemoryAccountant(session)
+            memory.start()
+
+        try:
+            result = execute_project(
+                session, parse_inputs(args), args.outputs, args.repeat, args.output_dir)
+        except (DesignationError, OSError, ValueError) as e:
+            print(f'ryven-run: {e}', file=sys.stderr)
+            sys.exit(EXIT_USAGE)
+
+        if args.repeat > 1:
+            stats = result['timing']
+            print(
+                f'{stats["runs"]} runs: '
+                f'min {stats["min"] * 1000:.3f} ms, '
+                f'mean {stats["mean"] * 1000:.3f} ms, '
+                f'median {stats["median"] * 1000:.3f} ms, '
+                f'max {stats["max"] * 1000:.3f} ms, '
+                f'stdev {stats["stdev"] * 1000:.3f} ms',
+                file=sys.stderr,
+            )
+
+        if tracer is not None:
+            stop_and_report(tracer, args.trace, 'execution trace', sys.stderr)
+        if profiler is not None:
+            stop_and_report(profiler, args.profile, 'flamegraph stacks', sys.stderr)
+        if memory is not None:
+            stop_and_report(memory, args.memory, 'memory report', sys.stderr)
+
+    text = json.dumps(result, indent=2)
+    if args.output_file:
+        with open(args.output_file, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    sys.exit(EXIT_NODE_ERRORS if result['errors'] else EXIT_OK)
+
+
+if __name__ == '__main__':
+    run()
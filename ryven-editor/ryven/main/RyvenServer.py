@@ -0,0 +1,452 @@
+"""
+This module includes the Ryven Server application, which keeps a Ryven
+project loaded and executes it on request, without any GUI.
+
+The project and its node packages are loaded once. Requests are dispatched
+to a pool of worker processes which each hold their own session of the
+project, so the latency of a request is the execution time of the flows.
+Where processes are forked, the workers inherit the session loaded by the
+server process, otherwise each worker loads the project once when it starts.
+
+API (JSON over HTTP, on localhost or a unix socket):
+
+    GET  /health    ->  {"project": ..., "workers": N}
+    POST /run       <-  {"inputs": {NAME: VALUE}, "outputs": [NAME], "repeat": N}
+                    ->  {"outputs": {...}, "errors": [...], "timing": {...}, "worker": PID}
+
+Inputs and outputs are designated like for `ryven-run`. Notice that the state
+of a worker's session (e.g. inputs set by previous requests) persists between
+the requests it handles. A worker whose execution times out (see --timeout)
+or crashes is terminated and replaced by a fresh one.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+from ryvencore import Session
+
+from ryven.main.RyvenConsole import init_session
+from ryven.main.parallel_execution import enable_parallel_execution
+from ryven.main.RyvenRun import execute_project, DesignationError
+
+DEFAULT_PORT = 8765
+# upper bound for the size of request bodies
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+# seconds after which requests waiting for an idle worker check whether
+# there are workers left
+IDLE_POLL_INTERVAL = 0.5
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    :return: args: The parsed command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='''
+            Serves a ryven project without any GUI components; executes
+            it on request in a pool of worker processes.
+            ''',
+    )
+
+    parser.add_argument(
+        dest='project',
+        metavar='PROJECT',
+        help='the project file to be loaded'
+    )
+
+    parser.add_argument(
+        '-n', '--nodes',
+        action='append',
+        default=[],
+        dest='nodes',
+        metavar='NODES_PKG',
+        help='''
+            load a nodes package, which takes precedence over the nodes
+            package with the same name specified in the project file
+            '''
+    )
+
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        dest='workers',
+        metavar='N',
+        help='number of worker processes (default: number of CPUs)'
+    )
+
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        dest='host',
+        help='host to listen on (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '-p', '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        dest='port',
+        help='port to listen on (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--socket',
+        dest='socket',
+        metavar='PATH',
+        help='listen on a unix socket instead of a TCP port'
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        dest='timeout',
+        metavar='SECONDS',
+        help='''
+            fail requests whose execution takes longer than SECONDS; the
+            worker executing it is terminated and replaced
+            '''
+    )
+
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=0,
+        dest='parallel',
+        metavar='N',
+        help='execute independent branches of data flows on N threads in each worker'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        dest='output_dir',
+        metavar='DIR',
+        help='''
+            write output values which cannot be represented in JSON to files
+            in DIR; otherwise, their repr is returned
+            '''
+    )
+
+    return parser.parse_args(args)
+
+
+#
+# workers
+#
+
+# the session of the current (worker) process
+_session: Optional[Session] = None
+_output_dir: Optional[str] = None
+
+
+def _load_session(project: str, nodes: List[str]):
+    global _session
+    # node packages may print freely; stdout is not used by the server
+    sys.stdout = sys.stderr
+    _session, _ = init_session(project, nodes)
+
+
+def _init_worker(project: str, nodes: List[str], output_dir: Optional[str], parallel: int):
+    global _output_dir
+    _output_dir = output_dir
+    if _session is None:
+        _load_session(project, nodes)
+    assert _session is not None
+    if parallel > 0:
+        # threads are not inherited by forked workers, every worker has its own pool
+        enable_parallel_execution(_session, parallel)
+
+
+def _execute(request: Dict) -> Dict:
+    """Runs in a worker process."""
+    assert _session is not None
+    try:
+        result = execute_project(
+            _session,
+            request.get('inputs') or {},
+            request.get('outputs'),
+            int(request.get('repeat', 1)),
+            _output_dir,
+        )
+    except DesignationError as e:
+        return {'error': str(e), 'status': 400}
+    result['worker'] = os.getpid()
+    return result
+
+
+def _worker_main(conn, project: str, nodes: List[str], output_dir: Optional[str], parallel: int):
+    """Main function of a worker process; executes the requests received
+    through the pipe until it is closed."""
+    try:
+        _init_worker(project, nodes, output_dir, parallel)
+    except BaseException as e:  # also SystemExit, e.g. of missing packages
+        conn.send({'error': f'{type(e).__name__}: {e}'})
+        return
+    conn.send({'ready': os.getpid()})
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = _execute(request)
+        except Exception as e:
+            result = {'error': f'{type(e).__name__}: {e}', 'status': 500}
+        conn.send(result)
+
+
+class WorkerError(Exception):
+    pass
+
+
+class Worker:
+    """A worker process and the pipe to it."""
+
+    def __init__(self, ctx, initargs: tuple):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, *initargs), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self):
+        """Waits until the worker is initialized; raises WorkerError if it failed."""
+        try:
+            message = self.conn.recv()
+        except EOFError:
+            message = {'error': f'exit code {self.process.exitcode}'}
+        if 'error' in message:
+            self.terminate()
+            raise WorkerError(f'worker failed to start: {message["error"]}')
+
+    def terminate(self):
+        self.conn.close()
+        self.process.terminate()
+        self.process.join()
+
+
+class WorkerPool:
+    """
+    Worker processes executing one request at a time. Unlike a
+    multiprocessing pool, a worker can be terminated while it executes a
+    request, e.g. when it takes too long, and is then replaced.
+    """
+
+    def __init__(self, size: int, initargs: tuple):
+        self._ctx = multiprocessing.get_context()
+        self._initargs = initargs
+        self._idle: 'queue.Queue[Worker]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: List[Worker] = []
+        # replacements which are still starting
+        self._starting = 0
+
+        # the workers initialize concurrently
+        workers = [Worker(self._ctx, initargs) for _ in range(size)]
+        try:
+            for worker in workers:
+                worker.wait_ready()
+        except WorkerError:
+            for worker in workers:
+                worker.terminate()
+            raise
+        self._workers.extend(workers)
+        for worker in workers:
+            self._idle.put(worker)
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def _replace(self, worker: Worker):
+        """Terminates the worker and starts a new one in the background."""
+        worker.terminate()
+        with self._lock:
+            self._workers.remove(worker)
+            self._starting += 1
+        threading.Thread(target=self._start_replacement, daemon=True).start()
+
+    def _start_replacement(self):
+        worker = None
+        try:
+            worker = Worker(self._ctx, self._initargs)
+            worker.wait_ready()
+        except Exception as e:
+            # the pool shrinks instead of restarting failing workers forever
+            if worker is not None and worker.process.is_alive():
+                worker.terminate()
+            worker = None
+            print(f'could not replace worker: {e}; {self.size} workers left', file=sys.stderr)
+        finally:
+            with self._lock:
+                self._starting -= 1
+                if worker is not None:
+                    self._workers.append(worker)
+        if worker is not None:
+            self._idle.put(worker)
+
+    def execute(self, request: Dict, timeout: Optional[float] = None) -> Dict:
+        """Executes the request on the next idle worker. Raises
+        multiprocessing.TimeoutError if the execution takes longer than
+        timeout seconds, and WorkerError if the worker died."""
+        while True:
+            # the pool state is checked again while waiting, since a
+            # replacement which fails to start never becomes idle
+            with self._lock:
+                if not self._workers and not self._starting:
+                    raise WorkerError('no workers left')
+            try:
+                worker = self._idle.get(timeout=IDLE_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                pass
+        try:
+            worker.conn.send(request)
+            if not worker.conn.poll(timeout):
+                self._replace(worker)
+                raise multiprocessing.TimeoutError()
+            result: Dict = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._replace(worker)
+            raise WorkerError(f'worker {worker.process.pid} died: exit code {worker.process.exitcode}') from e
+        self._idle.put(worker)
+        return result
+
+    def terminate(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.terminate()
+
+
+#
+# server
+#
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    server_version = 'RyvenServer'
+
+    def send_json(self, status: int, data: Dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'project': self.server.project, 'workers': self.server.pool.size})
+        else:
+            self.send_json(404, {'error': f'unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/run':
+            self.send_json(404, {'error': f'unknown path {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_REQUEST_BYTES:
+                self.send_json(413, {'error': 'request too large'})
+                return
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError('request must be a JSON object')
+            if int(request.get('repeat', 1)) < 1:
+                raise ValueError('repeat must be at least 1')
+        except ValueError as e:
+            self.send_json(400, {'error': f'invalid request: {e}'})
+            return
+
+        try:
+            result = self.server.pool.execute(request, self.server.request_timeout)
+        except multiprocessing.TimeoutError:
+            self.send_json(504, {'error': 'execution timed out'})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+
+        self.send_json(result.pop('status', 200), result)
+
+    def address_string(self):
+        # unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f'{self.address_string()} - {format % args}\n')
+
+
+class ProjectServer:
+    """The attributes of the servers which the request handlers use."""
+    pool: WorkerPool
+    project: str
+    request_timeout: Optional[float]
+
+
+class TCPServer(ProjectServer, ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class UnixServer(ProjectServer, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def run(argv: Optional[List[str]] = None):
+
+    args = parse_args(argv)
+    if args.workers < 1:
+        sys.exit('--workers must be at least 1')
+
+    real_stdout = sys.stdout
+
+    # load the project once in the server process, which validates it and
+    # its node packages before any worker is started; where processes are
+    # forked, the workers inherit the session
+    _load_session(args.project, args.nodes)
+
+    try:
+        pool = WorkerPool(args.workers, (args.project, args.nodes, args.output_dir, args.parallel))
+    except WorkerError as e:
+        sys.exit(str(e))
+
+    server: Union[TCPServer, UnixServer]
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixServer(args.socket, RequestHandler)
+        address = args.socket
+    else:
+        server = TCPServer((args.host, args.port), RequestHandler)
+        address = f'http://{args.host}:{server.server_port}'
+
+    server.pool = pool
+    server.project = os.path.abspath(args.project)
+    server.request_timeout = args.timeout
+
+    print(f'Ryven server listening on {address} with {args.workers} workers', file=real_stdout, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.terminate()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    run()
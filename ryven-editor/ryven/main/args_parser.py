@@ -6,6 +6,7 @@ from ryven.main.utils import find_config_file
 
 from ryven.main.utils import ryven_version
 from ryven.main import utils
+from ryven.main import payload_store
 from ryven.main.config import Config
 
 
@@ -168,7 +169,7 @@ def parse_sys_args(just_defaults=False) -> Config:
         dest='project',
         metavar='PROJECT',
         help=f'''
-            the project file to be loaded (the suffix ".json" can be omitted)\\
+            the project file to be loaded (the suffix ".json" or ".ryvenz" can be omitted)\\
             • If the project file cannot be found, it is searched for under the
             directory "{pathlib.PurePath(utils.ryven_dir_path(), "saves")}".\\
             • use "-" for standard input.
@@ -218,6 +219,155 @@ def parse_sys_args(just_defaults=False) -> Config:
             • Deferred code loading decreases package loading time.\\
             ''')
 
+    parser.add_argument(
+        '--lazy-packages',
+        action='store_true',
+        dest='lazy_packages',
+        help=f'''
+            • Lists the nodes of requested packages from a cached manifest and\\
+            imports a package only once one of its nodes is placed.\\
+            • Packages required by a loaded project are always imported.\\
+            • The manifest of a package is rebuilt whenever its files change.\\
+            ''')
+
+    parser.add_argument(
+        '--background-import',
+        action='store_true',
+        dest='background_import',
+        help=f'''
+            • Shows the editor window before the nodes packages are imported.\\
+            • Third-party dependencies of the packages (numpy, cv2, ...) are\\
+            imported on background threads, the packages are then registered\\
+            one after another as they become ready.\\
+            • A project is loaded once all packages are registered.\\
+            ''')
+
+    parser.add_argument(
+        '--lazy-flows',
+        action='store_true',
+        dest='lazy_flows',
+        help=f'''
+            • Loads only the nodes and connections of the flow shown when a\\
+            project is opened, the other flows are loaded once their tab is\\
+            first shown.\\
+            • Until then, their nodes do not run and their data from the\\
+            project is saved unchanged.\\
+            ''')
+
+    parser.add_argument(
+        '--profile-startup',
+        nargs='?',
+        const=str(pathlib.Path(utils.ryven_dir_path()).joinpath('startup_trace.json')),
+        default=Config.profile_startup,
+        dest='profile_startup',
+        metavar='TRACE_FILE',
+        help=f'''
+            • Measures the phases of the startup (Qt init, package imports,\\
+            source code loading, project load, first paint, ...), prints a\\
+            breakdown table and writes a Chrome trace JSON file.\\
+            Default TRACE_FILE: "%(const)s"
+            ''')
+
+    parser.add_argument(
+        '--parallel-workers',
+        type=int,
+        default=Config.parallel_workers,
+        dest='parallel_workers',
+        metavar='N',
+        help=f'''
+            • Executes independent branches of data flows concurrently on\\
+            a pool of N threads.\\
+            • Nodes declaring themselves `gui_bound` or not `thread_safe`\\
+            still run on the GUI thread.\\
+            Default: %(default)s (serial execution)
+            ''')
+
+    parser.add_argument(
+        '--trace-execution',
+        nargs='?',
+        const=str(pathlib.Path(utils.ryven_dir_path()).joinpath('execution_trace.json')),
+        default=Config.trace_execution,
+        dest='trace_execution',
+        metavar='TRACE_FILE',
+        help=f'''
+            • Records the updates and output values of all nodes from the
+            start, see Options > Trace Execution.\\
+            • When tracing is stopped or the editor is closed, the nodes
+            taking the most time are printed and a Chrome trace JSON file is
+            written.\\
+            Default TRACE_FILE: "%(const)s"
+            ''')
+
+    parser.add_argument(
+        '--memory-accounting',
+        nargs='?',
+        const=str(pathlib.Path(utils.ryven_dir_path()).joinpath('memory_report.json')),
+        default=Config.memory_accounting,
+        dest='memory_accounting',
+        metavar='REPORT_FILE',
+        help=f'''
+            • Measures the memory allocated by the updates of all nodes
+            with tracemalloc from the start and shows it, with the retained
+            size of their state, in the node inspector, see
+            Options > Memory Accounting.\\
+            • When accounting is stopped or the editor is closed, the nodes
+            retaining the most memory are printed and a JSON report is
+            written.\\
+            Default REPORT_FILE: "%(const)s"
+            ''')
+
+    parser.add_argument(
+        '--external-payloads',
+        nargs='?',
+        type=int,
+        const=payload_store.DEFAULT_THRESHOLD // 1024,
+        default=Config.external_payloads,
+        dest='external_payloads',
+        metavar='MIN_KIB',
+        help=f'''
+            • When saving a project, data values and node states larger than
+            MIN_KIB are written to the directory "<project>_payloads" next
+            to the project file (numpy arrays as .npy, images as .png) and
+            only referenced from the project.\\
+            • Files are named by their content's hash, identical values are
+            stored once.\\
+            Default MIN_KIB: %(const)s
+            ''')
+
+    parser.add_argument(
+        '--autosave',
+        nargs='?',
+        type=int,
+        const=60,
+        default=Config.autosave,
+        dest='autosave',
+        metavar='SECONDS',
+        help=f'''
+            • Every SECONDS, the flows which changed are journaled to
+            "{pathlib.PurePath(utils.ryven_dir_path(), 'autosave')}", in the
+            background and between periodic snapshots of the project.\\
+            • If the editor exits with unsaved changes, they are recovered
+            to a project file there on the next start of the project with
+            --autosave.\\
+            Default SECONDS: %(const)s
+            ''')
+
+    parser.add_argument(
+        '--dump-project',
+        nargs='?',
+        type=int,
+        const=64,
+        default=Config.dump_project,
+        dest='dump_project',
+        metavar='MAX_KIB',
+        help='''
+            • When saving a project, prints its JSON for debugging, cut off
+            after MAX_KIB KiB.\\
+            • Otherwise, only a summary with the time of every phase and the
+            size of every flow is printed.\\
+            Default MAX_KIB: %(const)s
+            ''')
+
     # Project configuration
 
     group = parser.add_argument_group('project configuration')
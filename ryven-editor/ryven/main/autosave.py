@@ -0,0 +1,132 @@
+"""
+Autosave journal of a project.
+
+The autosave of a project is kept in a directory: a snapshot of the whole
+project (`snapshot.json`) and an append-only journal (`journal.jsonl`) of
+the changes since. A journal record contains the data of the flows which
+changed since the previous record, the undo commands which changed them
+and the small project-wide parts (flow order, addons, required packages,
+window state), so the cost of a record is proportional to what changed.
+Once the journal has enough records, they are merged into a new snapshot.
+
+Snapshots are replaced atomically and records are appended and synced one
+by one, so after a crash the autosave is consistent and at most the last
+record is lost. Encoding and writing happen on a background thread; the
+caller only collects the data.
+
+`recover()` merges snapshot and journal into a project dict, if there were
+changes since the project was last saved.
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from ryven.main.utils import write_atomic
+
+SNAPSHOT = 'snapshot.json'
+JOURNAL = 'journal.jsonl'
+# exists while the autosave contains changes which were not saved
+UNSAVED_MARKER = 'unsaved'
+
+# records after which the journal is merged into a new snapshot
+DEFAULT_COMPACT_RECORDS = 20
+
+
+def merge_record(project: Dict, record: Dict):
+    """Applies a journal record to the project dict."""
+    flows = project.get('flows', {})
+    project['flows'] = {
+        title: record['flows'][title] if title in record['flows'] else flows[title]
+        for title in record['flow order']
+        if title in record['flows'] or title in flows
+    }
+    project.setdefault('flow_uis', {}).update(record['flow_uis'])
+    for key in ('addons', 'required packages', 'geometry', 'state'):
+        if key in record:
+            project[key] = record[key]
+
+
+def recover(directory: str) -> Optional[Dict]:
+    """The autosaved project, None if there is no autosave or it does not
+    contain unsaved changes."""
+    snapshot_path = os.path.join(directory, SNAPSHOT)
+    if not os.path.exists(os.path.join(directory, UNSAVED_MARKER)) or not os.path.exists(snapshot_path):
+        return None
+
+    with open(snapshot_path) as f:
+        project: Dict = json.load(f)
+    journal_path = os.path.join(directory, JOURNAL)
+    if os.path.exists(journal_path):
+        with open(journal_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # the last record was not written completely
+                merge_record(project, record)
+    return project
+
+
+class ProjectJournal:
+    """Writes the autosave of a project to a directory, in the background."""
+
+    def __init__(self, directory: str, compact_records: int = DEFAULT_COMPACT_RECORDS):
+        self.directory = directory
+        self.compact_records = compact_records
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ryven-autosave')
+        # the snapshot with the records merged, only accessed by the background thread
+        self._project: Optional[Dict] = None
+        self._records = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def start(self, project: Dict, saved: bool = True) -> Future:
+        """Replaces the autosave by the project dict, e.g. once the project
+        was loaded or saved. The dict must not be modified afterwards."""
+        return self._executor.submit(self._run, self._write_snapshot, project, saved)
+
+    def append(self, record: Dict) -> Future:
+        """Appends a record of changes. The dict must not be modified
+        afterwards."""
+        return self._executor.submit(self._run, self._append, record)
+
+    def close(self):
+        """Waits until everything is written."""
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _run(f, *args):
+        try:
+            f(*args)
+        except OSError as e:
+            print(f'autosave failed: {e}', file=sys.__stderr__ or sys.stderr)
+
+    def _write_snapshot(self, project: Dict, saved: bool):
+        os.makedirs(self.directory, exist_ok=True)
+        if saved and os.path.exists(self._path(UNSAVED_MARKER)):
+            os.remove(self._path(UNSAVED_MARKER))
+        self._project = project
+        write_atomic(self._path(SNAPSHOT), json.dumps(project))
+        # the records are contained in the snapshot now; if this is not
+        # reached, merging them again on recovery gives the same result
+        open(self._path(JOURNAL), 'w').close()
+        self._records = 0
+
+    def _append(self, record: Dict):
+        if self._project is None:
+            return
+        if not os.path.exists(self._path(UNSAVED_MARKER)):
+            open(self._path(UNSAVED_MARKER), 'w').close()
+        with open(self._path(JOURNAL), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        merge_record(self._project, record)
+        self._records += 1
+        if self._records >= self.compact_records:
+            self._write_snapshot(self._project, saved=False)
@@ -40,6 +40,16 @@ class Config:
     qt_api: str = 'pyside2'
     src_code_edits_enabled: bool = False
     defer_code_loading: bool = False
+    lazy_packages: bool = False
+    background_import: bool = False
+    lazy_flows: bool = False
+    profile_startup: Optional[str] = None  # path of the trace file
+    parallel_workers: int = 0  # 0 means serial execution
+    trace_execution: Optional[str] = None  # path of the trace file
+    memory_accounting: Optional[str] = None  # path of the report file
+    external_payloads: Optional[int] = None  # threshold in KiB, None means inline
+    autosave: Optional[int] = None  # interval in seconds, None means disabled
+    dump_project: Optional[int] = None  # size limit in KiB, None means no dump
 
     @staticmethod
     def get_available_window_themes() -> Set[str]:
@@ -0,0 +1,256 @@
+"""
+Per-node execution tracing.
+
+An `ExecutionTracer` hooks `update_event()`, `set_output_val()` and
+`exec_output()` of every node in a session, including nodes added while it
+is running. Every call is recorded with its timestamp, duration, thread,
+node and flow, and for output values the size of the payload. Records are
+kept in a ring buffer of fixed capacity, so tracing a long session only
+keeps the most recent calls, while the per-node totals cover all of them.
+
+The records can be exported as a Chrome trace (open it in chrome://tracing
+or ui.perfetto.dev). In data mode, updates of successors happen within
+`set_output_val()`, so they are nested in the trace, and the self time of
+a node excludes the updates of other nodes it triggered.
+
+The hooks are instance attributes shadowing the node class' methods (see
+`node_hooks`), so they work with any flow executor and without GUI.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ryvencore import Session, Flow, Node
+from ryvencore.NodePort import NodeOutput
+
+from ryven.main.node_hooks import add_hook, remove_hook
+
+# number of records kept by default
+DEFAULT_CAPACITY = 100_000
+
+# traced node methods
+TRACED_METHODS = ('update_event', 'set_output_val', 'exec_output')
+
+
+def payload_size(payload) -> int:
+    """Approximate size in bytes of an output value."""
+    if payload is None:
+        return 0
+    nbytes = getattr(payload, 'nbytes', None)   # numpy arrays
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(payload, (bytes, bytearray, memoryview, str)):
+        return len(payload)
+    if hasattr(payload, 'getbands') and hasattr(payload, 'size'):   # PIL images
+        width, height = payload.size
+        return int(width * height * len(payload.getbands()))
+    return sys.getsizeof(payload)
+
+
+class ExecutionTracer:
+    """Records the node calls of a session while it is running."""
+
+    def __init__(self, session: Session, capacity: int = DEFAULT_CAPACITY):
+        self.session = session
+        # (method, node, flow title, thread id, start, duration, args)
+        self.records: Deque[Tuple] = deque(maxlen=capacity)
+        # records which did not fit into the ring buffer
+        self.dropped = 0
+        # number of records so far, to detect changes
+        self.num_records = 0
+        # {node: [calls, total time, self time, last self time]} of update_event()
+        self.node_stats: Dict[Node, List] = {}
+        # {output: bytes of all values set}
+        self.output_bytes: Dict[NodeOutput, int] = {}
+        self.thread_names: Dict[int, str] = {}
+        self.running = False
+
+        self._t0 = time.perf_counter()
+        self._stats_lock = threading.Lock()
+        # durations of nested updates, per thread, for the self times
+        self._local = threading.local()
+        # {node: {method: hook}}
+        self._hooked: Dict[Node, Dict] = {}
+        self._flows: List[Flow] = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for f in self.session.flows:
+            self._flow_created(f)
+        self.session.flow_created.sub(self._flow_created)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.session.flow_created.unsub(self._flow_created)
+        for f in self._flows:
+            f.node_added.unsub(self._hook)
+        self._flows.clear()
+        for node in list(self._hooked):
+            self._unhook(node)
+
+    def clear(self):
+        self.records.clear()
+        self.dropped = 0
+        self.num_records = 0
+        with self._stats_lock:
+            self.node_stats.clear()
+            self.output_bytes.clear()
+        self._t0 = time.perf_counter()
+
+    """
+
+    Hooks
+
+    """
+
+    def _flow_created(self, flow: Flow):
+        self._flows.append(flow)
+        flow.node_added.sub(self._hook)
+        for n in flow.nodes:
+            self._hook(n)
+
+    def _hook(self, node: Node):
+        if node in self._hooked:
+            return
+
+        def traced_update_event(update_event, inp=-1):
+            nested = self._nested()
+            nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return update_event(inp)
+            finally:
+                dur = time.perf_counter() - start
+                children = nested.pop()
+                if nested:
+                    nested[-1] += dur
+                self._record('update_event', node, start, dur, {'input': inp})
+                with self._stats_lock:
+                    stats = self.node_stats.setdefault(node, [0, 0.0, 0.0, 0.0])
+                    stats[0] += 1
+                    stats[1] += dur
+                    stats[2] += dur - children
+                    stats[3] = dur - children
+
+        def traced_set_output_val(set_output_val, index, data):
+            size = payload_size(getattr(data, 'payload', data))
+            with self._stats_lock:
+                out = node.outputs[index]
+                self.output_bytes[out] = self.output_bytes.get(out, 0) + size
+            start = time.perf_counter()
+            try:
+                return set_output_val(index, data)
+            finally:
+                self._record('set_output_val', node, start, time.perf_counter() - start,
+                             {'output': index, 'bytes': size})
+
+        def traced_exec_output(exec_output, index):
+            start = time.perf_counter()
+            try:
+                return exec_output(index)
+            finally:
+                self._record('exec_output', node, start, time.perf_counter() - start,
+                             {'output': index})
+
+        self._hooked[node] = dict(zip(
+            TRACED_METHODS, (traced_update_event, traced_set_output_val, traced_exec_output)
+        ))
+        for method, hook in self._hooked[node].items():
+            add_hook(node, method, hook)
+
+    def _unhook(self, node: Node):
+        for method, hook in self._hooked.pop(node).items():
+            remove_hook(node, method, hook)
+
+    def _nested(self) -> List[float]:
+        nested = getattr(self._local, 'nested', None)
+        if nested is None:
+            nested = self._local.nested = []
+        return nested
+
+    def _record(self, method: str, node: Node, start: float, dur: float, args: Dict):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.num_records += 1
+        self.records.append((method, node, node.flow.title, tid, start - self._t0, dur, args))
+
+    def flow_stats(self, flow: Flow) -> Tuple[Dict[Node, Tuple[int, float, float]], Dict[NodeOutput, int]]:
+        """Calls, cumulative and last self time of the flow's nodes, and the
+        bytes set on their outputs."""
+        with self._stats_lock:
+            nodes = {n: (s[0], s[2], s[3]) for n, s in self.node_stats.items() if n.flow is flow}
+            outputs = {o: b for o, b in self.output_bytes.items() if o.node.flow is flow}
+        return nodes, outputs
+
+    """
+
+    Export
+
+    """
+
+    def chrome_trace(self) -> Dict:
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self.thread_names.items()
+        ]
+        for method, node, flow_title, tid, start, dur, args in self.records:
+            trace_events.append({
+                'name': node.title,
+                'cat': method,
+                'ph': 'X',
+                'pid': pid,
+                'tid': tid,
+                'ts': start * 1e6,
+                'dur': dur * 1e6,
+                'args': {
+                    'method': method,
+                    'flow': flow_title,
+                    'node id': node.global_id,
+                    **args,
+                },
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path: str):
+        """Writes the Chrome trace to the file."""
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary_table(self, top: Optional[int] = 20) -> str:
+        """The nodes with the highest self time of their updates."""
+        with self._stats_lock:
+            rows = sorted(self.node_stats.items(), key=lambda item: item[1][2], reverse=True)
+        total = sum(s[2] for _, s in rows) or 1.0
+        if top is not None:
+            rows = rows[:top]
+
+        labels = [f'{n.title} ({n.flow.title}, #{n.global_id})' for n, _ in rows]
+        width = max([len('node')] + [len(label) for label in labels])
+        lines = [
+            f'{"node":<{width}}  {"calls":>6}  {"self ms":>9}  {"total ms":>9}  {"self %":>6}',
+            '-' * (width + 38),
+        ]
+        for label, (_, (calls, total_time, self_time, _)) in zip(labels, rows):
+            lines.append(
+                f'{label:<{width}}  {calls:>6}  {self_time * 1000:9.2f}  '
+                f'{total_time * 1000:9.2f}  {self_time / total * 100:6.1f}'
+            )
+        if self.dropped:
+            lines.append(f'({self.dropped} older records dropped from the trace)')
+        return '\n'.join(lines)
@@ -0,0 +1,113 @@
+"""
+Lazy loading of the flows of a project.
+
+With --lazy-flows, loading a project creates all of its flows, but without
+their nodes and connections. A flow keeps its data from the project until
+it is first needed, in the editor when its tab is first shown, and is then
+loaded like any other flow. Projects with many flows are thereby opened
+about as fast as a single flow.
+
+Until a flow is loaded, its data from the project is saved unchanged.
+"""
+
+from typing import Dict, Iterator, List
+
+from ryvencore import Session, Flow
+
+
+class LazyFlows:
+    """The flows of a session whose nodes and connections were not loaded
+    yet, with their data."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.pending: Dict[Flow, Dict] = {}
+        session.flow_deleted.sub(self._flow_deleted)
+
+    def _flow_deleted(self, flow: Flow):
+        self.pending.pop(flow, None)
+
+    def load_project(self, project: Dict) -> List[Flow]:
+        """Loads the project into the session like ``Session.load()``, but
+        creates the flows without loading their contents."""
+        flows_data = project['flows']
+        if not isinstance(flows_data, dict):
+            # old project formats are loaded directly
+            return self.session.load(project)
+
+        # flows with the general data (ids, algorithm mode) but no contents
+        stubs = {
+            title: {**data, 'nodes': [], 'connections': [], 'output data': []}
+            for title, data in flows_data.items()
+        }
+        flows = self.session.load({**project, 'flows': stubs})
+        for flow, data in zip(flows, flows_data.values()):
+            self.pending[flow] = data
+        return flows
+
+    def is_pending(self, flow: Flow) -> bool:
+        return flow in self.pending
+
+    def load_flow(self, flow: Flow) -> bool:
+        """Loads the nodes and connections of the flow, if they were not loaded
+        yet. Returns whether the flow was loaded."""
+        data = self.pending.pop(flow, None)
+        if data is None:
+            return False
+        flow.load_data = data
+        flow.load_components(data['nodes'], data['connections'], data['output data'])
+        return True
+
+    def load_all(self):
+        for flow in list(self.pending):
+            self.load_flow(flow)
+
+    def pending_node_identifiers(self) -> Iterator[str]:
+        for data in self.pending.values():
+            for node_data in data['nodes']:
+                yield node_data['identifier']
+
+    """
+
+    Serialization
+
+    """
+
+    def flow_data(self, flow: Flow) -> Dict:
+        """The flow's complete data, as the session would serialize it."""
+        data = self.pending.get(flow)
+        if data is None:
+            complete: Dict = self.session.complete_data(flow.data())
+            return complete
+        # the flow got a new id; variables and flow UI states refer to it
+        return {**data, 'GID': flow.global_id}
+
+    def _pending_variables(self) -> Dict[int, Dict]:
+        """The variables of the flows which were not loaded yet, by flow id."""
+        variables = self.session.addons.get('Variables')
+        if variables is None:
+            return {}
+        # the variables of a flow are only created once it is loaded, until
+        # then the addon keeps their data by the flow's previous id
+        return {
+            flow.global_id: variables.flow_vars__pending[flow.prev_global_id]
+            for flow in self.pending
+            if flow.prev_global_id in variables.flow_vars__pending
+        }
+
+    def addons_data(self) -> Dict:
+        """The data of the session's addons, as the session would serialize it."""
+        addons = {name: addon.data() for name, addon in self.session.addons.items()}
+        if 'Variables' in addons:
+            addons['Variables']['custom state'].update(self._pending_variables())
+        return addons
+
+    def complete_project(self, project: Dict):
+        """Replaces the data of flows which were not loaded yet in the
+        session's serialized data by their data from the project."""
+        if not self.pending:
+            return
+        for flow in self.pending:
+            project['flows'][flow.title] = self.flow_data(flow)
+        if 'Variables' in project['addons']:
+            project['addons']['Variables']['custom state'].update(self._pending_variables())
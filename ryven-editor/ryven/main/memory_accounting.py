@@ -0,0 +1,311 @@
+"""
+Per-node memory accounting.
+
+A `MemoryAccountant` hooks `update_event()` of every node in a session,
+including nodes added while it is running, and measures with `tracemalloc`
+how much memory each update allocated: the net change of traced memory
+(what the update left behind) and the peak above the level at its start.
+As with the execution tracer, updates of successors which happen within an
+update are nested, so a node's self allocation excludes them. Allocations
+of nodes running concurrently (see --parallel-workers) are mixed up.
+
+Independent of the updates, the retained size of every node is estimated:
+what its own attributes (e.g. cached images, stored lists, matrices) and
+the values on its outputs hold on to.
+
+For the report, a `tracemalloc` snapshot attributes the live memory to the
+lines of the nodes' source files which allocated it.
+"""
+
+import inspect
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from types import FunctionType, MethodType, ModuleType
+from typing import Callable, Dict, List, Optional, Set
+
+from ryvencore import Session, Flow, Node, Data
+from ryvencore.Base import Base, Event
+
+from ryven.main.execution_trace import payload_size, TRACED_METHODS
+from ryven.main.node_hooks import add_hook, remove_hook
+from ryven.main.utils import format_size
+
+# modules whose objects are not counted as a node's state
+FRAMEWORK_MODULES = ('ryvencore', 'ryvencore_qt', 'qtpy', 'PySide2', 'PySide6', 'PyQt5', 'PyQt6', 'shiboken')
+
+# node attributes which are not part of the node's state, e.g. hooks
+IGNORED_ATTRIBUTES = {'load_data', *TRACED_METHODS}
+
+# object graph depth up to which the retained size is followed
+MAX_DEPTH = 8
+
+
+def retained_size(obj, _seen: Optional[Set[int]] = None, _depth: int = 0) -> int:
+    """Approximate size in bytes of the object and everything it refers to,
+    not counting framework objects like flows, nodes, ports or widgets and
+    objects already seen."""
+    if _seen is None:
+        _seen = set()
+    if obj is None or id(obj) in _seen or _depth > MAX_DEPTH:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, Data):
+        return retained_size(obj.payload, _seen, _depth + 1)
+    if isinstance(obj, (Base, Event, type, ModuleType, FunctionType, MethodType)) \
+            or type(obj).__module__.startswith(FRAMEWORK_MODULES) \
+            or hasattr(obj, 'metaObject'):  # Qt objects of the node's package
+        return 0
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(retained_size(o, _seen, _depth + 1) for o in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            retained_size(k, _seen, _depth + 1) + retained_size(v, _seen, _depth + 1)
+            for k, v in obj.items()
+        )
+
+    size = payload_size(obj)
+    # plain python objects, but not arrays or images which were measured above
+    attributes = getattr(obj, '__dict__', None)
+    if isinstance(attributes, dict) and not hasattr(obj, 'nbytes') and not hasattr(obj, 'getbands'):
+        size += retained_size(attributes, _seen, _depth + 1)
+    return size
+
+
+def node_retained_size(node: Node) -> int:
+    """Retained size of the node's own attributes."""
+    seen: Set[int] = set()
+    return sum(
+        retained_size(v, seen)
+        for k, v in list(node.__dict__.items())
+        if k not in IGNORED_ATTRIBUTES
+    )
+
+
+def outputs_retained_size(node: Node) -> int:
+    """Retained size of the values on the node's outputs."""
+    seen: Set[int] = set()
+    return sum(retained_size(out.val, seen) for out in node.outputs)
+
+
+class MemoryAccountant:
+    """Measures the memory allocated by the node updates of a session while
+    it is running."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        # {node: [updates, allocated, net, last net, peak]} of update_event()
+        # in bytes; allocated sums the positive net changes, peak is the
+        # highest of all updates
+        self.node_stats: Dict[Node, List] = {}
+        self.running = False
+
+        self._stats_lock = threading.Lock()
+        # [traced memory at start, peak so far, net of nested updates] of the
+        # running updates, per thread
+        self._local = threading.local()
+        # {node: hook}
+        self._hooked: Dict[Node, Callable] = {}
+        self._flows: List[Flow] = []
+        # whether tracemalloc was started by this accountant
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for f in self.session.flows:
+            self._flow_created(f)
+        self.session.flow_created.sub(self._flow_created)
+
+    def stop(self):
+        """Removes the hooks. Tracing stays active until the report was
+        written, see `stop_tracing()`."""
+        if not self.running:
+            return
+        self.running = False
+        self.session.flow_created.unsub(self._flow_created)
+        for f in self._flows:
+            f.node_added.unsub(self._hook)
+        self._flows.clear()
+        for node in list(self._hooked):
+            self._unhook(node)
+
+    def stop_tracing(self):
+        """Stops tracemalloc if this accountant started it."""
+        if self._started_tracemalloc and not self.running:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def clear(self):
+        with self._stats_lock:
+            self.node_stats.clear()
+
+    """
+
+    Hooks
+
+    """
+
+    def _flow_created(self, flow: Flow):
+        self._flows.append(flow)
+        flow.node_added.sub(self._hook)
+        for n in flow.nodes:
+            self._hook(n)
+
+    def _hook(self, node: Node):
+        if node in self._hooked:
+            return
+
+        def accounted_update_event(update_event, inp=-1):
+            stack = self._stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current, 0]
+            stack.append(frame)
+            try:
+                return update_event(inp)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                stack.pop()
+                frame[1] = max(frame[1], peak)
+                net = current - frame[0]
+                self_net = net - frame[2]
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], frame[1])
+                    stack[-1][2] += net
+                with self._stats_lock:
+                    stats = self.node_stats.setdefault(node, [0, 0, 0, 0, 0])
+                    stats[0] += 1
+                    stats[1] += max(self_net, 0)
+                    stats[2] += self_net
+                    stats[3] = self_net
+                    stats[4] = max(stats[4], frame[1] - frame[0])
+
+        self._hooked[node] = accounted_update_event
+        add_hook(node, 'update_event', accounted_update_event)
+
+    def _unhook(self, node: Node):
+        remove_hook(node, 'update_event', self._hooked.pop(node))
+
+    def _stack(self) -> List[List[int]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    """
+
+    Report
+
+    """
+
+    def node_info(self, node: Node) -> Dict:
+        """Memory statistics of the node, in bytes."""
+        with self._stats_lock:
+            updates, allocated, net, last, peak = self.node_stats.get(node, (0, 0, 0, 0, 0))
+        return {
+            'updates': updates,
+            'allocated': allocated,
+            'net': net,
+            'last net': last,
+            'peak': peak,
+            'retained state': node_retained_size(node),
+            'retained outputs': outputs_retained_size(node),
+        }
+
+    def node_info_html(self, node: Node) -> str:
+        """The node's statistics for the node inspector."""
+        info = self.node_info(node)
+        rows = ''.join(
+            f'<tr><td>{key}</td><td align="right">&nbsp;&nbsp;'
+            f'{value if key == "updates" else format_size(value)}</td></tr>'
+            for key, value in info.items()
+        )
+        return f'<b>Memory</b><table>{rows}</table>'
+
+    def nodes(self) -> List[Node]:
+        return [n for f in self.session.flows for n in f.nodes]
+
+    def allocation_sites(self, limit: int = 10) -> List[Dict]:
+        """The source lines of node classes holding the most live memory,
+        from a tracemalloc snapshot."""
+        if not tracemalloc.is_tracing():
+            return []
+        files: Set[str] = set()
+        for node in self.nodes():
+            try:
+                file = inspect.getsourcefile(type(node))
+            except TypeError:
+                continue
+            if file is not None:
+                files.add(file)
+        if not files:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, f) for f in files]
+        )
+        return [
+            {
+                'file': stat.traceback[0].filename,
+                'line': stat.traceback[0].lineno,
+                'size': stat.size,
+                'blocks': stat.count,
+            }
+            for stat in snapshot.statistics('lineno')[:limit]
+        ]
+
+    def report(self) -> Dict:
+        return {
+            'nodes': [
+                {
+                    'node': n.title,
+                    'flow': n.flow.title,
+                    'node id': n.global_id,
+                    **self.node_info(n),
+                }
+                for n in self.nodes()
+            ],
+            'allocation sites': self.allocation_sites(),
+        }
+
+    def write(self, path: str):
+        """Writes the report as JSON to the file."""
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def summary_table(self, top: Optional[int] = 20) -> str:
+        """The nodes retaining the most memory, with the allocations of
+        their updates."""
+        rows = [(n, self.node_info(n)) for n in self.nodes()]
+        rows.sort(key=lambda r: r[1]['retained state'] + r[1]['retained outputs'], reverse=True)
+        if top is not None:
+            rows = rows[:top]
+
+        labels = [f'{n.title} ({n.flow.title}, #{n.global_id})' for n, _ in rows]
+        width = max([len('node')] + [len(label) for label in labels])
+        lines = [
+            f'{"node":<{width}}  {"updates":>7}  {"allocated":>10}  {"net":>10}  '
+            f'{"peak":>10}  {"state":>10}  {"outputs":>10}',
+            '-' * (width + 71),
+        ]
+        for label, (_, info) in zip(labels, rows):
+            lines.append(
+                f'{label:<{width}}  {info["updates"]:>7}  {format_size(info["allocated"]):>10}  '
+                f'{format_size(info["net"]):>10}  {format_size(info["peak"]):>10}  '
+                f'{format_size(info["retained state"]):>10}  {format_size(info["retained outputs"]):>10}'
+            )
+        return '\n'.join(lines)
+
@@ -0,0 +1,88 @@
+"""
+Shared hooks of node methods.
+
+Instruments like the execution tracer and the memory accountant wrap
+methods of node instances (e.g. `update_event()`). Instead of replacing the
+instance attributes themselves, they register their hooks here. The
+instance attribute is then a single `HookChain`, which calls the hooks
+around the method. Every instrument removes only its own hooks, in any
+order, and once the last one is removed the previous attribute is restored.
+
+Methods set on a hooked node later on (e.g. node code edited in the editor,
+see `SrcCodeUpdater`) must be set with `set_method()`, which replaces the
+method below the hooks, so they are neither lost while hooked nor reverted
+when the hooks are removed.
+"""
+
+import types
+from typing import Callable, List, Optional
+
+
+class HookChain:
+    """
+    Replaces a method of a node instance and calls the hooks around it. A
+    hook is called as ``hook(call, *args, **kwargs)``, where ``call`` invokes
+    the next hook, or the method after the first hook registered.
+    """
+
+    def __init__(self, node, method: str, prev: Optional[Callable]):
+        self.node = node
+        self.method = method
+        # the instance attribute before hooking, None for the class' method
+        self.prev = prev
+        self.hooks: List[Callable] = []
+
+    def base(self) -> Callable:
+        if self.prev is not None:
+            return self.prev
+        method: Callable = getattr(type(self.node), self.method).__get__(self.node)
+        return method
+
+    def __call__(self, *args, **kwargs):
+        # hooks can be added or removed by other threads meanwhile
+        return self._call(tuple(self.hooks), args, kwargs)
+
+    def _call(self, hooks: tuple, args, kwargs):
+        if not hooks:
+            return self.base()(*args, **kwargs)
+        return hooks[-1](lambda *a, **kw: self._call(hooks[:-1], a, kw), *args, **kwargs)
+
+
+def _chain(node, method: str) -> Optional[HookChain]:
+    attr = getattr(node, '__dict__', {}).get(method)
+    return attr if isinstance(attr, HookChain) else None
+
+
+def add_hook(node, method: str, hook: Callable):
+    """Adds a hook around the node's method, see `HookChain`."""
+    chain = _chain(node, method)
+    if chain is None:
+        chain = HookChain(node, method, node.__dict__.get(method))
+        setattr(node, method, chain)
+    chain.hooks.append(hook)
+
+
+def remove_hook(node, method: str, hook: Callable):
+    """Removes a hook added by `add_hook()`; restores the previous method
+    once no hooks are left."""
+    chain = _chain(node, method)
+    if chain is None or hook not in chain.hooks:
+        return  # the chain was replaced meanwhile
+    chain.hooks.remove(hook)
+    if chain.hooks:
+        return
+    if chain.prev is None:
+        del node.__dict__[method]
+    else:
+        setattr(node, method, chain.prev)
+
+
+def set_method(obj, name: str, func: Callable):
+    """Binds the function as method `name` of the object, below the hooks of
+    that method, if any."""
+    method = types.MethodType(func, obj)
+    chain = _chain(obj, name)
+    if chain is None:
+        setattr(obj, name, method)
+    else:
+        chain.prev = method
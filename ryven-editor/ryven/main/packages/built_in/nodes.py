@@ -21,6 +21,7 @@ class GetVar_Node(NodeBase):
     version = 'v0.2'
 
     title = 'get var'
+    thread_safe = False
     init_inputs = [
         NodeInputType(),
     ]
@@ -59,6 +60,7 @@ class Result_Node(NodeBase):
     version = 'v0.2'
 
     title = 'result'
+    gui_bound = True
     init_inputs = [
         NodeInputType(type_='data'),
     ]
@@ -117,6 +119,7 @@ class SetVar_Node(NodeBase):
     version = 'v0.1'
 
     title = 'set var'
+    thread_safe = False
     init_inputs = [
         NodeInputType(type_='exec'),
         NodeInputType(label='var'),
@@ -181,6 +184,7 @@ class SetVarsPassive_Node(NodeBase):
     version = 'v0.1'
 
     title = 'set vars passive'
+    thread_safe = False
     init_inputs = []
     init_outputs = []
 
@@ -0,0 +1,170 @@
+"""
+Cached discovery of nodes packages.
+
+Finding packages means listing the package roots (Ryven's custom nodes dir,
+the example nodes, ...) and probing each sub-directory for a nodes.py file,
+which is slow on network home directories. The packages found in each root
+are cached in the Ryven dir together with the mtime of the root, so that a
+lookup only needs a single stat per root while the cache is valid.
+
+The mtime of a root changes when packages are added, removed or renamed, but
+not when a nodes.py file is added to or removed from an existing directory.
+Looking up a package by name therefore also checks its nodes.py file, and
+rescans the root if the cache missed it. A full rescan can be run in the
+background with `refresh_in_background()` to catch those changes for the
+lists of packages.
+"""
+
+import json
+import os
+import pathlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from os.path import join
+from typing import Dict, List, Optional, Union
+
+from ryven.main.utils import ryven_dir_path, abs_path_from_package_dir
+
+# bump when the index layout changes, invalidates the cached index
+INDEX_VERSION = 1
+
+# {root dir: {'mtime': int, 'packages': {name: package dir}}}
+_index: Optional[Dict[str, Dict]] = None
+_lock = threading.Lock()
+
+
+def index_path() -> str:
+    return join(ryven_dir_path(), 'cache', 'packages.json')
+
+
+def package_roots() -> List[str]:
+    """The directories searched for packages by name, in order of precedence."""
+    return [
+        join(ryven_dir_path(), 'nodes'),
+        abs_path_from_package_dir('example_nodes'),
+    ]
+
+
+def _root_mtime(root: str) -> Optional[int]:
+    try:
+        return os.stat(root).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan(root: str) -> Dict[str, str]:
+    packages: Dict[str, str] = {}
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError:
+        return packages
+    for entry in entries:
+        if entry.is_dir() and os.path.isfile(join(entry.path, 'nodes.py')):
+            packages[entry.name] = entry.path
+    return packages
+
+
+def _load_index() -> Dict[str, Dict]:
+    global _index
+    if _index is None:
+        try:
+            with open(index_path()) as f:
+                data = json.load(f)
+            _index = data['roots'] if data.get('version') == INDEX_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            _index = {}
+    return _index
+
+
+def _store_index(index: Dict[str, Dict]):
+    path = index_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'roots': index}, f, indent=1)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f'could not store packages index: {e}')
+
+
+def packages_in(root: Union[str, pathlib.Path]) -> Dict[str, str]:
+    """Returns {name: directory} of the packages directly under `root`,
+    from the cache if the root did not change since it was scanned."""
+    root = os.path.normpath(str(root))
+    mtime = _root_mtime(root)
+    with _lock:
+        entry = _load_index().get(root)
+        if entry is not None and mtime is not None and entry['mtime'] == mtime:
+            return dict(entry['packages'])
+
+    packages = _scan(root)
+    with _lock:
+        index = _load_index()
+        if mtime is None:
+            index.pop(root, None)
+        else:
+            index[root] = {'mtime': mtime, 'packages': packages}
+        _store_index(index)
+    return dict(packages)
+
+
+def find_package(pkg_path: pathlib.Path) -> Optional[pathlib.Path]:
+    """Looks for a package given by a relative path in the package roots,
+    e.g. 'std' is found as `<example nodes>/std`."""
+    if pkg_path.is_absolute():
+        return None
+    single_name = len(pkg_path.parts) == 1
+    for root in package_roots():
+        if single_name:
+            directory = packages_in(root).get(pkg_path.name)
+            candidate = pathlib.Path(directory) if directory is not None else pathlib.Path(root, pkg_path)
+            if candidate.joinpath('nodes.py').exists():
+                if directory is None:
+                    # nodes.py was added to an existing directory
+                    refresh([root])
+                return candidate
+            if directory is not None:
+                # nodes.py was removed
+                refresh([root])
+        elif pathlib.Path(root, pkg_path, 'nodes.py').exists():
+            return pathlib.Path(root, pkg_path)
+    return None
+
+
+def refresh(roots: Optional[List[str]] = None) -> bool:
+    """Rescans the roots (default: all package roots and cached roots) and
+    returns whether any of them contained different packages than cached."""
+    with _lock:
+        cached = dict(_load_index())
+    if roots is None:
+        roots = list(dict.fromkeys([os.path.normpath(r) for r in package_roots()] + list(cached)))
+
+    changed = False
+    scanned = {}
+    for root in roots:
+        root = os.path.normpath(root)
+        mtime = _root_mtime(root)
+        packages = _scan(root) if mtime is not None else None
+        entry = cached.get(root)
+        if (entry['packages'] if entry else None) != packages:
+            changed = True
+        scanned[root] = None if packages is None else {'mtime': mtime, 'packages': packages}
+
+    with _lock:
+        index = _load_index()
+        for root, entry in scanned.items():
+            if entry is None:
+                index.pop(root, None)
+            else:
+                index[root] = entry
+        _store_index(index)
+    return changed
+
+
+def refresh_in_background(roots: Optional[List[str]] = None) -> 'Future[bool]':
+    """Runs `refresh()` on a background thread."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='package-discovery')
+    future = executor.submit(refresh, roots)
+    executor.shutdown(wait=False)
+    return future
@@ -0,0 +1,180 @@
+"""
+Prebuilt manifests of nodes packages.
+
+A manifest describes the node types of a nodes package (titles, tags,
+identifiers and port specs) so that Ryven can list them without importing
+the package. Manifests are generated once, in a separate headless python
+process, and cached in the Ryven dir keyed by a hash of the package's
+python files. From a manifest, placeholder node types are created, which
+are replaced by the real ones once the package is imported.
+
+The module can also be run as a script to print the manifest of a package:
+    python -m ryven.main.packages.manifest <package dir>
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from os.path import join
+from typing import Dict, List, Optional, Type
+
+from ryvencore import Node, NodeInputType, NodeOutputType
+
+from ryven.main.packages.nodes_package import NodesPackage
+from ryven.main.utils import ryven_dir_path
+from ryven.main import startup_profile
+
+# bump when the manifest layout changes, invalidates all cached manifests
+MANIFEST_VERSION = 1
+BUILD_TIMEOUT_S = 120.0
+
+
+def manifests_dir() -> str:
+    return join(ryven_dir_path(), 'cache', 'manifests')
+
+
+def package_hash(package: NodesPackage) -> str:
+    """Hash over the paths and contents of all python files in the package."""
+    h = hashlib.sha256(f'manifest v{MANIFEST_VERSION}'.encode())
+    for root, dirs, files in os.walk(package.directory):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if not name.endswith('.py'):
+                continue
+            path = join(root, name)
+            h.update(os.path.relpath(path, package.directory).encode())
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def describe_node_types(node_types: List[Type[Node]]) -> List[Dict]:
+    """Manifest entries of registered node types (identifiers already built)."""
+    return [
+        {
+            'class name': n.__name__,
+            'title': n.title,
+            'tags': list(n.tags),
+            'version': n.version,
+            'doc': n.__doc__,
+            'identifier': n.identifier,
+            'legacy identifiers': list(n.legacy_identifiers),
+            'inputs': [{'label': i.label, 'type': i.type_} for i in n.init_inputs],
+            'outputs': [{'label': o.label, 'type': o.type_} for o in n.init_outputs],
+        }
+        for n in node_types
+    ]
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['RYVEN_MODE'] = 'no-gui'
+    env.pop('QT_API', None)
+    # make the `ryven` package importable from the child, even when not installed
+    ryven_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    paths = [ryven_parent] + [p for p in sys.path if p]
+    env['PYTHONPATH'] = os.pathsep.join(dict.fromkeys(paths))
+    return env
+
+
+def build_manifest(package: NodesPackage) -> Optional[Dict]:
+    """Imports the package headlessly in a separate process and returns its
+    manifest, or None if the package could not be imported."""
+    try:
+        proc = subprocess.run(
+            [sys.executable, '-m', 'ryven.main.packages.manifest', package.directory],
+            capture_output=True,
+            text=True,
+            timeout=BUILD_TIMEOUT_S,
+            env=_child_env(),
+        )
+        manifest: Dict = json.loads(proc.stdout)
+    except Exception as e:
+        print(f'could not build manifest for package {package.name}: {e}')
+        return None
+    if 'error' in manifest:
+        print(f'could not build manifest for package {package.name}: {manifest["error"]}')
+        return None
+    return manifest
+
+
+def load_manifest(package: NodesPackage) -> Optional[Dict]:
+    """Returns the cached manifest of the package, building it first if there
+    is none for the current contents of the package."""
+    with startup_profile.phase(f'load_manifest({package.name})'):
+        digest = package_hash(package)
+        path = join(manifests_dir(), f'{package.name}.json')
+        try:
+            with open(path) as f:
+                cached: Dict = json.load(f)
+            if cached.get('hash') == digest:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+        manifest = build_manifest(package)
+    if manifest is None:
+        return None
+    manifest['hash'] = digest
+    try:
+        os.makedirs(manifests_dir(), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f'could not store manifest for package {package.name}: {e}')
+    return manifest
+
+
+def placeholder_node_types(package: NodesPackage, manifest: Dict) -> List[Type[Node]]:
+    """Creates node types which look like the package's nodes in node lists,
+    but which have to be replaced by the real ones before instantiation."""
+    placeholders = []
+    for entry in manifest['nodes']:
+        placeholders.append(type(entry['class name'], (Node,), {
+            '__doc__': entry['doc'],
+            'title': entry['title'],
+            'tags': entry['tags'],
+            'version': entry['version'],
+            'init_inputs': [NodeInputType(p['label'], p['type']) for p in entry['inputs']],
+            'init_outputs': [NodeOutputType(p['label'], p['type']) for p in entry['outputs']],
+            # the identifier is final; prevents ryvencore from prefixing it again
+            'identifier': entry['identifier'],
+            'identifier_prefix': None,
+            'legacy_identifiers': entry['legacy identifiers'],
+            'lazy_package': package,
+        }))
+    return placeholders
+
+
+def is_placeholder(node_type: Type[Node]) -> bool:
+    return getattr(node_type, 'lazy_package', None) is not None
+
+
+def _main(directory: str):
+    from ryvencore import Session
+    from ryven.main.packages.nodes_package import import_nodes_package
+
+    # node packages may print freely; only the manifest goes to the real stdout
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        package = NodesPackage(directory)
+        node_types, _ = import_nodes_package(package)
+        # builds the identifiers the same way the editor's session does
+        Session(gui=False).register_node_types(node_types)
+        result = {'package': package.name, 'nodes': describe_node_types(node_types)}
+    except BaseException as e:
+        result = {'error': f'{type(e).__name__}: {e}'}
+    finally:
+        sys.stdout = real_stdout
+    real_stdout.write(json.dumps(result))
+    real_stdout.flush()
+
+
+if __name__ == '__main__':
+    os.environ['RYVEN_MODE'] = 'no-gui'
+    _main(sys.argv[1])
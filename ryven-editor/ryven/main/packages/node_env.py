@@ -139,8 +139,13 @@ def export_nodes(
 
 __gui_loaders: list = []
 
+# gui loaders of imported packages which were not run yet, by package name,
+# and the package name of every node type exported by such a package
+__deferred_gui_loaders: Dict[str, List] = {}
+__deferred_gui_packages: Dict[Type[Node], str] = {}
 
-def on_gui_load(func):
+
+def on_gui_load(func=None, *, eager: bool = False):
     """
     Use this decorator to register a function which imports all gui
     modules of the nodes package.
@@ -148,6 +153,10 @@ def on_gui_load(func):
     When Ryven is running in headless mode, this function will not
     be called, and your nodes package should function without any.
 
+    Ryven defers calling the function until the first node of the
+    package is created in a flow. Use `@on_gui_load(eager=True)` if the
+    guis must be loaded together with the package.
+
     Example `nodes.py`:
     ```
     from ryven.node_env import *
@@ -162,7 +171,10 @@ def on_gui_load(func):
         import .gui
     ```
     """
-    __gui_loaders.append(func)
+    if func is None:
+        return lambda f: on_gui_load(f, eager=eager)
+    __gui_loaders.append((func, eager))
+    return func
 
 
 def load_current_guis():
@@ -171,6 +183,47 @@ def load_current_guis():
     """
     if not in_gui_mode():
         return
-    for func in __gui_loaders:
+    for func, _ in __gui_loaders:
         func()
     __gui_loaders.clear()
+
+
+def defer_current_guis(package_name: str, node_types: List[Type[Node]]):
+    """
+    Like `load_current_guis`, but only calls the functions registered with
+    `eager=True`; the others are called by `load_deferred_guis` once a node
+    of the package needs its gui.
+    """
+    if not in_gui_mode():
+        return
+    deferred = []
+    for func, eager in __gui_loaders:
+        if eager:
+            func()
+        else:
+            deferred.append(func)
+    __gui_loaders.clear()
+
+    if deferred:
+        __deferred_gui_loaders.setdefault(package_name, []).extend(deferred)
+        for n in node_types:
+            __deferred_gui_packages[n] = package_name
+
+
+def load_deferred_guis(node_type: Type[Node]) -> List[Type[Node]]:
+    """
+    Calls the deferred gui loaders of the packages the node type (or one
+    of its base classes) comes from, and returns the node types of those
+    packages. Does nothing if they were loaded already.
+    """
+    loaded: List[Type[Node]] = []
+    for cls in node_type.__mro__:
+        pkg = __deferred_gui_packages.get(cls)
+        if pkg is None or pkg not in __deferred_gui_loaders:
+            continue
+        for func in __deferred_gui_loaders.pop(pkg):
+            func()
+        loaded.extend(n for n, p in __deferred_gui_packages.items() if p == pkg)
+    for n in loaded:
+        del __deferred_gui_packages[n]
+    return loaded
@@ -20,7 +20,9 @@ from ryven.main.utils import (
     in_gui_mode,
     load_from_file,
 )
-from ryven.main.packages.node_env import load_current_guis
+from ryven.main.packages.node_env import load_current_guis, defer_current_guis, load_deferred_guis
+from ryven.main.packages import discovery
+from ryven.main import startup_profile
 
 class NodesPackage:
     """
@@ -57,7 +59,7 @@ class NodesPackage:
 
 # should be Tuple[list[Type[Node]], list[Type[Data]] in 3.9+
 def import_nodes_package(
-    package: Optional[NodesPackage] = None, directory: Optional[str] = None
+    package: Optional[NodesPackage] = None, directory: Optional[str] = None, defer_guis: bool = False
 ) -> Tuple[List[Type[Node]], List[Type[Data]]]:
     """Loads node and data classes from a Ryven nodes package and returns both in separate lists.
 
@@ -66,6 +68,9 @@ def import_nodes_package(
 
     :param package: The NodesPackage object.
     :param directory: The path to the directory where the nodes.py file is located, used if package is None.
+    :param defer_guis: Whether the gui loaders of the package (see `on_gui_load`) should only be called before
+        the first node of the package is created, see `load_package_guis`. Loaders registered with `eager=True` are
+        always called right away.
     :return: A tuple containing node types (classes) first, and the data types exported by the package second.
     """
 
@@ -83,24 +88,45 @@ def import_nodes_package(
 
     from ryven import node_env
 
-    node_env.NodesEnvRegistry.current_package = package
-    load_from_file(package.file_path)
+    with startup_profile.phase(f'import_nodes_package({package.name})'):
+        node_env.NodesEnvRegistry.current_package = package
+        with startup_profile.phase('load_from_file'):
+            load_from_file(package.file_path)
 
-    # load guis
-    if in_gui_mode():
-        load_current_guis()
-    
-    node_types, data_types = node_env.NodesEnvRegistry.consume_last_exported_package()
-    
-    # load source codes
-    if in_gui_mode():
-        from ryven.gui.code_editor.codes_storage import register_node_type
-        for node_type in node_types:
-            register_node_type(node_type)
+        node_types, data_types = node_env.NodesEnvRegistry.consume_last_exported_package()
+
+        # load guis
+        if in_gui_mode():
+            with startup_profile.phase('load_current_guis'):
+                if defer_guis:
+                    defer_current_guis(package.name, node_types)
+                else:
+                    load_current_guis()
+
+        # load source codes
+        if in_gui_mode():
+            from ryven.gui.code_editor.codes_storage import register_node_type
+            for node_type in node_types:
+                register_node_type(node_type)
 
     return node_types, data_types
 
 
+def load_package_guis(node_type: Type[Node]) -> List[Type[Node]]:
+    """Loads the deferred guis of the package the node type comes from, see `import_nodes_package`.
+    Returns the node types whose package guis were loaded."""
+
+    node_types = load_deferred_guis(node_type)
+
+    # source codes of the guis are now available
+    if node_types and in_gui_mode():
+        from ryven.gui.code_editor.codes_storage import register_node_type
+        for n in node_types:
+            register_node_type(n)
+
+    return node_types
+
+
 def reload_nodes_package(package: NodesPackage) -> Tuple[List[Type[Node]], List[Type[Data]]]:
     """Reload an already imported nodes package and return fresh node and data types."""
 
@@ -199,16 +225,11 @@ def process_nodes_packages(
                 pkgs.add(NodesPackage(str(pkg_path)))
                 continue
 
-            # Try to find the nodes package in Ryven's custom nodes dir
-            pkg_custom_path = pathlib.Path(ryven_dir_path(), 'nodes', pkg)
-            if pkg_custom_path.joinpath('nodes.py').exists():
-                pkgs.add(NodesPackage(str(pkg_custom_path)))
-                continue
-
-            # Try to find in Ryven's example nodes
-            pkg_example_path = pathlib.Path(abs_path_from_package_dir('example_nodes'), pkg)
-            if pkg_example_path.joinpath('nodes.py').exists():
-                pkgs.add(NodesPackage(str(pkg_example_path)))
+            # Try to find the nodes package in Ryven's custom nodes dir,
+            # then in Ryven's example nodes
+            pkg_found_path = discovery.find_package(pkg_path)
+            if pkg_found_path is not None:
+                pkgs.add(NodesPackage(str(pkg_found_path)))
                 continue
 
             # Package could not be found
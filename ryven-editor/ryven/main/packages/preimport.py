@@ -0,0 +1,76 @@
+"""
+Warming up the third-party dependencies of nodes packages.
+
+Importing heavy libraries (numpy, cv2, PIL, ...) dominates the import time
+of many nodes packages. Those imports do not touch Ryven's registries, so
+they can run on background threads, after which importing the package
+itself on the GUI thread only needs to execute the package's own code.
+"""
+
+import ast
+import importlib
+import importlib.util
+import os
+import sys
+from typing import List, Set
+
+from ryven.main.packages.nodes_package import NodesPackage
+from ryven.main import startup_profile
+
+# imported by Ryven itself or bound to the Qt GUI thread
+EXCLUDED_MODULES = {
+    'ryven', 'ryvencore', 'ryvencore_qt', 'qtpy',
+    'PySide2', 'PySide6', 'PyQt5', 'PyQt6', 'shiboken2', 'shiboken6',
+}
+
+
+def third_party_imports(package: NodesPackage) -> List[str]:
+    """Top-level modules imported at module level by the package's python
+    files, excluding the standard library and the package's own modules."""
+    stdlib: Set[str] = set(getattr(sys, 'stdlib_module_names', ()))
+    local: Set[str] = {package.name}
+    modules: List[str] = []
+
+    for root, dirs, files in os.walk(package.directory):
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        local.update(dirs)
+        for name in files:
+            if not name.endswith('.py'):
+                continue
+            local.add(name[:-3])
+            try:
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    tree = ast.parse(f.read())
+            except (OSError, SyntaxError, ValueError):
+                continue
+            # only module-level imports; imports inside functions (e.g. the
+            # on_gui_load loaders) are deferred on purpose
+            for stmt in tree.body:
+                if isinstance(stmt, ast.Import):
+                    modules.extend(a.name.split('.')[0] for a in stmt.names)
+                elif isinstance(stmt, ast.ImportFrom) and stmt.level == 0 and stmt.module:
+                    modules.append(stmt.module.split('.')[0])
+
+    return [
+        m for m in dict.fromkeys(modules)
+        if m not in local and m not in stdlib and m not in EXCLUDED_MODULES
+    ]
+
+
+def preimport_dependencies(package: NodesPackage) -> List[str]:
+    """Imports the third-party dependencies of the package and returns the
+    ones that were imported. Failures are ignored, they will be reported
+    when the package itself is imported."""
+    imported = []
+    with startup_profile.phase(f'preimport({package.name})'):
+        for name in third_party_imports(package):
+            if name in sys.modules:
+                continue
+            try:
+                if importlib.util.find_spec(name) is None:
+                    continue
+                importlib.import_module(name)
+                imported.append(name)
+            except Exception:
+                pass
+    return imported
@@ -0,0 +1,273 @@
+"""
+Parallel execution of independent branches in data-flow mode.
+
+`DataFlowParallel` replaces ryvencore's data-flow executors. When an
+execution is started (a node is updated or an output is set from outside of
+an execution), the nodes reachable from where it started are scheduled based
+on the connection graph: a node runs once all of its predecessors in the
+execution finished, and nodes which are ready at the same time run
+concurrently on a thread pool. Like in the 'data opt' mode, every node is
+updated once per input which received data, and outputs are propagated only
+after the node's update finished.
+
+Nodes can opt out of running on the pool:
+
+    gui_bound = True        the node accesses its GUI (widgets) directly
+    thread_safe = False     the node accesses shared state (flow variables, ...)
+
+Those nodes run on the thread which started the execution, while the pool
+keeps working on the other branches. Execution events (`updating`,
+`update_error`) are always emitted on that thread as well.
+
+Only threads are used, since nodes cannot be moved to other processes. Nodes
+benefit if their work releases the GIL, which is the case for most numpy,
+OpenCV and PIL operations.
+"""
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from ryvencore import Session, Flow, Node
+from ryvencore.FlowExecutor import DataFlowNaive
+from ryvencore.RC import FlowAlg
+
+# marks the threads of the pools; executions started from within a node
+# running on the pool run serially, so that the pool cannot deadlock
+_pool_thread = threading.local()
+
+
+class DataFlowParallel(DataFlowNaive):
+    """
+    Data-flow executor which runs independent nodes concurrently on a pool.
+    The assumptions for the graph are the same as for 'data opt'.
+    """
+
+    def __init__(self, flow: Flow, pool: ThreadPoolExecutor):
+        super().__init__(flow)
+        self.pool = pool
+
+        # one execution at a time, per flow
+        self.lock = threading.Lock()
+        # the node updating on the current thread, and its updated outputs
+        self.local = threading.local()
+        # {root: (nodes of the execution, waiting counts)}, see `analyze()`
+        self.analysis: Dict[object, Tuple[Set[Node], Dict[Node, int]]] = {}
+
+    # Node.update() =>
+    def update_node(self, node: Node, inp: int):
+        if self.current() is not None:
+            # nested update during an execution
+            super().update_node(node, inp)
+            return
+        with self.lock:
+            self.execute(root_node=node, root_inp=inp)
+
+    # Node.set_output_val() =>
+    def set_output_val(self, node: Node, index: int, data):
+        out = node.outputs[index]
+        if not out.type_ == 'data':
+            return
+
+        current = self.current()
+        if current is None:
+            with self.lock:
+                out.val = data
+                self.execute(root_output=out)
+        elif current[0] is node:
+            out.val = data
+            current[1].add(out)
+        else:
+            # output of a node not updating on this thread, push it immediately
+            super().set_output_val(node, index, data)
+
+    # Node.exec_output() =>
+    def exec_output(self, node: Node, index: int):
+        # rudimentary exec support also in data flows
+        out = node.outputs[index]
+        if not out.type_ == 'exec':
+            return
+
+        current = self.current()
+        if current is None:
+            with self.lock:
+                self.execute(root_output=out)
+        elif current[0] is node:
+            current[1].add(out)
+        else:
+            super().exec_output(node, index)
+
+    """
+
+    Helper methods
+
+    """
+
+    def current(self) -> Optional[Tuple[Node, Set]]:
+        """The node updating on the current thread and its updated outputs,
+        or None if the current thread is not executing this flow."""
+        return getattr(self.local, 'current', None)
+
+    def analyze(self, root) -> Tuple[Set[Node], Dict[Node, int]]:
+        """Returns the nodes reached by an execution starting at the root (a
+        node or an output), and for each of them the number of connections
+        from predecessors in the execution."""
+
+        if self.flow_changed:
+            self.analysis.clear()
+            self.flow_changed = False
+        if root in self.analysis:
+            return self.analysis[root]
+
+        if isinstance(root, Node):
+            root_node = root
+            stack = list(self.flow.node_successors[root])
+        else:
+            root_node = None
+            stack = [inp.node for inp in self.graph[root]]
+
+        nodes: Set[Node] = set()
+        while stack:
+            n = stack.pop()
+            if n in nodes or n is root_node:
+                continue
+            nodes.add(n)
+            stack.extend(self.flow.node_successors[n])
+
+        waiting = {n: 0 for n in nodes}
+        sources = list(nodes) + ([root_node] if root_node is not None else [])
+        for n in sources:
+            for out in n.outputs:
+                for inp in self.graph[out]:
+                    if inp.node in waiting:
+                        waiting[inp.node] += 1
+        if root_node is None:
+            for inp in self.graph[root]:
+                waiting[inp.node] += 1
+
+        self.analysis[root] = (nodes, waiting)
+        return self.analysis[root]
+
+    def run_node(self, node: Node, inputs: List[int]) -> Tuple[Set, List[Exception]]:
+        """Updates the node on the current thread once for every input."""
+        updated: Set = set()
+        errors: List[Exception] = []
+        prev = self.current()
+        self.local.current = (node, updated)
+        try:
+            for inp in inputs:
+                try:
+                    node.update_event(inp)
+                except Exception as e:
+                    errors.append(e)
+        finally:
+            self.local.current = prev
+        return updated, errors
+
+    def run_node_on_pool(self, node: Node, inputs: List[int]) -> Tuple[Set, List[Exception]]:
+        _pool_thread.active = True
+        try:
+            return self.run_node(node, inputs)
+        finally:
+            _pool_thread.active = False
+
+    def execute(self, root_node: Optional[Node] = None, root_inp: int = -1, root_output=None):
+        nodes, waiting = self.analyze(root_node if root_node is not None else root_output)
+        waiting = waiting.copy()
+        # {node: inputs which received data}
+        pending: Dict[Node, List[int]] = {n: [] for n in nodes}
+        ready: Deque[Node] = deque()
+        running: Dict[Future, Node] = {}
+        serial = getattr(_pool_thread, 'active', False)
+
+        def report(node: Node, errors: List[Exception]):
+            # re-raised for the traceback printed by update_err()
+            for e in errors:
+                try:
+                    raise e
+                except Exception as err:
+                    node.update_err(err)
+
+        def complete(node: Node, updated: Set):
+            for out in node.outputs:
+                for inp in self.graph[out]:
+                    s = inp.node
+                    if s not in waiting:
+                        continue
+                    if out in updated:
+                        pending[s].append(s.inputs.index(inp))
+                    waiting[s] -= 1
+                    if waiting[s] == 0:
+                        ready.append(s)
+
+        # updates triggered on this thread while scheduling are nested updates
+        self.local.current = (None, set())
+        try:
+            if root_node is not None:
+                updated, errors = self.run_node(root_node, [root_inp])
+                report(root_node, errors)
+                complete(root_node, updated)
+            else:
+                # the nodes connected to the output are waiting for it
+                for inp in self.graph[root_output]:
+                    pending[inp.node].append(inp.node.inputs.index(inp))
+                    waiting[inp.node] -= 1
+                    if waiting[inp.node] == 0:
+                        ready.append(inp.node)
+
+            while ready or running:
+                while ready:
+                    node = ready.popleft()
+                    inputs = pending[node]
+                    if not inputs or node.block_updates:
+                        complete(node, set())
+                        continue
+
+                    for index in inputs:
+                        node.updating.emit(index)
+
+                    if serial or getattr(node, 'gui_bound', False) or not getattr(node, 'thread_safe', True):
+                        updated, errors = self.run_node(node, inputs)
+                        report(node, errors)
+                        complete(node, updated)
+                    else:
+                        running[self.pool.submit(self.run_node_on_pool, node, inputs)] = node
+
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        node = running.pop(f)
+                        updated, errors = f.result()
+                        report(node, errors)
+                        complete(node, updated)
+        finally:
+            # join the pool also if an error handler raised
+            for f in running:
+                f.result()
+            self.local.current = None
+
+
+def enable_parallel_execution(session: Session, workers: int) -> ThreadPoolExecutor:
+    """Runs the flows of the session, current and future ones, with a
+    `DataFlowParallel` executor in the data-flow modes.
+
+    :param session: The session.
+    :param workers: The number of threads of the pool.
+    :return: The pool.
+    """
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ryven-exec')
+
+    def install(flow: Flow):
+        if flow.alg_mode != FlowAlg.EXEC and not isinstance(flow.executor, DataFlowParallel):
+            flow.executor = DataFlowParallel(flow, pool)
+
+    def flow_created(flow: Flow):
+        install(flow)
+        flow.algorithm_mode_changed.sub(lambda _: install(flow))
+
+    for f in session.flows:
+        flow_created(f)
+    session.flow_created.sub(flow_created)
+
+    return pool
@@ -0,0 +1,220 @@
+"""
+Externalized payloads of saved projects.
+
+Data values and node states are saved as pickles within the project. When
+enabled (see --external-payloads), large values within them are written to
+a directory next to the project file instead, named by the hash of their
+content, so identical values are stored once, also across saves. Payload
+files no longer referenced are removed once the project was saved.
+
+- numpy arrays as .npy, which are memory-mapped (copy-on-write) on load
+- PIL images as .png, whose pixels are read on first access
+- anything else large as .pickle, also arrays of subclasses and images
+  whose mode PNG does not store exactly
+
+In the project, the value is replaced by a small pickle of a reference,
+whose unpickling loads the file, so projects with externalized payloads
+are loaded like any other project. numpy and PIL are only used if the
+saved values are of their types.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import pathlib
+import pickle
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from ryvencore.utils import serialize, deserialize
+
+# values smaller than this many bytes are kept in the project
+DEFAULT_THRESHOLD = 256 * 1024
+
+# suffixes of the payload files
+PAYLOAD_SUFFIXES = ('.npy', '.png', '.pickle')
+
+# image modes which PNG stores exactly
+PNG_MODES = ('1', 'L', 'LA', 'P', 'RGB', 'RGBA')
+
+# names of the payload files
+_PAYLOAD_FILE = re.compile(r'[0-9a-f]{32}(%s)' % '|'.join(re.escape(s) for s in PAYLOAD_SUFFIXES))
+
+# directories of the projects read, where payload directories are searched first
+_project_dirs: List[str] = []
+
+
+def payload_dir_name(project_path: Union[str, pathlib.Path]) -> str:
+    return f'{pathlib.Path(project_path).stem}_payloads'
+
+
+def register_project_dir(project_path: Union[str, pathlib.Path]):
+    """Makes the payloads next to the project file loadable, also if it was
+    moved together with its payload directory."""
+    project_dir = str(pathlib.Path(project_path).resolve().parent)
+    if project_dir in _project_dirs:
+        _project_dirs.remove(project_dir)
+    _project_dirs.insert(0, project_dir)
+
+
+def load_payload(dir_name: str, saved_dir: str, file_name: str):
+    """Loads an externalized payload; called when its reference is unpickled."""
+    candidates = [os.path.join(d, dir_name, file_name) for d in _project_dirs]
+    candidates.append(os.path.join(saved_dir, file_name))
+    path = next((p for p in candidates if os.path.exists(p)), None)
+    if path is None:
+        raise FileNotFoundError(f'externalized payload {file_name} not found in {dir_name}')
+
+    if file_name.endswith('.npy'):
+        import numpy as np
+        return np.load(path, mmap_mode='c')
+    if file_name.endswith('.png'):
+        from PIL import Image
+        return Image.open(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class PayloadRef:
+    """Reference to an externalized payload, pickled in its place."""
+
+    def __init__(self, dir_name: str, saved_dir: str, file_name: str):
+        self.args = (dir_name, saved_dir, file_name)
+
+    def __reduce__(self):
+        return load_payload, self.args
+
+
+"""
+
+Saving
+
+"""
+
+
+class _Externalizer:
+
+    def __init__(self, project_path: Union[str, pathlib.Path], threshold: int):
+        self.dir_name = payload_dir_name(project_path)
+        self.dir = os.path.join(str(pathlib.Path(project_path).resolve().parent), self.dir_name)
+        self.threshold = threshold
+        # names of the payload files referenced by the project
+        self.files: Set[str] = set()
+        self.written = 0
+
+    def _encode(self, obj) -> Optional[Tuple[bytes, str]]:
+        """The file content and suffix for a large value, None if it is
+        small or has no file format."""
+        numpy = sys.modules.get('numpy')
+        # not subclasses like numpy.matrix, which .npy files don't restore;
+        # memory-mapped arrays are those of payloads loaded before
+        if numpy is not None and type(obj) in (numpy.ndarray, numpy.memmap):
+            if obj.nbytes < self.threshold or obj.dtype.hasobject:
+                return None
+            buf = io.BytesIO()
+            numpy.save(buf, numpy.asarray(obj), allow_pickle=False)
+            return buf.getvalue(), '.npy'
+
+        image_module = sys.modules.get('PIL.Image')
+        if image_module is not None and isinstance(obj, image_module.Image):
+            width, height = obj.size
+            if width * height * len(obj.getbands()) < self.threshold \
+                    or obj.mode not in PNG_MODES:
+                return None
+            buf = io.BytesIO()
+            obj.save(buf, format='PNG', compress_level=1)
+            return buf.getvalue(), '.png'
+
+        return None
+
+    def _store(self, content: bytes, suffix: str) -> PayloadRef:
+        file_name = hashlib.sha256(content).hexdigest()[:32] + suffix
+        path = os.path.join(self.dir, file_name)
+        self.files.add(file_name)
+        if not os.path.exists(path):
+            os.makedirs(self.dir, exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self.written += 1
+        return PayloadRef(self.dir_name, self.dir, file_name)
+
+    def _replace(self, obj):
+        """The object with its large arrays and images replaced by
+        references, or the object itself if there were none."""
+        encoded = self._encode(obj)
+        if encoded is not None:
+            return self._store(*encoded)
+
+        if isinstance(obj, list) or type(obj) is tuple:
+            items = [self._replace(v) for v in obj]
+            if any(a is not b for a, b in zip(items, obj)):
+                return type(obj)(items)
+        elif isinstance(obj, dict):
+            items = {k: self._replace(v) for k, v in obj.items()}
+            if any(items[k] is not v for k, v in obj.items()):
+                return items
+        return obj
+
+    def externalize(self, serialized: str) -> str:
+        # a base64 pickle is a third larger than the payload
+        if len(serialized) * 3 // 4 < self.threshold:
+            return serialized
+        try:
+            obj = deserialize(serialized)
+        except Exception:
+            return serialized
+
+        replaced = self._replace(obj)
+        if replaced is obj:
+            # no arrays or images, the pickle as a whole
+            return serialize(self._store(base64.b64decode(serialized), '.pickle'))
+        return serialize(replaced)
+
+    def walk(self, obj):
+        if isinstance(obj, list):
+            return [self.walk(v) for v in obj]
+        if not isinstance(obj, dict):
+            return obj
+        result = {}
+        for key, value in obj.items():
+            if key in ('serialized', 'state data') and isinstance(value, str):
+                result[key] = self.externalize(value)
+            else:
+                result[key] = self.walk(value)
+        return result
+
+
+def externalize_payloads(
+        project: Dict, project_path: Union[str, pathlib.Path], threshold: int = DEFAULT_THRESHOLD
+) -> Tuple[Dict, Set[str], int]:
+    """Copy of the project's dict in which data values and node states
+    holding large values reference them in the payload directory of the
+    project file. Also returns the names of the payload files referenced
+    and the number of files written."""
+    externalizer = _Externalizer(project_path, threshold)
+    return externalizer.walk(project), externalizer.files, externalizer.written
+
+
+def remove_unreferenced_payloads(project_path: Union[str, pathlib.Path], files: Set[str]) -> int:
+    """Removes the payload files of the project file which are not among the
+    files referenced; call it once the project was saved. Returns the number
+    of files removed."""
+    payload_dir = os.path.join(str(pathlib.Path(project_path).resolve().parent), payload_dir_name(project_path))
+    try:
+        names = os.listdir(payload_dir)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for name in names:
+        if name in files or not _PAYLOAD_FILE.fullmatch(name):
+            continue
+        try:
+            os.remove(os.path.join(payload_dir, name))
+            removed += 1
+        except OSError:
+            pass  # e.g. still memory-mapped on Windows
+    return removed
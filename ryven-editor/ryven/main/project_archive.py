@@ -0,0 +1,227 @@
+"""
+Compact project archives.
+
+Besides the plain JSON project files, projects can be saved as archive
+(*.ryvenz): a zip file with the project's JSON as manifest, in which every
+large encoded value, i.e. the pickled states of nodes and data (base64)
+and the saved Qt window and dock states (hex), is replaced by a reference
+to a binary archive member. Identical values are stored once.
+
+Reading an archive only parses the manifest. The referenced members are
+read when the value is first accessed, usually when the node using it is
+loaded, so the project's dict behaves like the one of a JSON project file.
+The archive is opened again for every read, so no file handle is kept, and
+copies or pickles of the dict contain all values.
+"""
+
+import base64
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import zipfile
+from typing import Any, Dict, Union
+
+ARCHIVE_SUFFIX = '.ryvenz'
+
+# name of the archive member containing the project's JSON
+MANIFEST = 'project.json'
+
+# keys of encoded values which are stored as archive members, and their encoding
+ENCODED_KEYS = {
+    'serialized': 'base64',
+    'state data': 'base64',
+    'geometry': 'hex',
+    'state': 'hex',
+}
+
+# values with fewer characters are kept in the manifest
+MIN_MEMBER_SIZE = 1024
+
+# key of member references in the manifest
+MEMBER_REF = '$member'
+
+
+def is_archive(path: Union[str, pathlib.Path]) -> bool:
+    return str(path).endswith(ARCHIVE_SUFFIX) or zipfile.is_zipfile(path)
+
+
+"""
+
+Writing
+
+"""
+
+
+def _decode(value: str, encoding: str) -> bytes:
+    """Raises ValueError if the value is not encoded as expected."""
+    if encoding == 'hex':
+        return bytes.fromhex(value)
+    raw = base64.b64decode(value, validate=True)
+    if len(value) != 4 * ((len(raw) + 2) // 3):
+        raise ValueError('not canonical base64')
+    return raw
+
+
+def _externalize(obj, members: Dict[str, bytes]):
+    """Copy of the project's dict with the large encoded values replaced by
+    member references; the members' contents are added to members."""
+    if isinstance(obj, list):
+        return [_externalize(v, members) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+
+    result: Dict[str, Any] = {}
+    for key, value in obj.items():
+        encoding = ENCODED_KEYS.get(key)
+        if encoding is not None and isinstance(value, str) and len(value) >= MIN_MEMBER_SIZE:
+            try:
+                raw = _decode(value, encoding)
+            except ValueError:
+                result[key] = value
+                continue
+            name = f'members/{hashlib.sha256(raw).hexdigest()[:32]}'
+            members[name] = raw
+            result[key] = {MEMBER_REF: name, 'encoding': encoding}
+        else:
+            result[key] = _externalize(value, members)
+    return result
+
+
+def write_archive(path: Union[str, pathlib.Path], project: Dict):
+    """Writes the project's dict as archive. The file is replaced only
+    once the archive is complete."""
+    members: Dict[str, bytes] = {}
+    manifest = _externalize(project, members)
+
+    tmp_path = f'{path}.tmp'
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            archive.writestr(MANIFEST, json.dumps(manifest, indent=1))
+            for name, raw in members.items():
+                archive.writestr(name, raw)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+"""
+
+Reading
+
+"""
+
+
+class _Members:
+    """The members of an archive, read by opening the archive file again.
+    Members are named by their content, so they can still be read after
+    the project was saved to the same file again, if they were kept."""
+
+    def __init__(self, path: Union[str, pathlib.Path]):
+        self.path = path
+
+    def read(self, ref: Dict) -> str:
+        try:
+            with zipfile.ZipFile(self.path) as archive:
+                raw = archive.read(ref[MEMBER_REF])
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f'could not read {ref[MEMBER_REF]} of the project archive {self.path}: {e}')
+        if ref['encoding'] == 'hex':
+            return raw.hex()
+        return base64.b64encode(raw).decode('ascii')
+
+
+def _is_ref(value) -> bool:
+    return isinstance(value, dict) and MEMBER_REF in value
+
+
+class LazyMembersDict(dict):
+    """A dict of the project whose values stored as archive members are read
+    on first access."""
+
+    def __init__(self, data: Dict, members: _Members):
+        super().__init__(data)
+        self._members = members
+        self._pending = {k for k, v in data.items() if _is_ref(v)}
+
+    def _resolve(self, key):
+        if key in self._pending:
+            super().__setitem__(key, self._members.read(super().__getitem__(key)))
+            self._pending.discard(key)
+
+    def _resolve_all(self):
+        for key in list(self._pending):
+            self._resolve(key)
+
+    def __getitem__(self, key):
+        self._resolve(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._pending.discard(key)
+        super().__setitem__(key, value)
+
+    def __iter__(self):
+        # also makes dict(d) and {**d} use __getitem__()
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        self._resolve(key)
+        self._pending.discard(key)
+        return super().pop(key, *default)
+
+    def items(self):
+        self._resolve_all()
+        return super().items()
+
+    def values(self):
+        self._resolve_all()
+        return super().values()
+
+    def copy(self):
+        self._resolve_all()
+        return dict(self)
+
+    def __eq__(self, other):
+        self._resolve_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        self._resolve_all()
+        return super().__ne__(other)
+
+    # copies and pickles are plain dicts with all values read
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.copy(), memo)
+
+
+def _internalize(obj, members: _Members):
+    if isinstance(obj, list):
+        return [_internalize(v, members) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+
+    data = {k: v if _is_ref(v) else _internalize(v, members) for k, v in obj.items()}
+    if any(_is_ref(v) for v in data.values()):
+        return LazyMembersDict(data, members)
+    return data
+
+
+def read_archive(path: Union[str, pathlib.Path]) -> Dict:
+    """Reads the manifest of the archive and returns the project's dict."""
+    with zipfile.ZipFile(path) as archive:
+        try:
+            manifest = json.loads(archive.read(MANIFEST))
+        except (KeyError, ValueError):
+            raise ValueError(f'{path} is not a Ryven project archive')
+    project: Dict = _internalize(manifest, _Members(os.path.abspath(path)))
+    return project
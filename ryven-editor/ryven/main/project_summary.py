@@ -0,0 +1,77 @@
+"""
+Summaries of saved and loaded projects.
+
+Instead of the project's JSON, saving and loading a project print a short
+summary: the time of every phase and, per flow, the number of nodes and
+connections and the approximate size of its data. The project's JSON can
+still be dumped for debugging with --dump-project, cut off at a size limit.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from ryven.main.utils import format_size
+
+
+def approx_size(obj) -> int:
+    """Approximate size in bytes of the object encoded as compact JSON. Values
+    of an archive's project dict which were not read yet are not read."""
+    if isinstance(obj, str):
+        return len(obj) + 2
+    if isinstance(obj, dict):
+        # dict.items() does not read archive members, see LazyMembersDict
+        return 2 + sum(approx_size(k) + approx_size(v) + 2 for k, v in dict.items(obj))
+    if isinstance(obj, (list, tuple)):
+        return 2 + sum(approx_size(v) + 1 for v in obj)
+    return len(str(obj))
+
+
+def flow_summaries(project: Dict) -> List[Tuple[str, int, int, int]]:
+    """(title, nodes, connections, approximate size) of the project's flows."""
+    flows = project.get('flows', {})
+    return [
+        (title, len(flow.get('nodes', [])), len(flow.get('connections', [])), approx_size(flow))
+        for title, flow in dict.items(flows)
+    ]
+
+
+class ProjectSummary:
+    """Times the phases of saving or loading a project and prints a summary."""
+
+    def __init__(self, action: str, path: Optional[str] = None):
+        self.action = action
+        self.path = path
+        self.phases: List[Tuple[str, float]] = []
+        self.file_size: Optional[int] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t))
+
+    def text(self, project: Dict) -> str:
+        total = sum(t for _, t in self.phases)
+        target = f' {self.path}' if self.path else ''
+        size = f' ({format_size(self.file_size)})' if self.file_size is not None else ''
+        phases = ', '.join(f'{name} {t:.3f} s' for name, t in self.phases)
+        lines = [f'{self.action}{target}{size} in {total:.3f} s: {phases}']
+        for title, nodes, connections, flow_size in flow_summaries(project):
+            lines.append(
+                f'  flow "{title}": {nodes} nodes, {connections} connections, ~{format_size(flow_size)}'
+            )
+        return '\n'.join(lines)
+
+    def print(self, project: Dict):
+        print(self.text(project))
+
+
+def dump_project(data: str, max_size: int):
+    """Prints the project's JSON for debugging, at most max_size characters."""
+    if len(data) > max_size:
+        print(f'{data[:max_size]}\n... ({len(data) - max_size} more characters)')
+    else:
+        print(data)
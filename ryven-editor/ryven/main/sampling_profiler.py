@@ -0,0 +1,168 @@
+"""
+Sampling profiler for the code inside nodes.
+
+While running, a background thread periodically takes the stacks of all
+other threads (`sys._current_frames()`). A sample is attributed to the node
+whose `update_event()` is innermost on the stack, and only the frames from
+there on are kept, so the profile shows where the time goes inside the
+nodes' code. Nothing is hooked, which keeps the overhead for the profiled
+code low and independent of the number of nodes.
+
+The samples can be written as collapsed stacks (one `frame;frame;... count`
+line per stack, with the node as root frame), which flamegraph tools like
+flamegraph.pl, speedscope or inferno read, and summarized per node.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+
+from ryvencore import Session, Flow, Node
+
+# seconds between two samples
+DEFAULT_INTERVAL = 0.005
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _node_label(node: Node) -> str:
+    return f'{node.title} #{node.global_id}'.replace(';', ',')
+
+
+class SamplingProfiler:
+    """Samples the updates of the nodes in the given flows (default: all
+    flows of the session) while it is running."""
+
+    def __init__(self, session: Session, flows: Optional[Iterable[Flow]] = None,
+                 interval: float = DEFAULT_INTERVAL):
+        self.session = session
+        self.flows: Optional[Set[Flow]] = set(flows) if flows is not None else None
+        self.interval = interval
+
+        # {(node label, frame labels from update_event() to the leaf): samples}
+        self.stacks: Counter = Counter()
+        self.node_samples: Counter = Counter()
+        # {node: Counter({innermost frame label: samples})}
+        self.node_leaves: Dict[Node, Counter] = {}
+        # {node: seconds}, the wall time since the previous sampling round
+        # summed over the node's samples; sampling needs the GIL, so rounds
+        # are often much further apart than the interval
+        self.node_time: Dict[Node, float] = {}
+        # samples taken, including those in no node
+        self.num_samples = 0
+        self.num_rounds = 0
+        self.sampled_time = 0.0
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ryven-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            self.num_rounds += 1
+            self.sampled_time += elapsed
+            for tid, frame in sys._current_frames().items():
+                if tid != own_id:
+                    self._sample(frame, elapsed)
+
+    def _sample(self, leaf, elapsed: float):
+        self.num_samples += 1
+        frames = []
+        frame = leaf
+        while frame is not None:
+            frames.append(frame)
+            if frame.f_code.co_name == 'update_event':
+                node = frame.f_locals.get('self')
+                if isinstance(node, Node):
+                    break
+            frame = frame.f_back
+        else:
+            return  # not inside a node
+
+        # include overridden update_event()s calling super()
+        frame = frame.f_back
+        while frame is not None and frame.f_code.co_name == 'update_event' \
+                and frame.f_locals.get('self') is node:
+            frames.append(frame)
+            frame = frame.f_back
+
+        if self.flows is not None and node.flow not in self.flows:
+            return
+
+        labels = tuple(_frame_label(f) for f in reversed(frames))
+        self.stacks[(_node_label(node), labels)] += 1
+        self.node_samples[node] += 1
+        self.node_time[node] = self.node_time.get(node, 0.0) + elapsed
+        self.node_leaves.setdefault(node, Counter())[labels[-1]] += 1
+
+    """
+
+    Export
+
+    """
+
+    def collapsed_stacks(self) -> str:
+        return ''.join(
+            f'{";".join((node,) + frames)} {count}\n'
+            for (node, frames), count in sorted(self.stacks.items())
+        )
+
+    def write(self, path: str):
+        """Writes the collapsed stacks to the file."""
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.collapsed_stacks())
+
+    def summary_table(self, top: Optional[int] = 20) -> str:
+        """The nodes with the most samples, and the function most samples
+        of the node were taken in."""
+        rows = self.node_samples.most_common(top)
+        total = sum(self.node_samples.values()) or 1
+
+        labels = [f'{_node_label(n)} ({n.flow.title})' for n, _ in rows]
+        width = max([len('node')] + [len(label) for label in labels])
+        lines = [
+            f'{"node":<{width}}  {"samples":>7}  {"~ms":>8}  {"%":>5}  hottest function',
+            '-' * (width + 50),
+        ]
+        for label, (node, samples) in zip(labels, rows):
+            leaf, leaf_samples = self.node_leaves[node].most_common(1)[0]
+            lines.append(
+                f'{label:<{width}}  {samples:>7}  {self.node_time[node] * 1000:8.0f}  '
+                f'{samples / total * 100:5.1f}  {leaf} ({leaf_samples / samples * 100:.0f}%)'
+            )
+        spacing = self.sampled_time / self.num_rounds * 1000 if self.num_rounds else 0.0
+        lines.append(
+            f'({self.num_samples} thread stacks sampled, every {spacing:.1f} ms on average, '
+            f'{self.interval * 1000:g} ms requested)'
+        )
+        return '\n'.join(lines)
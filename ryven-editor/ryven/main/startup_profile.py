@@ -0,0 +1,129 @@
+"""
+Startup profiling, enabled with the --profile-startup option.
+
+Phases of the startup are recorded with the `phase()` context manager. Once
+the editor is interactive, `finish()` prints a breakdown table and writes the
+phases as a Chrome trace (open it in chrome://tracing or ui.perfetto.dev).
+All functions are no-ops while profiling is not enabled.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_t0: Optional[float] = None
+_trace_path: Optional[str] = None
+_events: List[Dict] = []
+_depth = threading.local()
+
+
+def start(trace_path: str, t0: Optional[float] = None):
+    """Enables profiling; times are relative to `t0` (default: now)."""
+    global _t0, _trace_path
+    _t0 = time.perf_counter() if t0 is None else t0
+    _trace_path = trace_path
+    _events.clear()
+
+
+def is_enabled() -> bool:
+    return _t0 is not None
+
+
+@contextmanager
+def phase(name: str, category: str = 'startup'):
+    if _t0 is None:
+        yield
+        return
+    depth = getattr(_depth, 'value', 0)
+    _depth.value = depth + 1
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth.value = depth
+        if _t0 is not None:
+            _events.append({
+                'name': name,
+                'cat': category,
+                'ts': start_time - _t0,
+                'dur': time.perf_counter() - start_time,
+                'tid': threading.get_ident(),
+                'depth': depth,
+            })
+
+
+def instant(name: str, category: str = 'startup'):
+    """Records a point in time, e.g. the first paint of the window."""
+    if _t0 is None:
+        return
+    _events.append({
+        'name': name,
+        'cat': category,
+        'ts': time.perf_counter() - _t0,
+        'dur': None,
+        'tid': threading.get_ident(),
+        'depth': 0,
+    })
+
+
+def breakdown_table() -> str:
+    """Phases aggregated by name, in order of their first occurrence."""
+    rows: Dict[str, Dict] = {}
+    for e in sorted(_events, key=lambda e: e['ts']):
+        row = rows.setdefault(e['name'], {'depth': e['depth'], 'calls': 0, 'total': 0.0, 'at': e['ts']})
+        row['calls'] += 1
+        row['total'] += e['dur'] or 0.0
+
+    width = max([len('phase')] + [2 * r['depth'] + len(n) for n, r in rows.items()])
+    lines = [
+        f'{"phase":<{width}}  {"calls":>5}  {"total ms":>9}  {"at ms":>9}',
+        '-' * (width + 31),
+    ]
+    for name, r in rows.items():
+        total = f'{r["total"] * 1000:9.1f}' if r['calls'] and r['total'] else f'{"":>9}'
+        label = '  ' * r['depth'] + name
+        lines.append(f'{label:<{width}}  {r["calls"]:>5}  {total}  {r["at"] * 1000:9.1f}')
+    return '\n'.join(lines)
+
+
+def chrome_trace() -> Dict:
+    pid = os.getpid()
+    trace_events = []
+    for e in _events:
+        event = {
+            'name': e['name'],
+            'cat': e['cat'],
+            'pid': pid,
+            'tid': e['tid'],
+            'ts': e['ts'] * 1e6,
+        }
+        if e['dur'] is None:
+            event.update(ph='i', s='g')
+        else:
+            event.update(ph='X', dur=e['dur'] * 1e6)
+        trace_events.append(event)
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def finish():
+    """Prints the breakdown, writes the trace file and disables profiling."""
+    global _t0
+    if _t0 is None:
+        return
+    total = time.perf_counter() - _t0
+    _t0 = None
+
+    # the editor redirects stdout to its console, the report belongs to the terminal
+    out = sys.__stdout__ or sys.stdout
+    print(f'\nstartup profile ({total * 1000:.1f} ms until interactive)', file=out)
+    print(breakdown_table(), file=out)
+    try:
+        with open(_trace_path, 'w') as f:
+            json.dump(chrome_trace(), f)
+        print(f'startup trace written to {_trace_path}', file=out)
+    except OSError as e:
+        print(f'could not write startup trace: {e}', file=out)
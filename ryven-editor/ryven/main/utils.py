@@ -64,14 +64,19 @@ def load_from_file(
 def read_project(project_path: Union[str, pathlib.Path]) -> Dict:
     """Read the project file and return its dictionary.
 
-    :param project_path: The path to the project file.
+    :param project_path: The path to the project file, a JSON file or a
+        project archive (see :code:`ryven.main.project_archive`).
     :return: The contents of the project file.
     """
     import io
     import json
+    from ryven.main.project_archive import is_archive, read_archive
+    from ryven.main.payload_store import register_project_dir
 
     if isinstance(project_path, io.TextIOWrapper):
         project_dict = json.loads(project_path.read(), strict=False)
+    elif is_archive(project_path):
+        project_dict = read_archive(project_path)
     else:
         with open(project_path) as f:
             import json
@@ -79,6 +84,10 @@ def read_project(project_path: Union[str, pathlib.Path]) -> Dict:
             # for newline when loading the json
             project_dict = json.load(f, strict=False)
 
+    if not isinstance(project_path, io.TextIOWrapper):
+        # externalized payloads are found next to the project file
+        register_project_dir(project_path)
+
     # backward compatibility: translate old project files to current version
     if 'ryven version' not in project_dict['general info'] or \
             Version(project_dict['general info']['ryven version']) <= Version('3.2'):
@@ -92,6 +101,48 @@ def read_project(project_path: Union[str, pathlib.Path]) -> Dict:
     return project_dict
 
 
+def write_atomic(path: Union[str, pathlib.Path], data: Union[str, bytes]):
+    """Writes the file through a temporary file which replaces it once it is
+    complete, so the previous contents survive a failed write.
+    """
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def format_size(size: float) -> str:
+    """The size in bytes, in readable units."""
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
+
+def stop_and_report(instrument, path: str, report_name: str, out=None):
+    """Stops a profiling instrument (execution tracer, sampling profiler or
+    memory accountant), prints its summary table and writes its report file.
+    The memory accountant keeps tracemalloc running until its report is
+    written, which is stopped afterwards.
+    """
+    instrument.stop()
+    print(instrument.summary_table(), file=out)
+    try:
+        instrument.write(path)
+        print(f'{report_name} written to {path}', file=out)
+    except OSError as e:
+        print(f'could not write {report_name}: {e}', file=out)
+    if hasattr(instrument, 'stop_tracing'):
+        instrument.stop_tracing()
+
+
 def translate_project_v3_2_0(p: Dict):
     def max_gid(d: Dict) -> int:
         """Recursively find the maximum GID used in the project.."""
@@ -192,24 +243,21 @@ def find_project(project_path: Union[str, pathlib.Path]) -> Optional[pathlib.Pat
     """Resolves a possibly *~/.ryven/saves/*-relative path to a nodes package to an absolute path.
 
     :param project_path: The path to the project file or the subpath to :code:`ryven_dir_path()/saves`.
-        The file extension '.json' can be omitted.
+        The file extension '.json' or '.ryvenz' can be omitted.
     :return: The absolute and resolved path to the project file, or `None` if it could not be found.
 
     """
+    from ryven.main.project_archive import ARCHIVE_SUFFIX
+
     project_path = pathlib.Path(project_path)
 
-    if project_path.exists():
-        return project_path.resolve()
-    elif project_path.with_suffix('.json').exists():
-        return project_path.with_suffix('.json').resolve()
-    else:
-        project_path = pathlib.Path(ryven_dir_path(), 'saves', project_path)
-        if project_path.exists():
-            return project_path.resolve()
-        elif project_path.with_suffix('.json').exists():
-            return project_path.with_suffix('.json').resolve()
-        else:
-            return None
+    for path in (project_path, pathlib.Path(ryven_dir_path(), 'saves', project_path)):
+        if path.exists():
+            return path.resolve()
+        for suffix in ('.json', ARCHIVE_SUFFIX):
+            if path.with_suffix(suffix).exists():
+                return path.with_suffix(suffix).resolve()
+    return None
 
 
 def find_config_file(cfg_file_path: str) -> Optional[pathlib.Path]:
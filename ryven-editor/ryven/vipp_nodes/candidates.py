@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .code_injection import validate_python, find_node_class_name
+from .sandbox import SandboxBudget, run_sandbox
+
+
+@dataclass
+class Candidate:
+    """One generated node implementation and its validation results."""
+    index: int
+    content: str
+    nodes_py: str = ''
+    gui_py: str = ''
+    class_name: Optional[str] = None
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and self.latency_ms is not None
+
+    def summary(self) -> str:
+        if self.valid:
+            over = ' (over budget)' if self.violations else ''
+            return f'#{self.index + 1} ok, transform {self.latency_ms:.1f} ms{over}'
+        return f'#{self.index + 1} invalid: {self.error}'
+
+
+def parse_generated(content: str) -> Tuple[str, str, Optional[str]]:
+    """Split raw LLM output into (nodes_py, gui_py, class_name).
+    Expects the JSON schema of the prompt template; falls back to the legacy
+    `[nodes.py]` / `[gui.py]` section format."""
+    try:
+        obj = json.loads(content)
+        return (
+            (obj.get('nodes_py') or '').strip(),
+            (obj.get('gui_py') or '').strip(),
+            obj.get('class_name') or None,
+        )
+    except Exception:
+        pass
+    try:
+        nodes_match = re.search(r'^\[nodes\.py\]\s*$([\s\S]*?)(?=^\[gui\.py\]\s*$)', content, re.MULTILINE)
+        gui_match = re.search(r'^\[gui\.py\]\s*$([\s\S]*)\Z', content, re.MULTILINE)
+        if nodes_match and gui_match:
+            return nodes_match.group(1).strip(), gui_match.group(1).strip(), None
+    except Exception:
+        pass
+    return content, '', None
+
+
+def validate_candidate(candidate: Candidate, base_src: str, budget: Optional[SandboxBudget] = None) -> Candidate:
+    """Parse the candidate, then import, instantiate and time `transform()` in
+    the sandbox. Results are written to the candidate, which is returned."""
+    err = validate_python(candidate.nodes_py)
+    if err:
+        candidate.error = f'syntax: {err}'
+        return candidate
+
+    candidate.class_name = find_node_class_name(candidate.nodes_py, candidate.class_name)
+    if candidate.class_name is None:
+        candidate.error = 'no node class found'
+        return candidate
+
+    report = run_sandbox(base_src + '\n' + candidate.nodes_py, candidate.class_name, budget)
+    if not report.ok:
+        candidate.error = report.error
+        return candidate
+    candidate.latency_ms = report.latency_ms
+    candidate.violations = report.violations
+    return candidate
+
+
+def rank_candidates(candidates: List[Candidate]) -> List[Candidate]:
+    """Valid candidates first, fastest `transform()` first; invalid ones keep their order."""
+    return sorted(
+        candidates,
+        key=lambda c: (not c.valid, c.latency_ms if c.valid else 0.0, c.index),
+    )
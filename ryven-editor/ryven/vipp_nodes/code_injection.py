@@ -4,9 +4,13 @@ import ast
 import os
 from typing import Optional, Tuple
 
+from .sandbox import SandboxBudget, SandboxReport, run_sandbox
+from .perf_lint import lint_node_code
+
 
 NODES_MARKER = '### USER NODES END ###'
 GUIS_MARKER = '### USER GUIS END ###'
+VIPP_BASE_END_MARKER = '### VIPP NODES END ###'
 
 
 def get_user_nodes_paths(base_file: str) -> Tuple[str, str, str]:
@@ -31,6 +35,52 @@ def validate_python(code: str) -> Optional[str]:
         return f"{e}"
 
 
+def find_node_class_name(code: str, preferred: Optional[str] = None) -> Optional[str]:
+    """Name of the first class deriving from `ImageNodeBase` or `Node` in `code`."""
+    try:
+        tree = ast.parse(code)
+    except Exception:
+        return None
+    names = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.ClassDef):
+            for b in stmt.bases:
+                base_name = b.id if isinstance(b, ast.Name) else getattr(b, 'attr', None)
+                if base_name in ('ImageNodeBase', 'Node'):
+                    names.append(stmt.name)
+    if preferred in names:
+        return preferred
+    return names[0] if names else None
+
+
+def base_nodes_source(base_file: str) -> str:
+    """Source of user_nodes/nodes.py up to the end of the VIPP base classes
+    (imports and `ImageNodeBase`), which generated code builds on."""
+    nodes_path, _, _ = get_user_nodes_paths(base_file)
+    src = read_text(nodes_path)
+    idx = src.find(VIPP_BASE_END_MARKER)
+    return src[:idx] if idx >= 0 else src
+
+
+def smoke_test_user_node_code(
+    base_file: str, code: str, budget: Optional[SandboxBudget] = None, class_name: Optional[str] = None
+) -> SandboxReport:
+    """Run generated node code in the sandbox on top of the VIPP base classes."""
+    class_name = find_node_class_name(code, class_name)
+    if class_name is None:
+        return SandboxReport(ok=False, error='no node class found')
+    return run_sandbox(base_nodes_source(base_file) + '\n' + code, class_name, budget)
+
+
+def sandbox_refusal(report: SandboxReport, budget: SandboxBudget) -> Optional[str]:
+    """Return None if the code may be injected, otherwise the reason for refusing it."""
+    if not report.ok:
+        return f"Refusing user code: {report.error}"
+    if report.violations and budget.refuse_over_budget:
+        return f"Refusing user code, over budget: {'; '.join(report.violations)}"
+    return None
+
+
 def prepare_block(code: str) -> str:
     """Ensure a trailing newline and an extra separator line for cleanliness."""
     return code + ('' if code.endswith('\n') else '\n') + '\n'
@@ -63,10 +113,24 @@ def insert_before_marker(path: str, marker: str, block: str) -> None:
         append_text(path, block)
 
 
-def insert_user_node_code(base_file: str, code: str) -> Optional[str]:
+def insert_user_node_code(
+    base_file: str, code: str, budget: Optional[SandboxBudget] = None, report: Optional[SandboxReport] = None
+) -> Optional[str]:
+    """Insert node code into user_nodes/nodes.py. If a budget is given, the
+    code is smoke-tested in the sandbox first, unless the report of that test
+    is passed (e.g. from a SandboxWorker), and refused when it fails."""
     err = validate_python(code)
     if err:
         return f"Invalid user code: {err}"
+    if budget is not None:
+        if report is None:
+            report = smoke_test_user_node_code(base_file, code, budget)
+        print(report.describe())
+        err = sandbox_refusal(report, budget)
+        if err:
+            return err
+    for issue in lint_node_code(code):
+        print(f'Performance warning: {issue}')
     nodes_path, _, _ = get_user_nodes_paths(base_file)
     insert_before_marker(nodes_path, NODES_MARKER, prepare_block(code))
     return None
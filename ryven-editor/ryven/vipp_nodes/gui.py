@@ -1,10 +1,16 @@
-from qtpy.QtWidgets import QSlider, QLineEdit, QTextEdit, QPushButton, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox, QSizePolicy, QComboBox, QMessageBox
+from qtpy.QtWidgets import QSlider, QLineEdit, QTextEdit, QPushButton, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox, QSizePolicy, QComboBox, QMessageBox, QCheckBox, QSpinBox
 from qtpy.QtCore import Qt, QThread, Signal
 from ryven.gui_env import *
 from . import nodes
-from .openai_worker import OpenAIWorker
-from .openai_worker_gpt5 import OpenAIWorkerGpt5
-from .code_injection import insert_user_node_code, insert_user_gui_code
+from .openai_worker import OpenAIWorker, chat_completion_params
+from .openai_worker_gpt5 import OpenAIWorkerGpt5, response_params
+from .response_cache import cached_response
+from .code_injection import insert_user_node_code, insert_user_gui_code, base_nodes_source, sandbox_refusal, validate_python
+from .candidates import parse_generated
+from .variants_worker import VariantsWorker, variants_cached
+from .sandbox import SandboxBudget
+from .sandbox_worker import SandboxWorker
+from .perf_lint import lint_node_code, vectorize_node_code, perf_feedback
 import os
 import json
 import re
@@ -58,8 +64,23 @@ class NodeGenerator_MainWidget(NodeMainWidget, QWidget):
     def on_submit(self):
         user_input_code = self.editor.toPlainText()
         user_gui_code = self.gui_editor.toPlainText()
+        err = validate_python(user_input_code)
+        if err:
+            print(f'Invalid user code: {err}')
+            return
+        # Smoke-test in a subprocess from a worker thread, the editor stays responsive
+        self.submit_btn.setEnabled(False)
+        self.submit_btn.setText('Validating...')
+        self._sandbox_worker = SandboxWorker(__file__, user_input_code, SandboxBudget())
+        self._sandbox_worker.finished.connect(
+            lambda report: self.on_sandbox_finished(user_input_code, user_gui_code, report))
+        self._sandbox_worker.start()
+
+    def on_sandbox_finished(self, user_input_code: str, user_gui_code: str, report):
+        self.submit_btn.setEnabled(True)
+        self.submit_btn.setText('Submit')
         try:
-            self.node.append_user_code(user_input_code, user_gui_code)
+            self.node.append_user_code(user_input_code, user_gui_code, report)
         except Exception as e:
             print(e)
 
@@ -168,6 +189,24 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
         self.model_combo = QComboBox(self)
         self.model_combo.addItems(['gpt-4o', 'gpt-5'])
 
+        # Response cache toggle (unchecked bypasses the on-disk cache)
+        self.cache_check = QCheckBox('Use cache', self)
+        self.cache_check.setChecked(True)
+        self.cache_check.setToolTip('Reuse responses for identical prompts from ~/.ryven/cache')
+
+        # Number of candidate implementations requested concurrently
+        self.variants_spin = QSpinBox(self)
+        self.variants_spin.setRange(1, 8)
+        self.variants_spin.setValue(1)
+        self.variants_spin.setToolTip('Generate several candidates in parallel and rank them by correctness and speed')
+
+        # Ranked candidates of the last multi-variant generation
+        self.candidates_combo = QComboBox(self)
+        self.candidates_combo.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.candidates_combo.currentIndexChanged.connect(self.on_candidate_selected)
+        self.candidates_combo.hide()
+        self._candidates = []
+
         # Left: prompt editor + Generate button
         self.prompt_edit = QTextEdit(self)
         self.prompt_edit.setPlaceholderText('Write your prompt here...')
@@ -215,6 +254,25 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
         right_group = QGroupBox('GUI (gui.py)', self)
         right_group.setLayout(right_v)
 
+        # Performance lint report for the generated logic code
+        self.perf_label = QLabel(self)
+        self.perf_label.setWordWrap(True)
+        self.perf_label.setStyleSheet('color: #d08770;')
+        self.vectorize_btn = QPushButton('Apply vectorized rewrite', self)
+        self.vectorize_btn.clicked.connect(self.on_apply_vectorized)
+        self.regen_feedback_btn = QPushButton('Regenerate with feedback', self)
+        self.regen_feedback_btn.clicked.connect(self.on_regenerate_with_feedback)
+        self._perf_issues = []
+        self._perf_rewrite = None
+        self._perf_feedback = ''
+
+        perf_row = QHBoxLayout()
+        perf_row.setContentsMargins(0, 0, 0, 0)
+        perf_row.addWidget(self.perf_label, 1)
+        perf_row.addWidget(self.vectorize_btn, 0)
+        perf_row.addWidget(self.regen_feedback_btn, 0)
+        self._update_perf_report('')
+
         # Row with three panels
         row = QHBoxLayout()
         row.setContentsMargins(0, 0, 0, 0)
@@ -230,8 +288,13 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
         name_row.addWidget(self.name_edit, 1)
         name_row.addWidget(QLabel('Model:', self), 0)
         name_row.addWidget(self.model_combo, 0)
+        name_row.addWidget(self.cache_check, 0)
+        name_row.addWidget(QLabel('Variants:', self), 0)
+        name_row.addWidget(self.variants_spin, 0)
         root.addLayout(name_row)
+        root.addWidget(self.candidates_combo)
         root.addLayout(row)
+        root.addLayout(perf_row)
         self.setLayout(root)
 
     def on_name_changed(self, text: str):
@@ -266,11 +329,35 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
                 .replace('{{USER_PROMPT}}', user_prompt)
             )
 
+            # Performance feedback from the linter, if regenerating
+            if self._perf_feedback:
+                filled += '\n\n' + self._perf_feedback
+                self._perf_feedback = ''
+
             # Print composed prompt for verification
             print('\n=== Composed LLM Prompt Start ===\n')
             print(filled)
             print('\n=== Composed LLM Prompt End ===\n')
 
+            selected_model = 'gpt-5' if self.model_combo.currentText().strip() == 'gpt-5' else 'gpt-4o'
+            temperature = 0.0
+
+            if self.variants_spin.value() > 1:
+                self._generate_variants(filled, selected_model, self.variants_spin.value())
+                return
+
+            # cached responses need no API key
+            use_cache = self.cache_check.isChecked()
+            if use_cache:
+                if selected_model == 'gpt-5':
+                    params = response_params(selected_model)
+                else:
+                    params = chat_completion_params(selected_model, temperature)
+                cached = cached_response(filled, params)
+                if cached is not None:
+                    self.on_llm_finished(cached)
+                    return
+
             api_key = self._get_openai_api_key()
             if not api_key:
                 print('Missing OPENAI_API_KEY (environment or .env).')
@@ -279,17 +366,87 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
             # Launch background worker to call OpenAI API
             self.generate_btn.setEnabled(False)
             self.generate_btn.setText('Generating...')
-            selected_model = self.model_combo.currentText().strip()
             if selected_model == 'gpt-5':
-                self._worker = OpenAIWorkerGpt5(prompt=filled, api_key=api_key, model='gpt-5', temperature=0.0)
+                self._worker = OpenAIWorkerGpt5(prompt=filled, api_key=api_key, model='gpt-5',
+                                                temperature=temperature, use_cache=use_cache)
             else:
-                self._worker = OpenAIWorker(prompt=filled, api_key=api_key, model='gpt-4o', temperature=0.0)
+                self._worker = OpenAIWorker(prompt=filled, api_key=api_key, model='gpt-4o',
+                                            temperature=temperature, use_cache=use_cache)
             self._worker.finished.connect(self.on_llm_finished)
             self._worker.errored.connect(self.on_llm_error)
             self._worker.start()
         except Exception as e:
             print(e)
 
+    def _generate_variants(self, prompt: str, model: str, count: int):
+        use_cache = self.cache_check.isChecked()
+        api_key = self._get_openai_api_key()
+        # cached responses need no API key
+        if not api_key and not (use_cache and variants_cached(prompt, model, count)):
+            print('Missing OPENAI_API_KEY (environment or .env).')
+            return
+        self.generate_btn.setEnabled(False)
+        self.generate_btn.setText(f'Generating 0/{count}...')
+        self._worker = VariantsWorker(
+            prompt=prompt, api_key=api_key or '', base_src=base_nodes_source(__file__), count=count, model=model,
+            use_cache=use_cache,
+        )
+        self._worker.progress.connect(lambda p: self.generate_btn.setText(f'Generating {p}...'))
+        self._worker.finished.connect(self.on_variants_finished)
+        self._worker.errored.connect(self.on_llm_error)
+        self._worker.start()
+
+    def on_variants_finished(self, candidates: list):
+        self.generate_btn.setEnabled(True)
+        self.generate_btn.setText('Generate')
+        self._candidates = candidates
+        self.candidates_combo.blockSignals(True)
+        self.candidates_combo.clear()
+        for c in candidates:
+            self.candidates_combo.addItem(c.summary())
+        self.candidates_combo.blockSignals(False)
+        self.candidates_combo.setVisible(bool(candidates))
+        for c in candidates:
+            print(f'Candidate {c.summary()}')
+        if candidates:
+            self.candidates_combo.setCurrentIndex(0)
+            self.on_candidate_selected(0)
+
+    def on_candidate_selected(self, index: int):
+        if not 0 <= index < len(self._candidates):
+            return
+        c = self._candidates[index]
+        self.logic_edit.setPlainText(c.nodes_py)
+        self.gui_edit.setPlainText(c.gui_py)
+        self._update_perf_report(c.nodes_py)
+
+    def _update_perf_report(self, code: str):
+        self._perf_issues = lint_node_code(code) if code.strip() else []
+        self._perf_rewrite = vectorize_node_code(code) if self._perf_issues else None
+        has_issues = bool(self._perf_issues)
+        if has_issues:
+            self.perf_label.setText(
+                'Performance issues:\n' + '\n'.join(f'• {i}' for i in self._perf_issues))
+            for issue in self._perf_issues:
+                print(f'Performance warning: {issue}')
+        else:
+            self.perf_label.clear()
+        self.perf_label.setVisible(has_issues)
+        self.vectorize_btn.setVisible(self._perf_rewrite is not None)
+        self.regen_feedback_btn.setVisible(has_issues)
+
+    def on_apply_vectorized(self):
+        if self._perf_rewrite is None:
+            return
+        self.logic_edit.setPlainText(self._perf_rewrite)
+        self._update_perf_report(self._perf_rewrite)
+
+    def on_regenerate_with_feedback(self):
+        if not self._perf_issues:
+            return
+        self._perf_feedback = perf_feedback(self._perf_issues)
+        self.on_generate()
+
     def on_llm_finished(self, content: str):
         # Log raw LLM output for inspection
         try:
@@ -298,18 +455,13 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
             print('\n=== LLM Raw Output End ===\n')
         except Exception:
             pass
-        # Parse JSON first (strict mode). Expect keys: class_name, nodes_py, gui_py
-        logic = ''
-        gui = ''
-        try:
-            obj = json.loads(content)
-            logic = (obj.get('nodes_py') or '').strip()
-            gui = (obj.get('gui_py') or '').strip()
-        except Exception:
-            # Fallback to legacy heuristic ONLY if JSON is not returned
-            logic, gui = self._parse_generated(content)
+        # Parse JSON first (strict mode), legacy section format as fallback
+        logic, gui, _ = parse_generated(content)
+        self._candidates = []
+        self.candidates_combo.hide()
         self.logic_edit.setPlainText(logic)
         self.gui_edit.setPlainText(gui)
+        self._update_perf_report(logic)
         self.generate_btn.setEnabled(True)
         self.generate_btn.setText('Generate')
 
@@ -318,17 +470,6 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
         self.generate_btn.setEnabled(True)
         self.generate_btn.setText('Generate')
 
-    def _parse_generated(self, text: str) -> tuple[str, str]:
-        # Legacy fallback splitter retained for non-JSON outputs during development
-        try:
-            nodes_match = re.search(r'^\[nodes\.py\]\s*$([\s\S]*?)(?=^\[gui\.py\]\s*$)', text, re.MULTILINE)
-            gui_match = re.search(r'^\[gui\.py\]\s*$([\s\S]*)\Z', text, re.MULTILINE)
-            if nodes_match and gui_match:
-                return nodes_match.group(1).strip(), gui_match.group(1).strip()
-        except Exception:
-            pass
-        return text, ''
-
     def _get_openai_api_key(self) -> str:
         key = os.environ.get('OPENAI_API_KEY')
         if key:
@@ -367,11 +508,33 @@ class PromptGenerator_MainWidget(NodeMainWidget, QWidget):
             if not code.strip():
                 print('No logic code to create.')
                 return
+            # Smoke-test in a subprocess before touching user_nodes/nodes.py
+            self._sandbox_budget = SandboxBudget()
+            self.create_logic_btn.setEnabled(False)
+            self.create_logic_btn.setText('Validating...')
+            self._sandbox_worker = SandboxWorker(__file__, code, self._sandbox_budget)
+            self._sandbox_worker.finished.connect(lambda report: self.on_sandbox_finished(code, report))
+            self._sandbox_worker.start()
+        except Exception as e:
+            print(e)
+
+    def on_sandbox_finished(self, code: str, report):
+        self.create_logic_btn.setEnabled(True)
+        self.create_logic_btn.setText('Create')
+        try:
+            print(report.describe())
+            err = sandbox_refusal(report, self._sandbox_budget)
+            if err:
+                print(err)
+                return
             err = insert_user_node_code(__file__, code)
             if err:
                 print(err)
                 return
-            print('Logic code inserted into user_nodes/nodes.py')
+            if report.violations:
+                print('Logic code inserted into user_nodes/nodes.py (flagged: over budget)')
+            else:
+                print('Logic code inserted into user_nodes/nodes.py')
         except Exception as e:
             print(e)
 
@@ -2,6 +2,8 @@ from ryven.node_env import *
 import inspect
 import os
 from .code_injection import insert_user_node_code, insert_user_gui_code
+from .sandbox import SandboxBudget, SandboxReport
+from typing import Optional
 
 BACKUP_ON_DELETE = False
 
@@ -21,9 +23,11 @@ class NodeGeneratorNode(Node):
     def __init__(self, params):
         super().__init__(params)
 
-    def append_user_code(self, user_input_code: str, user_gui_code: str = ''):
-        # Insert validated user node code
-        err = insert_user_node_code(__file__, user_input_code)
+    def append_user_code(self, user_input_code: str, user_gui_code: str = '',
+                         report: Optional[SandboxReport] = None):
+        # Insert user node code after a sandboxed smoke test; the GUI runs the
+        # test in a SandboxWorker and passes its report, otherwise it blocks here
+        err = insert_user_node_code(__file__, user_input_code, budget=SandboxBudget(), report=report)
         if err:
             print(err)
             return
@@ -3,54 +3,77 @@ import json
 import urllib.request
 import urllib.error
 from qtpy.QtCore import QThread, Signal
+from .response_cache import cached_request
 
 class OpenAIWorker(QThread):
     finished = Signal(str)
     errored = Signal(str)
 
-    def __init__(self, prompt: str, api_key: str, model: str = 'gpt-4o-mini', temperature: float = 0.0):
+    def __init__(self, prompt: str, api_key: str, model: str = 'gpt-4o-mini', temperature: float = 0.0,
+                 use_cache: bool = True):
         super().__init__()
         self.prompt = prompt
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
+        self.use_cache = use_cache
         print("GPT-4o IN USE")
 
     def run(self):
         try:
-            url = 'https://api.openai.com/v1/chat/completions'
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-            }
-            payload = {
-                'model': self.model,
-                'temperature': self.temperature,
-                'top_p': 1.0,
-                'max_tokens': 1800,
-                'response_format': {'type': 'json_object'},
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are a precise Ryven node code generator. Output ONLY a valid JSON object matching the requested schema.'
-                    },
-                    {'role': 'user', 'content': self.prompt},
-                ],
-            }
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                resp_text = resp.read().decode('utf-8')
-                parsed = json.loads(resp_text)
-                content = parsed.get('choices', [{}])[0].get('message', {}).get('content', '')
-                if not content:
-                    raise RuntimeError('Empty content from OpenAI response')
-                self.finished.emit(content)
+            self.finished.emit(cached_request(
+                self.prompt,
+                chat_completion_params(self.model, self.temperature),
+                lambda: request_chat_completion(self.prompt, self.api_key, self.model, self.temperature),
+                self.use_cache,
+            ))
         except urllib.error.HTTPError as e:
-            try:
-                detail = e.read().decode('utf-8')
-            except Exception:
-                detail = str(e)
-            self.errored.emit(f'HTTPError {e.code}: {detail}')
+            self.errored.emit(describe_http_error(e))
         except Exception as e:
             self.errored.emit(str(e))
+
+
+SYSTEM_MESSAGE = 'You are a precise Ryven node code generator. Output ONLY a valid JSON object matching the requested schema.'
+
+
+def chat_completion_params(model: str = 'gpt-4o-mini', temperature: float = 0.0) -> dict:
+    """Everything a chat completions request sends besides the prompt; also the response cache key."""
+    return {
+        'model': model,
+        'temperature': float(temperature),
+        'top_p': 1.0,
+        'max_tokens': 1800,
+        'response_format': {'type': 'json_object'},
+        'system': SYSTEM_MESSAGE,
+    }
+
+
+def request_chat_completion(prompt: str, api_key: str, model: str = 'gpt-4o-mini', temperature: float = 0.0) -> str:
+    """Blocking chat completions request; returns the message content."""
+    url = 'https://api.openai.com/v1/chat/completions'
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json',
+    }
+    payload = chat_completion_params(model, temperature)
+    payload['messages'] = [
+        {'role': 'system', 'content': payload.pop('system')},
+        {'role': 'user', 'content': prompt},
+    ]
+    data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers=headers, method='POST')
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        resp_text = resp.read().decode('utf-8')
+        parsed = json.loads(resp_text)
+        content: str = parsed.get('choices', [{}])[0].get('message', {}).get('content', '')
+        if not content:
+            raise RuntimeError('Empty content from OpenAI response')
+        return content
+
+
+def describe_http_error(e: urllib.error.HTTPError) -> str:
+    try:
+        detail = e.read().decode('utf-8')
+    except Exception:
+        detail = str(e)
+    return f'HTTPError {e.code}: {detail}'
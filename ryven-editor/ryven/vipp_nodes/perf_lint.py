@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass
+class PerfIssue:
+    line: int
+    kind: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'line {self.line}: {self.message}'
+
+
+PERF_FEEDBACK = (
+    'Performance feedback on a previous attempt (fix these):\n'
+    '{issues}\n'
+    'Do not iterate over pixels in Python (no getpixel/putpixel, img.load() indexing or '
+    'getdata loops). Use PIL built-ins instead: Image.point with lookup tables, '
+    'Image.split/merge, ImageOps, ImageFilter, ImageEnhance, ImageChops.'
+)
+
+
+def _attr_call(node: ast.AST, names: Set[str]) -> Optional[str]:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in names:
+        return node.func.attr
+    return None
+
+
+def _is_range_loop(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.For)
+        and isinstance(node.iter, ast.Call)
+        and isinstance(node.iter.func, ast.Name)
+        and node.iter.func.id == 'range'
+    )
+
+
+class _Linter(ast.NodeVisitor):
+    def __init__(self):
+        self.issues: List[PerfIssue] = []
+        self._seen: Set[Tuple[int, str]] = set()
+        self._loop_depth = 0
+
+    def _add(self, line: int, kind: str, message: str):
+        if (line, kind) in self._seen:
+            return
+        self._seen.add((line, kind))
+        self.issues.append(PerfIssue(line, kind, message))
+
+    def visit_For(self, node: ast.For):
+        if _is_range_loop(node) and any(_is_range_loop(n) for n in ast.walk(node) if n is not node):
+            self._add(node.lineno, 'pixel-loop', 'nested Python loops over image coordinates')
+        if _attr_call(node.iter, {'getdata'}):
+            self._add(node.lineno, 'getdata-loop', 'Python loop over img.getdata()')
+        self._loop_depth += 1
+        self.generic_visit(node)
+        self._loop_depth -= 1
+
+    visit_While = visit_For  # type: ignore
+
+    def visit_Call(self, node: ast.Call):
+        name = _attr_call(node, {'getpixel', 'putpixel'})
+        if name is not None:
+            where = ' inside a loop' if self._loop_depth else ''
+            self._add(node.lineno, name, f'{name}() per-pixel access{where}')
+        elif _attr_call(node, {'load'}) and not node.args and not node.keywords:
+            self._add(node.lineno, 'pixel-access', 'img.load() pixel access object (per-pixel indexing)')
+        self.generic_visit(node)
+
+
+def lint_node_code(code: str) -> List[PerfIssue]:
+    """Detect per-pixel Python anti-patterns in generated node code."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    linter = _Linter()
+    linter.visit(tree)
+    return sorted(linter.issues, key=lambda i: i.line)
+
+
+def perf_feedback(issues: List[PerfIssue]) -> str:
+    """Text appended to the prompt when regenerating with performance feedback."""
+    return PERF_FEEDBACK.format(issues='\n'.join(f'- {i}' for i in issues))
+
+
+#
+# mechanical rewrites
+#
+
+def _pixel_ref(node: ast.AST, coords: Tuple[str, str], accessors: Dict[str, str]) -> Optional[str]:
+    """Image name if `node` reads the pixel at the loop coordinates, i.e.
+    `px[x, y]` with `px = img.load()`, or `img.getpixel((x, y))`."""
+    def is_xy(n: ast.AST) -> bool:
+        return (
+            isinstance(n, ast.Tuple) and len(n.elts) == 2
+            and all(isinstance(e, ast.Name) for e in n.elts)
+            and {e.id for e in n.elts} == set(coords)  # type: ignore
+            and n.elts[0].id != n.elts[1].id  # type: ignore
+        )
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in accessors:
+        if is_xy(node.slice):
+            return accessors[node.value.id]
+    if _attr_call(node, {'getpixel'}) and isinstance(node.func.value, ast.Name):  # type: ignore
+        if len(node.args) == 1 and is_xy(node.args[0]):  # type: ignore
+            return node.func.value.id  # type: ignore
+    return None
+
+
+def _size_names(func: ast.AST) -> Set[str]:
+    """Names bound to image dimensions, e.g. by `w, h = img.size` or `w = img.width`."""
+    names: Set[str] = set()
+    for stmt in ast.walk(func):
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1):
+            continue
+        target, value = stmt.targets[0], stmt.value
+        if isinstance(value, ast.Attribute) and value.attr == 'size' and isinstance(target, ast.Tuple):
+            names.update(e.id for e in target.elts if isinstance(e, ast.Name))
+        elif isinstance(target, ast.Name) and _is_extent(value, set()):
+            names.add(target.id)
+    return names
+
+
+def _is_extent(node: ast.AST, size_names: Set[str]) -> bool:
+    """Whether `node` is a full image dimension (`img.width`, `img.size[1]`, ...)."""
+    if isinstance(node, ast.Name):
+        return node.id in size_names
+    if isinstance(node, ast.Attribute):
+        return node.attr in ('width', 'height')
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Attribute):
+        return node.value.attr == 'size' and isinstance(node.slice, ast.Constant) and node.slice.value in (0, 1)
+    return False
+
+
+def _full_range(loop: ast.For, size_names: Set[str]) -> bool:
+    args = loop.iter.args  # type: ignore
+    return len(args) == 1 and not loop.iter.keywords and _is_extent(args[0], size_names)  # type: ignore
+
+
+def _channel_loop(
+    loop: ast.For, accessors: Dict[str, str], size_names: Set[str]
+) -> Optional[Tuple[str, List[Tuple[str, ast.expr]]]]:
+    """Match
+        for y in range(...):
+            for x in range(...):
+                r, g, b, a = <pixel>
+                <store pixel> = (expr_r, expr_g, expr_b, expr_a)
+    where each expression only depends on its own channel and both loops span
+    the full image. Returns the image name and (channel variable, expression) pairs."""
+    if not (_is_range_loop(loop) and len(loop.body) == 1 and _is_range_loop(loop.body[0])):
+        return None
+    inner = loop.body[0]
+    if not (_full_range(loop, size_names) and _full_range(inner, size_names)):  # type: ignore
+        return None
+    if loop.orelse or inner.orelse or len(inner.body) != 2:  # type: ignore
+        return None
+    if not (isinstance(loop.target, ast.Name) and isinstance(inner.target, ast.Name)):  # type: ignore
+        return None
+    coords = (loop.target.id, inner.target.id)  # type: ignore
+    read, write = inner.body  # type: ignore
+
+    if not (isinstance(read, ast.Assign) and len(read.targets) == 1 and isinstance(read.targets[0], ast.Tuple)):
+        return None
+    chans = read.targets[0].elts
+    if len(chans) != 4 or not all(isinstance(c, ast.Name) for c in chans):
+        return None
+    chan_names = [c.id for c in chans]  # type: ignore
+    img = _pixel_ref(read.value, coords, accessors)
+    if img is None:
+        return None
+
+    if isinstance(write, ast.Assign) and len(write.targets) == 1:
+        if _pixel_ref(write.targets[0], coords, accessors) != img:
+            return None
+        value = write.value
+    elif isinstance(write, ast.Expr) and _attr_call(write.value, {'putpixel'}):
+        call = write.value
+        if not (isinstance(call.func.value, ast.Name) and call.func.value.id == img and len(call.args) == 2):  # type: ignore
+            return None
+        if _pixel_ref(ast.Call(func=ast.Attribute(value=call.func.value, attr='getpixel'),  # type: ignore
+                               args=[call.args[0]], keywords=[]), coords, accessors) != img:  # type: ignore
+            return None
+        value = call.args[1]  # type: ignore
+    else:
+        return None
+    if not (isinstance(value, ast.Tuple) and len(value.elts) == 4):
+        return None
+
+    forbidden = set(coords) | set(chan_names)
+    result = []
+    for chan, expr in zip(chan_names, value.elts):
+        used = {n.id for n in ast.walk(expr) if isinstance(n, ast.Name)}
+        if (used & forbidden) - {chan}:
+            return None
+        if any(_attr_call(n, {'getpixel', 'putpixel', 'load'}) for n in ast.walk(expr)):
+            return None
+        result.append((chan, expr))
+    return img, result
+
+
+def vectorize_node_code(code: str) -> Optional[str]:
+    """Rewrite per-channel pixel loops into `Image.point` calls on the image
+    bands. Returns the rewritten code, or None if no loop could be rewritten."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    lines = code.splitlines()
+    replacements: List[Tuple[int, int, List[str]]] = []
+
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        accessors: Dict[str, str] = {}
+        accessor_stmts: Dict[str, ast.Assign] = {}
+        for stmt in ast.walk(func):
+            if (
+                isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and _attr_call(stmt.value, {'load'})
+                and isinstance(stmt.value.func.value, ast.Name)  # type: ignore
+            ):
+                accessors[stmt.targets[0].id] = stmt.value.func.value.id  # type: ignore
+                accessor_stmts[stmt.targets[0].id] = stmt
+        size_names = _size_names(func)
+        func_replacements = []
+        for stmt in ast.walk(func):
+            if not isinstance(stmt, ast.For):
+                continue
+            match = _channel_loop(stmt, accessors, size_names)
+            if match is None:
+                continue
+            img, channels = match
+            indent = ' ' * stmt.col_offset
+            bands = []
+            for i, (chan, expr) in enumerate(channels):
+                src = ast.unparse(expr)
+                bands.append(f'_bands[{i}]' if src == chan else f'_bands[{i}].point(lambda {chan}: {src})')
+            new = [
+                f'{indent}from PIL import Image as _Image',
+                f'{indent}_bands = {img}.split()',
+                f"{indent}{img} = _Image.merge('RGBA', ({', '.join(bands)}))",
+            ]
+            func_replacements.append((stmt.lineno, stmt.end_lineno or stmt.lineno, new))
+
+        # drop pixel access objects which are not used anymore after the rewrite
+        for name, assign in accessor_stmts.items():
+            if not func_replacements:
+                break
+            still_used = any(
+                isinstance(n, ast.Name) and n.id == name and n is not assign.targets[0]
+                and not any(start <= n.lineno <= end for start, end, _ in func_replacements)
+                for n in ast.walk(func)
+            )
+            if not still_used:
+                func_replacements.append((assign.lineno, assign.end_lineno or assign.lineno, []))
+        replacements.extend(func_replacements)
+
+    if not replacements:
+        return None
+    for start, end, new in sorted(replacements, reverse=True):
+        lines[start - 1:end] = new
+    return '\n'.join(lines) + ('\n' if code.endswith('\n') else '')
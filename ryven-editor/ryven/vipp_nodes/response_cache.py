@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from ryven.main.utils import ryven_dir_path
+
+
+CACHE_DIR_NAME = 'llm_responses'
+MAX_CACHE_BYTES = 50 * 1024 * 1024  # evict least recently used entries beyond this
+
+
+def cache_dir() -> str:
+    """Directory holding cached LLM responses (`~/.ryven/cache/llm_responses`)."""
+    return os.path.join(ryven_dir_path(), 'cache', CACHE_DIR_NAME)
+
+
+def cache_key(prompt: str, params: Dict) -> str:
+    """Content address of a generation request: the filled template and every
+    parameter of the request besides it (model, temperature, token limits, ...)."""
+    payload = json.dumps({'prompt': prompt, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(cache_dir(), f'{key}.json')
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """Return the cached response content for `key`, or None on a miss."""
+    path = _entry_path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    content = entry.get('content') if isinstance(entry, dict) else None
+    if not isinstance(content, str) or not content:
+        return None
+    # refresh the access time so eviction keeps frequently used entries
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return content
+
+
+def store_response(key: str, content: str, params: Optional[Dict] = None) -> None:
+    """Write a response to the cache atomically and evict old entries if needed."""
+    if not content:
+        return
+    directory = cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = _entry_path(key)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'params': params or {}, 'content': content}, f)
+    os.replace(tmp_path, path)
+    evict(MAX_CACHE_BYTES)
+
+
+def cached_response(prompt: str, params: Dict) -> Optional[str]:
+    """The cached response to a generation request, None on a miss."""
+    cached = get_cached_response(cache_key(prompt, params))
+    if cached is not None:
+        print('Using cached LLM response.')
+    return cached
+
+
+def cached_request(prompt: str, params: Dict, request: Callable[[], str], use_cache: bool = True) -> str:
+    """Answer a generation request from the cache, or perform it with
+    `request()` and cache the response. `params` must hold at least
+    everything besides the prompt that `request()` sends."""
+    if not use_cache:
+        return request()
+    cached = cached_response(prompt, params)
+    if cached is not None:
+        return cached
+    content = request()
+    try:
+        store_response(cache_key(prompt, params), content, params)
+    except OSError as e:
+        print(f'Failed to cache LLM response: {e}')
+    return content
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """Delete least recently used entries until the cache fits into `max_bytes`.
+    Returns the number of removed entries."""
+    directory = cache_dir()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+
+    entries = []
+    total = 0
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache() -> None:
+    """Remove all cached responses."""
+    evict(0)
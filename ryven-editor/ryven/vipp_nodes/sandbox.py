@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Default budgets for generated nodes; adjust to taste
+SANDBOX_TIMEOUT_S = 30.0
+SANDBOX_MEMORY_MB = 2048
+MAX_TRANSFORM_MS = 500.0      # per frame, measured on the largest sample image
+MAX_PEAK_MEMORY_MB = 1024.0
+SAMPLE_SIZES: Tuple[Tuple[int, int], ...] = ((256, 256), (1024, 1024))
+TIMING_RUNS = 3
+REFUSE_OVER_BUDGET = False    # False: over-budget code is injected with a warning
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_runner.py')
+
+
+@dataclass
+class SandboxBudget:
+    timeout_s: float = SANDBOX_TIMEOUT_S
+    memory_mb: int = SANDBOX_MEMORY_MB
+    max_transform_ms: float = MAX_TRANSFORM_MS
+    max_peak_mb: float = MAX_PEAK_MEMORY_MB
+    sizes: Tuple[Tuple[int, int], ...] = SAMPLE_SIZES
+    runs: int = TIMING_RUNS
+    refuse_over_budget: bool = REFUSE_OVER_BUDGET
+
+
+@dataclass
+class SandboxReport:
+    """Outcome of a sandboxed smoke run. `ok` is False when the code could not
+    be imported or run at all; `violations` lists exceeded budgets."""
+    ok: bool
+    error: Optional[str] = None
+    latencies_ms: Dict[str, float] = field(default_factory=dict)
+    peak_mb: Optional[float] = None
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        """Latency on the largest sample image."""
+        if not self.latencies_ms:
+            return None
+        return list(self.latencies_ms.values())[-1]
+
+    @property
+    def passed(self) -> bool:
+        return self.ok and not self.violations
+
+    def describe(self) -> str:
+        if not self.ok:
+            return f'Sandbox validation failed: {self.error}'
+        timings = ', '.join(f'{size}: {ms:.1f} ms' for size, ms in self.latencies_ms.items())
+        peak = f', peak {self.peak_mb:.0f} MB' if self.peak_mb is not None else ''
+        text = f'Sandbox validation: {timings}{peak}'
+        if self.violations:
+            text += '\nOver budget: ' + '; '.join(self.violations)
+        return text
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['RYVEN_MODE'] = 'no-gui'
+    env.pop('QT_API', None)
+    # make the `ryven` package importable from the child, even when not installed
+    ryven_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    paths = [ryven_parent] + [p for p in sys.path if p]
+    env['PYTHONPATH'] = os.pathsep.join(dict.fromkeys(paths))
+    return env
+
+
+def run_sandbox(source: str, class_name: str, budget: Optional[SandboxBudget] = None) -> SandboxReport:
+    """Import `source` in a separate python process with time and memory limits,
+    instantiate `class_name` headlessly (RYVEN_MODE=no-gui) and benchmark its
+    `transform()` on synthetic images."""
+    if budget is None:
+        budget = SandboxBudget()
+    request = {
+        'source': source,
+        'class_name': class_name,
+        'sizes': [list(s) for s in budget.sizes],
+        'runs': budget.runs,
+        'memory_mb': budget.memory_mb,
+    }
+    try:
+        proc = subprocess.run(
+            [sys.executable, RUNNER_PATH],
+            input=json.dumps(request),
+            capture_output=True,
+            text=True,
+            timeout=budget.timeout_s,
+            env=_child_env(),
+        )
+    except subprocess.TimeoutExpired:
+        return SandboxReport(ok=False, error=f'timed out after {budget.timeout_s:.0f} s')
+    except Exception as e:
+        return SandboxReport(ok=False, error=f'could not start sandbox: {e}')
+
+    try:
+        result = json.loads(proc.stdout)
+    except ValueError:
+        tail = (proc.stderr or '').strip().splitlines()[-3:]
+        reason = ' | '.join(tail) or f'exit code {proc.returncode}'
+        if 'MemoryError' in (proc.stderr or ''):
+            reason = f'exceeded memory limit of {budget.memory_mb} MB'
+        return SandboxReport(ok=False, error=f'sandbox crashed: {reason}')
+
+    report = SandboxReport(
+        ok=bool(result.get('ok')),
+        error=result.get('error'),
+        latencies_ms=result.get('latency_ms') or {},
+        peak_mb=result.get('peak_mb'),
+    )
+    if report.ok:
+        if report.latency_ms is not None and report.latency_ms > budget.max_transform_ms:
+            report.violations.append(
+                f'transform {report.latency_ms:.0f} ms > {budget.max_transform_ms:.0f} ms')
+        if report.peak_mb is not None and report.peak_mb > budget.max_peak_mb:
+            report.violations.append(
+                f'peak memory {report.peak_mb:.0f} MB > {budget.max_peak_mb:.0f} MB')
+    return report
@@ -0,0 +1,98 @@
+"""
+Executed as a standalone script in a child process by `sandbox.run_sandbox`.
+Reads a JSON request from stdin, imports the candidate source headlessly,
+instantiates the node, times `transform()` on synthetic images and writes a
+JSON report to stdout. Do not import this module.
+"""
+import json
+import os
+import sys
+import time
+
+
+def _limit_memory(memory_mb):
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    limit = int(memory_mb) * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _peak_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _sample_image(size):
+    from PIL import Image
+    r = Image.linear_gradient('L').resize(size)
+    g = r.rotate(90)
+    b = Image.radial_gradient('L').resize(size)
+    a = Image.new('L', size, 255)
+    return Image.merge('RGBA', (r, g, b, a))
+
+
+def _run(request):
+    _limit_memory(request['memory_mb'])
+
+    import types
+    mod = types.ModuleType('vipp_sandbox_candidate')
+    try:
+        exec(compile(request['source'], mod.__name__, 'exec'), mod.__dict__)
+    except BaseException as e:
+        return {'ok': False, 'error': f'import: {type(e).__name__}: {e}'}
+
+    try:
+        from ryvencore import Session
+        session = Session(gui=False)
+        flow = session.create_flow(title=mod.__name__)
+        node = getattr(mod, request['class_name'])((flow, session))
+    except BaseException as e:
+        return {'ok': False, 'error': f'instantiation: {type(e).__name__}: {e}'}
+
+    latencies = {}
+    for w, h in request['sizes']:
+        img = _sample_image((w, h))
+        best = None
+        try:
+            for _ in range(max(1, request['runs'])):
+                t0 = time.perf_counter()
+                out = node.transform(img.copy())
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+        except BaseException as e:
+            return {'ok': False, 'error': f'transform: {type(e).__name__}: {e}', 'peak_mb': _peak_mb()}
+        if out is not None and not (hasattr(out, 'size') and hasattr(out, 'mode')):
+            return {'ok': False, 'error': f'transform returned {type(out).__name__}, expected PIL image'}
+        latencies[f'{w}x{h}'] = best * 1000.0
+
+    return {'ok': True, 'error': None, 'latency_ms': latencies, 'peak_mb': _peak_mb()}
+
+
+def main():
+    # the script's directory is the vipp_nodes package; keep it off the import path
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+    request = json.loads(sys.stdin.read())
+    # node code may print freely; only the report goes to the real stdout
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = _run(request)
+    finally:
+        sys.stdout = real_stdout
+    real_stdout.write(json.dumps(report))
+    real_stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
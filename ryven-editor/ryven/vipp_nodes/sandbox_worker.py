@@ -0,0 +1,21 @@
+from __future__ import annotations
+from typing import Optional
+from qtpy.QtCore import QThread, Signal
+
+from .code_injection import smoke_test_user_node_code
+from .sandbox import SandboxBudget
+
+
+class SandboxWorker(QThread):
+    """Runs `smoke_test_user_node_code` off the GUI thread."""
+
+    finished = Signal(object)   # SandboxReport
+
+    def __init__(self, base_file: str, code: str, budget: Optional[SandboxBudget] = None):
+        super().__init__()
+        self.base_file = base_file
+        self.code = code
+        self.budget = budget
+
+    def run(self):
+        self.finished.emit(smoke_test_user_node_code(self.base_file, self.code, self.budget))
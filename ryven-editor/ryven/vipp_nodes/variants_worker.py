@@ -0,0 +1,82 @@
+from __future__ import annotations
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+from qtpy.QtCore import QThread, Signal
+
+from .openai_worker import request_chat_completion, chat_completion_params, describe_http_error
+from .openai_worker_gpt5 import request_response, response_params
+from .response_cache import cached_request, cache_key, get_cached_response
+from .candidates import Candidate, parse_generated, validate_candidate, rank_candidates
+
+
+MAX_POOL_WORKERS = 4
+VARIANT_TEMPERATURE = 0.7  # the first variant stays deterministic, the others explore
+
+
+def variant_params(model: str, index: int) -> dict:
+    """The parameters of the request of a variant, also its response cache key."""
+    if model == 'gpt-5':
+        params = response_params(model)
+    else:
+        params = chat_completion_params(model, 0.0 if index == 0 else VARIANT_TEMPERATURE)
+    if index > 0:
+        # the sampled variants of the same request are cached separately;
+        # the first one shares its entry with the single-shot generation
+        params['variant'] = index
+    return params
+
+
+def variants_cached(prompt: str, model: str, count: int) -> bool:
+    """Whether the responses of all variants are cached."""
+    return all(get_cached_response(cache_key(prompt, variant_params(model, i))) is not None for i in range(count))
+
+
+class VariantsWorker(QThread):
+    """Requests several candidate implementations concurrently on a bounded
+    thread pool, validates each one and emits them ranked (see `rank_candidates`)."""
+
+    finished = Signal(object)   # List[Candidate], ranked
+    progress = Signal(str)
+    errored = Signal(str)
+
+    def __init__(self, prompt: str, api_key: str, base_src: str, count: int,
+                 model: str = 'gpt-4o', max_workers: int = MAX_POOL_WORKERS, use_cache: bool = True):
+        super().__init__()
+        self.prompt = prompt
+        self.api_key = api_key
+        self.base_src = base_src
+        self.count = max(1, count)
+        self.model = model
+        self.max_workers = max(1, min(max_workers, self.count))
+        self.use_cache = use_cache
+
+    def _generate(self, index: int) -> Candidate:
+        params = variant_params(self.model, index)
+        if self.model == 'gpt-5':
+            request = lambda: request_response(self.prompt, self.api_key, self.model)
+        else:
+            request = lambda: request_chat_completion(self.prompt, self.api_key, self.model, params['temperature'])
+        try:
+            content = cached_request(self.prompt, params, request, self.use_cache)
+        except urllib.error.HTTPError as e:
+            return Candidate(index=index, content='', error=describe_http_error(e))
+        except Exception as e:
+            return Candidate(index=index, content='', error=f'request: {e}')
+
+        nodes_py, gui_py, class_name = parse_generated(content)
+        candidate = Candidate(index=index, content=content, nodes_py=nodes_py, gui_py=gui_py, class_name=class_name)
+        return validate_candidate(candidate, self.base_src)
+
+    def run(self):
+        try:
+            results: List[Candidate] = []
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='vipp-variant') as pool:
+                futures = [pool.submit(self._generate, i) for i in range(self.count)]
+                for fut in as_completed(futures):
+                    c = fut.result()
+                    results.append(c)
+                    self.progress.emit(f'{len(results)}/{self.count}')
+            self.finished.emit(rank_candidates(results))
+        except Exception as e:
+            self.errored.emit(str(e))
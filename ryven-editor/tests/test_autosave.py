@@ -0,0 +1,84 @@
+import json
+import os
+
+from ryven.main.autosave import ProjectJournal, recover, merge_record, JOURNAL, SNAPSHOT
+
+
+def project(*flows):
+    return {
+        'flows': {title: {'nodes': [], 'value': 0} for title in flows},
+        'flow_uis': {title: {} for title in flows},
+        'addons': {},
+    }
+
+
+def record(flows, order, **kwargs):
+    return {'flows': flows, 'flow order': order, 'flow_uis': {t: {} for t in flows}, **kwargs}
+
+
+def write(directory, snapshot, records, saved=True, compact_records=20):
+    journal = ProjectJournal(str(directory), compact_records)
+    journal.start(snapshot, saved)
+    for r in records:
+        journal.append(r)
+    journal.close()
+
+
+def test_no_recovery_without_unsaved_changes(tmp_path):
+    write(tmp_path, project('a'), [])
+    assert recover(str(tmp_path)) is None
+    assert recover(str(tmp_path / 'missing')) is None
+
+
+def test_recovers_records_merged_into_snapshot(tmp_path):
+    records = [
+        record({'a': {'nodes': [], 'value': 1}}, ['a', 'b']),
+        record({'b': {'nodes': [], 'value': 2}}, ['b', 'a'], addons={'x': 1}),
+    ]
+    write(tmp_path, project('a', 'b'), records)
+
+    recovered = recover(str(tmp_path))
+    assert list(recovered['flows']) == ['b', 'a']
+    assert recovered['flows']['a']['value'] == 1
+    assert recovered['flows']['b']['value'] == 2
+    assert recovered['addons'] == {'x': 1}
+
+
+def test_removed_flow_is_dropped(tmp_path):
+    write(tmp_path, project('a', 'b'), [record({}, ['b'])])
+    assert list(recover(str(tmp_path))['flows']) == ['b']
+
+
+def test_incomplete_last_record_is_ignored(tmp_path):
+    write(tmp_path, project('a'), [record({'a': {'nodes': [], 'value': 1}}, ['a'])])
+    with open(tmp_path / JOURNAL, 'a') as f:
+        f.write(json.dumps(record({'a': {'nodes': [], 'value': 2}}, ['a']))[:20])
+
+    assert recover(str(tmp_path))['flows']['a']['value'] == 1
+
+
+def test_compaction_keeps_the_changes(tmp_path):
+    records = [record({'a': {'nodes': [], 'value': i}}, ['a']) for i in range(1, 6)]
+    write(tmp_path, project('a'), records, compact_records=2)
+
+    with open(tmp_path / SNAPSHOT) as f:
+        assert json.load(f)['flows']['a']['value'] == 4
+    with open(tmp_path / JOURNAL) as f:
+        assert len(f.readlines()) == 1
+    assert recover(str(tmp_path))['flows']['a']['value'] == 5
+
+
+def test_saving_discards_the_changes(tmp_path):
+    write(tmp_path, project('a'), [record({'a': {'nodes': [], 'value': 1}}, ['a'])])
+    saved = recover(str(tmp_path))
+    write(tmp_path, saved, [])
+
+    assert recover(str(tmp_path)) is None
+    assert os.path.getsize(tmp_path / JOURNAL) == 0
+
+
+def test_merge_record_keeps_unchanged_flows():
+    p = project('a', 'b')
+    merge_record(p, record({'b': {'nodes': [], 'value': 3}}, ['a', 'b']))
+    assert p['flows']['a'] == {'nodes': [], 'value': 0}
+    assert p['flows']['b']['value'] == 3
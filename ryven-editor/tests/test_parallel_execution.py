@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+from ryvencore import Session, Node, NodeInputType, NodeOutputType, Data
+
+from ryven.main.parallel_execution import DataFlowParallel, enable_parallel_execution
+
+
+class Source(Node):
+    title = 'source'
+    init_outputs = [NodeOutputType()]
+
+    def update_event(self, inp=-1):
+        self.flow.log.append(('source', inp))
+        self.set_output_val(0, Data(1))
+
+
+class Branch(Node):
+    """Waits for the other branch, so both must run concurrently."""
+    title = 'branch'
+    init_inputs = [NodeInputType()]
+    init_outputs = [NodeOutputType()]
+
+    def update_event(self, inp=-1):
+        self.flow.barrier.wait()
+        time.sleep(0.01)
+        self.flow.log.append(('branch', inp))
+        self.set_output_val(0, Data(self.input(0).payload + 1))
+
+
+class Failing(Node):
+    title = 'failing'
+    init_inputs = [NodeInputType()]
+    init_outputs = [NodeOutputType()]
+
+    def update_event(self, inp=-1):
+        raise ValueError('update failed')
+
+
+class Sink(Node):
+    title = 'sink'
+    init_inputs = [NodeInputType(), NodeInputType()]
+
+    def update_event(self, inp=-1):
+        self.flow.log.append(('sink', inp, threading.current_thread().name))
+
+
+class GuiBoundSink(Sink):
+    title = 'gui bound sink'
+    gui_bound = True
+
+
+@pytest.fixture
+def flow():
+    session = Session()
+    session.register_node_types([Source, Branch, Failing, Sink, GuiBoundSink])
+    pool = enable_parallel_execution(session, 4)
+    flow = session.create_flow('main')
+    flow.set_algorithm_mode('data')
+    flow.log = []
+    yield flow
+    pool.shutdown()
+
+
+def diamond(flow, branch_classes, sink_class=Sink):
+    source = flow.create_node(Source)
+    branches = [flow.create_node(c) for c in branch_classes]
+    sink = flow.create_node(sink_class)
+    for i, b in enumerate(branches):
+        flow.connect_nodes(source.outputs[0], b.inputs[0])
+        flow.connect_nodes(b.outputs[0], sink.inputs[i])
+    # connecting already updated the nodes
+    flow.log.clear()
+    flow.barrier = threading.Barrier(len(branch_classes), timeout=5)
+    return source, branches, sink
+
+
+def test_executor_installed(flow):
+    assert isinstance(flow.executor, DataFlowParallel)
+
+
+def test_successor_runs_after_concurrent_branches(flow):
+    source, _, sink = diamond(flow, [Branch, Branch])
+    source.update()
+
+    assert [entry[0] for entry in flow.log] == ['source', 'branch', 'branch', 'sink', 'sink']
+    # once per input which received data
+    assert sorted(entry[1] for entry in flow.log if entry[0] == 'sink') == [0, 1]
+    assert [sink.input(i).payload for i in range(2)] == [2, 2]
+
+
+def test_gui_bound_node_runs_on_calling_thread(flow):
+    source, _, _ = diamond(flow, [Branch, Branch], GuiBoundSink)
+    source.update()
+
+    threads = {entry[2] for entry in flow.log if entry[0] == 'sink'}
+    assert threads == {threading.current_thread().name}
+
+
+def test_error_is_reported_and_other_branch_continues(flow):
+    source, (failing, _), sink = diamond(flow, [Failing, Branch])
+    flow.barrier = threading.Barrier(1)
+    errors = []
+    failing.update_error.sub(lambda e: errors.append((e, threading.current_thread())))
+
+    source.update()
+
+    assert len(errors) == 1
+    error, thread = errors[0]
+    assert isinstance(error, ValueError)
+    # errors are reported on the thread which started the execution
+    assert thread is threading.current_thread()
+    # the sink only received data from the branch which succeeded
+    assert [entry[1] for entry in flow.log if entry[0] == 'sink'] == [1]
+
+
+def test_output_set_from_outside_starts_execution(flow):
+    source, _, sink = diamond(flow, [Branch, Branch])
+    source.set_output_val(0, Data(5))
+
+    assert [sink.input(i).payload for i in range(2)] == [6, 6]
+    assert ('source', -1) not in flow.log
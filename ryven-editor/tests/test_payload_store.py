@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from ryvencore.utils import serialize, deserialize
+
+from ryven.main.payload_store import (
+    externalize_payloads, remove_unreferenced_payloads, register_project_dir, payload_dir_name,
+)
+
+np = pytest.importorskip('numpy')
+
+THRESHOLD = 1024
+
+
+def externalize(tmp_path, *values):
+    project_path = tmp_path / 'p.json'
+    project = {'flows': {'main': {'nodes': [{'state data': serialize(v)} for v in values]}}}
+    externalized, files, written = externalize_payloads(project, project_path, THRESHOLD)
+    register_project_dir(project_path)
+    loaded = [deserialize(n['state data']) for n in externalized['flows']['main']['nodes']]
+    return project_path, loaded, files, written
+
+
+def test_arrays_are_memory_mapped(tmp_path):
+    array = np.arange(1000, dtype='f8')
+    _, (loaded,), files, written = externalize(tmp_path, {'array': array, 'label': 'x'})
+
+    assert written == 1
+    assert [f[-4:] for f in files] == ['.npy']
+    assert isinstance(loaded['array'], np.memmap)
+    np.testing.assert_array_equal(loaded['array'], array)
+    assert loaded['label'] == 'x'
+
+
+def test_small_values_stay_inline(tmp_path):
+    project_path, (loaded,), files, written = externalize(tmp_path, np.zeros(10))
+
+    assert not files and not written
+    assert not os.path.exists(tmp_path / payload_dir_name(project_path))
+    assert type(loaded) is np.ndarray
+
+
+@pytest.mark.filterwarnings('ignore::PendingDeprecationWarning')
+def test_array_subclasses_are_pickled(tmp_path):
+    matrix = np.matrix(np.ones((40, 40)))
+    _, (loaded,), files, _ = externalize(tmp_path, matrix)
+
+    assert [f[-7:] for f in files] == ['.pickle']
+    assert type(loaded) is np.matrix
+    np.testing.assert_array_equal(loaded, matrix)
+
+
+def test_images(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    rgb = Image.fromarray(np.arange(3 * 64 * 64, dtype='uint8').reshape(64, 64, 3))
+    # PNG would store 32 bit integers as 16 bit
+    wide = Image.fromarray(np.full((64, 64), 100000, dtype='int32'), 'I')
+    _, (loaded_rgb, loaded_wide), files, _ = externalize(tmp_path, rgb, wide)
+
+    assert sorted(f.rsplit('.', 1)[1] for f in files) == ['pickle', 'png']
+    assert loaded_rgb.mode == 'RGB' and loaded_rgb.tobytes() == rgb.tobytes()
+    assert loaded_wide.mode == 'I' and loaded_wide.tobytes() == wide.tobytes()
+
+
+def test_unchanged_values_are_not_written_again(tmp_path):
+    array = np.arange(1000)
+    _, _, files, _ = externalize(tmp_path, array)
+    _, _, files_again, written = externalize(tmp_path, array)
+
+    assert files_again == files
+    assert written == 0
+
+
+def test_unreferenced_payloads_are_removed(tmp_path):
+    project_path, _, old_files, _ = externalize(tmp_path, np.arange(1000))
+    _, _, files, _ = externalize(tmp_path, np.arange(2000))
+    payload_dir = tmp_path / payload_dir_name(project_path)
+    (payload_dir / 'notes.txt').write_text('not a payload')
+
+    assert remove_unreferenced_payloads(project_path, files) == 1
+    assert sorted(os.listdir(payload_dir)) == sorted(files | {'notes.txt'})
+    assert not old_files & files
@@ -0,0 +1,92 @@
+import base64
+import copy
+import os
+import pickle
+import zipfile
+
+from ryven.main.project_archive import (
+    write_archive, read_archive, is_archive, LazyMembersDict, MANIFEST, MIN_MEMBER_SIZE,
+)
+
+
+def encoded(n: int, seed: int = 0) -> str:
+    return base64.b64encode(bytes((i * 7 + seed) % 256 for i in range(n))).decode('ascii')
+
+
+def make_project():
+    state = encoded(4 * MIN_MEMBER_SIZE)
+    return {
+        'flows': {
+            'main': {
+                'nodes': [
+                    {'identifier': 'a', 'state data': state, 'pos x': 1.0},
+                    {'identifier': 'b', 'state data': state, 'pos x': 2.0},
+                    {'identifier': 'c', 'state data': encoded(10)},
+                ],
+                'output data': [{'serialized': encoded(2 * MIN_MEMBER_SIZE, 1)}],
+            },
+        },
+        'geometry': os.urandom(MIN_MEMBER_SIZE).hex(),
+    }
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    project = make_project()
+    write_archive(path, project)
+
+    assert is_archive(path)
+    assert read_archive(path) == project
+
+
+def test_identical_values_are_stored_once(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    write_archive(path, make_project())
+
+    with zipfile.ZipFile(path) as archive:
+        members = [n for n in archive.namelist() if n != MANIFEST]
+    # the shared node state, the output value and the geometry; the small
+    # state stays in the manifest
+    assert len(members) == 3
+
+
+def test_members_are_read_on_access(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    project = make_project()
+    write_archive(path, project)
+
+    node = read_archive(path)['flows']['main']['nodes'][0]
+    assert isinstance(node, LazyMembersDict)
+    assert node._pending == {'state data'}
+    assert node['pos x'] == 1.0
+    assert node._pending == {'state data'}
+    assert node['state data'] == project['flows']['main']['nodes'][0]['state data']
+    assert not node._pending
+
+
+def test_copies_and_pickles_are_plain_dicts(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    project = make_project()
+    write_archive(path, project)
+
+    for copied in (copy.deepcopy(read_archive(path)), pickle.loads(pickle.dumps(read_archive(path)))):
+        assert copied == project
+        assert type(copied['flows']['main']['nodes'][0]) is dict
+
+
+def test_members_are_readable_after_saving_again(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    project = make_project()
+    write_archive(path, project)
+    loaded = read_archive(path)
+    write_archive(path, project)
+
+    assert loaded == project
+
+
+def test_invalid_values_are_kept_in_the_manifest(tmp_path):
+    path = tmp_path / 'p.ryvenz'
+    project = {'state data': '!' * (2 * MIN_MEMBER_SIZE), 'geometry': 'xy' * MIN_MEMBER_SIZE}
+    write_archive(path, project)
+
+    assert read_archive(path) == project
@@ -1,9 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Callable, Optional, Type
 
 from qtpy.QtCore import QObject, Signal, Qt
 from qtpy.QtWidgets import QWidget, QApplication
 
 import ryvencore
+from ryvencore.utils import node_from_identifier
 
 from .flows.FlowView import FlowView
 from .Design import Design
@@ -38,6 +39,15 @@ class SessionGUI(GUIBase, QObject):
         # flow views
         self.flow_views: Dict[ryvencore.Flow, FlowView] = {}
 
+        # optional hook which maps a node class chosen by the user to the
+        # class that actually gets instantiated, see resolve_node_class()
+        self.node_class_resolver: Optional[Callable[[Type[ryvencore.Node]], Optional[Type[ryvencore.Node]]]] = None
+
+        # optional hook which is called with the node class before nodes of
+        # that class are created, e.g. to import gui modules of the node's
+        # package, see load_node_guis()
+        self.node_gui_loader: Optional[Callable[[Type[ryvencore.Node]], None]] = None
+
         # register complete_data function
         ryvencore.set_complete_data_func(self.get_complete_data_function(self))
 
@@ -52,6 +62,41 @@ class SessionGUI(GUIBase, QObject):
         self.core_session.flow_deleted.sub(self._flow_deleted)
         self.core_session.flow_renamed.sub(self._flow_renamed)
 
+    def resolve_node_class(self, node_class: Type[ryvencore.Node]) -> Optional[Type[ryvencore.Node]]:
+        """
+        Returns the node class to instantiate when the user places a node
+        of type node_class. This allows registering placeholder classes
+        which are replaced by the real ones on demand (e.g. lazily imported
+        nodes packages). Returns None if the node cannot be created.
+        """
+        if self.node_class_resolver is None:
+            return node_class
+        return self.node_class_resolver(node_class)
+
+    def load_node_guis(self, node_class: Type[ryvencore.Node]):
+        """
+        Calls the node_gui_loader hook for node_class. This must happen
+        before nodes of the class are created, since nodes can access their
+        GUI class already in __init__() or place_event().
+        """
+        if self.node_gui_loader is not None:
+            self.node_gui_loader(node_class)
+
+    def load_node_guis_for_data(self, nodes_data: List[Dict]):
+        """
+        Calls load_node_guis() for the classes of serialized nodes before they
+        are loaded, e.g. from a project or the clipboard. Unknown identifiers
+        are skipped; loading the nodes reports them.
+        """
+        if self.node_gui_loader is None:
+            return
+        for node_data in nodes_data:
+            try:
+                node_class = node_from_identifier(node_data['identifier'], list(self.core_session.nodes))
+            except Exception:
+                continue
+            self.load_node_guis(node_class)
+
     def _flow_created(self, flow: ryvencore.Flow):
         """
         Builds the flow view for a newly created flow, saves it in
@@ -379,6 +379,9 @@ class Paste_Command(FlowUndoCommand):
             # create components
             self.create_drawings()
 
+            # the clipboard may come from another session
+            self.flow_view.session_gui.load_node_guis_for_data(self.data['nodes'])
+
             (
                 self.pasted_components['nodes'],
                 self.pasted_components['connections'],
@@ -45,6 +45,10 @@ NodeWidget {
 
     node_item_shadow_color = QColor('#2b2b2b')
 
+    heatmap_cold_color = QColor('#ffd500')
+    heatmap_hot_color = QColor('#e01414')
+    heatmap_text_color = QColor('#ffffff')
+
     EXPORT: List[str] = []
 
     def __init__(self):
@@ -105,6 +109,35 @@ NodeWidget {
         elif node_style == 'small':
             self.draw_NI_small(node_gui, selected, hovered, painter, color, w, h, bounding_rect)
 
+        heatmap = node_gui.item.flow_view.heatmap
+        if heatmap is not None:
+            self.paint_NI_heatmap(node_gui, heatmap, painter, bounding_rect)
+
+    def paint_NI_heatmap(self, node_gui, heatmap, painter: QPainter, bounding_rect):
+        """Tints the node by its execution time, see FlowViewHeatmap"""
+        heat = heatmap.heat(node_gui.node)
+        if heat is None:
+            return
+
+        cold, hot = self.heatmap_cold_color, self.heatmap_hot_color
+        tint = QColor(
+            round(cold.red() + (hot.red() - cold.red()) * heat),
+            round(cold.green() + (hot.green() - cold.green()) * heat),
+            round(cold.blue() + (hot.blue() - cold.blue()) * heat),
+            round(50 + 110 * heat),
+        )
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(tint)
+        painter.drawRoundedRect(bounding_rect, 8, 8)
+
+        painter.setPen(QPen(self.heatmap_text_color))
+        painter.setFont(QFont('Source Code Pro', 7))
+        painter.drawText(
+            bounding_rect.adjusted(6, 2, -6, -2),
+            Qt.AlignBottom | Qt.AlignRight,
+            heatmap.label(node_gui.node)
+        )
+
     def draw_NI_normal(self, node_gui, selected: bool, hovered: bool,
                        painter: QPainter, c: QColor, w, h, bounding_rect, title_rect):
         pass
@@ -1209,6 +1242,7 @@ class FlowTheme_PureDark(FlowTheme):
 class FlowTheme_PureLight(FlowTheme_PureDark):
     name = 'pure light'
     type_ = 'light'
+    heatmap_text_color = QColor('#202020')
 
     header_padding = (2, 2, 2, 2)
 
@@ -1344,6 +1378,7 @@ class FlowTheme_Colorful(FlowTheme):
 class FlowTheme_ColorfulLight(FlowTheme_Colorful):
     name = 'colorful light'
     type_ = 'light'
+    heatmap_text_color = QColor('#202020')
 
     header_padding = (12, 0, 2, 2)
 
@@ -1519,6 +1554,7 @@ class FlowTheme_Industrial(FlowTheme):
 class FlowTheme_Fusion(FlowTheme):
     name = 'Fusion'
     type_ = 'light'
+    heatmap_text_color = QColor('#202020')
 
     node_selection_stylesheet = '''
     NodeSelectionWidget {
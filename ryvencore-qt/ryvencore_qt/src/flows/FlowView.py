@@ -5,8 +5,9 @@ if TYPE_CHECKING:
     from ..SessionGUI import SessionGUI
 
 import json
+import time
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable
 
 from qtpy.QtCore import (
     Qt,
@@ -42,6 +43,7 @@ from qtpy.QtWidgets import (
     QPushButton,
     QHBoxLayout,
     QWidget,
+    QLabel,
 )
 
 # for compatibility between qt5 and qt6
@@ -73,6 +75,7 @@ from .FlowCommands import (
 )
 from .FlowViewProxyWidget import *
 from .FlowViewStylusModesWidget import FlowViewStylusModesWidget
+from .FlowViewHeatmap import FlowViewHeatmap
 from .node_list_widget.NodeListWidget import NodeListWidget
 from .nodes.NodeGUI import NodeGUI
 from .nodes.NodeItem import NodeItem
@@ -119,6 +122,12 @@ class FlowView(GUIBase, QGraphicsView):
 
     viewport_update_mode_changed = Signal(str)
 
+    # flows loaded with at least this many nodes get their items created in
+    # batches, between which the event loop runs (see PROGRESSIVE POPULATION)
+    progressive_population_threshold = 200
+    # time in ms spent creating items before yielding to the event loop
+    population_batch_ms = 25
+
     def __init__(self, session_gui: SessionGUI, flow: Flow, parent=None) -> None:
         GUIBase.__init__(self, representing_component=flow)
         QGraphicsView.__init__(self, parent=parent)
@@ -143,6 +152,7 @@ class FlowView(GUIBase, QGraphicsView):
         self.connection_items: Dict = {}  # {Connection: ConnectionItem}
         self.connection_items__cache: Dict = {}
         self.selection_mode: _SelectionMode = _SelectionMode.UNDOABLE_CLICK
+        self.heatmap: Optional[FlowViewHeatmap] = None  # execution overlay, see set_heatmap()
 
         # PRIVATE FIELDS
         self._loaded_state: Optional[Dict] = None # h and v scrollbars are changed on import, so we need to defer
@@ -170,6 +180,24 @@ class FlowView(GUIBase, QGraphicsView):
             'scene pos': None,
             'delta': 0,
         }
+        # progressive population, see add_node()
+        self._population_nodes: Dict[Node, None] = {}  # ordered set of nodes without items yet
+        self._population_conns: Dict[Tuple[NodeOutput, NodeInput], None] = {}
+        self._population_conn_items: List[ConnectionItem] = []
+        self._population_done = 0
+        self._population_load_data: Optional[Dict] = None
+        self._population_node_data: set = set()  # ids of the data of nodes to populate
+        self._population_rebuilt: Dict[Node, Optional[Callable]] = {}  # nodes whose rebuilt() is deferred
+        self._population_rebuilt_calls: List[Node] = []
+        self._population_index_method = None
+        self._population_timer = QTimer(self)
+        self._population_timer.setInterval(0)
+        self._population_timer.timeout.connect(self._populate_batch)
+        # a label and not a progress bar, which would repaint the view synchronously
+        self._population_progress = QLabel(self)
+        self._population_progress.move(10, 10)
+        self._population_progress.setAutoFillBackground(True)
+        self._population_progress.hide()
 
         # CONNECTIONS TO FLOW
         self.create_node_request.connect(self.flow.create_node)
@@ -982,9 +1010,23 @@ class FlowView(GUIBase, QGraphicsView):
 
     # NODES
     def create_node__cmd(self, node_class):
+        node_class = self.session_gui.resolve_node_class(node_class)
+        if node_class is None:
+            return
+        self.session_gui.load_node_guis(node_class)
         self.push_undo(PlaceNode_Command(self, node_class, self._node_place_pos))
 
     def add_node(self, node: Node):
+        # nodes created without create_node__cmd(), e.g. from the console;
+        # returns immediately if the GUIs are loaded already
+        self.session_gui.load_node_guis(type(node))
+
+        if self._loaded_progressively(node):
+            self._population_nodes[node] = None
+            self._defer_rebuilt(node)
+            self._start_population()
+            return
+
         # create item
         item: NodeItem
 
@@ -994,30 +1036,34 @@ class FlowView(GUIBase, QGraphicsView):
             self._add_node_item(item)
 
         else:  # create new item
-            item = NodeItem(
-                node=node,
-                node_gui=
-                    (node.GUI if hasattr(node, 'GUI') else NodeGUI)     # use custom GUI class if available
-                    ((node, self.session_gui)),                         # calls __init__ of NodeGUI class with tuple arg
-                flow_view=self,
-                design=self.session_gui.design,
-            )
-            item.initialize()
-
-            self.node_placed.emit(node)
-
-            item_data = node.load_data
-            if item_data is not None and 'pos x' in item_data:
-                pos = QPointF(item_data['pos x'], item_data['pos y'])
-            else:
-                pos = self._node_place_pos
-
+            item, pos = self._create_node_item(node)
             self._add_node_item(item, pos)
 
         # auto connect
         if self._auto_connection_pin:
             self.auto_connect(self._auto_connection_pin.port, node)
 
+    def _create_node_item(self, node: Node) -> Tuple[NodeItem, QPointF]:
+        item = NodeItem(
+            node=node,
+            node_gui=
+                (node.GUI if hasattr(node, 'GUI') else NodeGUI)     # use custom GUI class if available
+                ((node, self.session_gui)),                         # calls __init__ of NodeGUI class with tuple arg
+            flow_view=self,
+            design=self.session_gui.design,
+        )
+        item.initialize()
+
+        self.node_placed.emit(node)
+
+        item_data = node.load_data
+        if item_data is not None and 'pos x' in item_data:
+            pos = QPointF(item_data['pos x'], item_data['pos y'])
+        else:
+            pos = self._node_place_pos
+
+        return item, pos
+
     def _add_node_item(self, item: NodeItem, pos=None):
         self.node_items[item.node] = item
 
@@ -1032,6 +1078,10 @@ class FlowView(GUIBase, QGraphicsView):
         item.setSelected(True)
 
     def remove_node(self, node):
+        if node in self._population_nodes:
+            del self._population_nodes[node]
+            self._restore_rebuilt(node)
+            return
         item = self.node_items[node]
         self._remove_node_item(item)
         del self.node_items[node]
@@ -1094,6 +1144,14 @@ class FlowView(GUIBase, QGraphicsView):
 
     def add_connection(self, c: Tuple[NodeOutput, NodeInput]):
         out, inp = c
+        if out.node in self._population_nodes or inp.node in self._population_nodes:
+            # the node items are created first
+            self._population_conns[c] = None
+            return
+        self._create_connection_item(c)
+
+    def _create_connection_item(self, c: Tuple[NodeOutput, NodeInput], recompute=True) -> ConnectionItem:
+        out, inp = c
 
         # TODO: need to verify that connection_items_cache still works fine with new connection object
         item: ConnectionItem
@@ -1107,7 +1165,7 @@ class FlowView(GUIBase, QGraphicsView):
                 # item = self.CLASSES['exec conn item'](c, self.session.design)
                 item = ExecConnectionItem(c, self.session_gui.design)
 
-        self._add_connection_item(item)
+        self._add_connection_item(item, recompute)
 
         item.out_item.port_connected()
         item.inp_item.port_connected()
@@ -1115,15 +1173,21 @@ class FlowView(GUIBase, QGraphicsView):
         for i in c:
             self.node_items[i.node].update()
 
-    def _add_connection_item(self, item: ConnectionItem):
+        return item
+
+    def _add_connection_item(self, item: ConnectionItem, recompute=True):
         self._set_selection_mode(_SelectionMode.INSTANT)
         self.connection_items[item.connection] = item
         self.scene().addItem(item)
-        item.recompute()
+        if recompute:
+            item.recompute()
         item.setZValue(-1)
         # self.viewport().repaint()
 
     def remove_connection(self, c: Tuple[NodeOutput, NodeInput]):
+        if c in self._population_conns:
+            del self._population_conns[c]
+            return
         item = self.connection_items[c]
         self._remove_connection_item(item)
 
@@ -1158,6 +1222,131 @@ class FlowView(GUIBase, QGraphicsView):
             self.connection_items[c].changed = True
             self.connection_items[c].update()
 
+    # PROGRESSIVE POPULATION
+    # When a flow with many nodes is loaded, the node and connection items are
+    # not created while the flow loads but queued, and then created in batches
+    # by a timer, so the event loop keeps running. Until a node's item exists,
+    # the node has no gui, just like in a headless session. So that nodes can
+    # show their loaded state, e.g. result nodes, their rebuilt() (see
+    # Flow.load_components()) is deferred until the items of all nodes exist.
+    def _loaded_progressively(self, node: Node) -> bool:
+        """Whether the node is being loaded with the flow, and the flow's
+        data has enough nodes to create their items in batches."""
+        data = self.flow.load_data
+        if data is None or node.load_data is None or node in self.node_items__cache:
+            return False
+        if data is not self._population_load_data:
+            # nodes pasted later are loaded from other data
+            nodes_data = data.get('nodes', [])
+            self._population_load_data = data
+            self._population_node_data = (
+                {id(d) for d in nodes_data}
+                if len(nodes_data) >= self.progressive_population_threshold
+                else set()
+            )
+        return id(node.load_data) in self._population_node_data
+
+    def _defer_rebuilt(self, node: Node):
+        """Shadows the node's rebuilt() with a method recording the call."""
+        self._population_rebuilt[node] = node.__dict__.get('rebuilt')
+        node.__dict__['rebuilt'] = lambda: self._population_rebuilt_calls.append(node)
+
+    def _restore_rebuilt(self, node: Node):
+        prev = self._population_rebuilt.pop(node, None)
+        if prev is None:
+            node.__dict__.pop('rebuilt', None)
+        else:
+            node.__dict__['rebuilt'] = prev
+
+    def _replay_rebuilt(self):
+        """Calls rebuilt() of the nodes whose items were created, in the
+        order in which the flow called them."""
+        for node in list(self._population_rebuilt):
+            self._restore_rebuilt(node)
+        calls, self._population_rebuilt_calls = self._population_rebuilt_calls, []
+        for node in calls:
+            if node in self.node_items:
+                node.rebuilt()
+
+    def _start_population(self):
+        """Starts creating the items of the queued nodes once the event loop
+        runs, i.e. after the flow was loaded."""
+        if self._population_timer.isActive():
+            return
+        self._population_done = 0
+        # selection changes are not tracked while populating
+        self._unwatch_scene_selection()
+        self._population_index_method = self.scene().itemIndexMethod()
+        self.scene().setItemIndexMethod(QGraphicsScene.NoIndex)
+        # the scene is painted once all items exist
+        self.viewport().setUpdatesEnabled(False)
+        self._population_progress.setText('loading...')
+        self._population_progress.adjustSize()
+        self._population_progress.show()
+        self._population_timer.start()
+
+    def _populate_batch(self):
+        """Creates node items, then connection items, until the time of a
+        batch is used up."""
+        end = time.perf_counter() + self.population_batch_ms / 1000
+        while self._population_nodes and time.perf_counter() < end:
+            node = next(iter(self._population_nodes))
+            del self._population_nodes[node]
+            item, pos = self._create_node_item(node)
+            self.node_items[node] = item
+            self.scene().addItem(item)
+            item.setPos(pos)
+            self._population_done += 1
+
+        if not self._population_nodes and self._population_rebuilt:
+            self._replay_rebuilt()
+
+        while not self._population_nodes and self._population_conns and time.perf_counter() < end:
+            c = next(iter(self._population_conns))
+            del self._population_conns[c]
+            # the path is recomputed once all items exist
+            self._population_conn_items.append(self._create_connection_item(c, recompute=False))
+            self._population_done += 1
+
+        if self._population_nodes or self._population_conns:
+            total = self._population_done + len(self._population_nodes) + len(self._population_conns)
+            self._population_progress.setText(f'loading {self._population_done} / {total}')
+            self._population_progress.adjustSize()
+        else:
+            self._finish_population()
+
+    def _finish_population(self):
+        self._population_timer.stop()
+        for item in self._population_conn_items:
+            item.recompute()
+        self._population_conn_items.clear()
+        self.scene().setItemIndexMethod(self._population_index_method)
+        self._population_progress.hide()
+        self._set_selection_mode(_SelectionMode.INSTANT)
+        self._watch_scene_selection()
+        self._current_selected = self.scene().selectedItems()
+        self.viewport().setUpdatesEnabled(True)
+
+    def populating(self) -> bool:
+        """Whether items of loaded nodes or connections are still being created."""
+        return self._population_timer.isActive()
+
+    def finish_population(self):
+        """Creates all remaining items of a progressive population at once,
+        e.g. before the flow is serialized."""
+        while self._population_timer.isActive():
+            self._populate_batch()
+
+    # HEATMAP
+    def set_heatmap(self, heatmap: Optional[FlowViewHeatmap]):
+        """Shows the execution heatmap overlay, or hides it if heatmap is None.
+        Call again after the data of the heatmap changed."""
+        self.heatmap = heatmap
+        for item in self.node_items.values():
+            item.update()
+        for item in self.connection_items.values():
+            item.recompute()
+
     # DRAWINGS
     def create_drawing(self, data=None) -> DrawingObject:
         """Creates and returns a new DrawingObject."""
@@ -1423,6 +1612,8 @@ class FlowView(GUIBase, QGraphicsView):
 
     # DATA
     def complete_data(self, data: Dict):
+        # node items complete the data of their nodes
+        self.finish_population()
         data['flow view'] = {
             'drawings': self._get_drawings_data(self.drawings),
             'view size': [
@@ -0,0 +1,77 @@
+from math import log1p
+from typing import Dict, Optional, Tuple
+
+from ryvencore import Node
+from ryvencore.NodePort import NodeOutput
+
+
+class FlowViewHeatmap:
+    """
+    Execution statistics of a flow, shown by the FlowView as an overlay
+    (see ``FlowView.set_heatmap()``): node items are tinted by their
+    execution time and annotated with time and call count, data connections
+    are thickened by the volume of data their output transferred.
+
+    The statistics are provided by the application, e.g. from a tracer,
+    through ``set_data()``.
+    """
+
+    CUMULATIVE = 'cumulative'
+    LAST = 'last'
+
+    # width of the connection with the highest data volume,
+    # relative to the theme's connection width
+    max_width_factor = 4.0
+
+    def __init__(self, mode: str = CUMULATIVE):
+        self.mode = mode
+        # {node: (calls, cumulative time, last time)}, times in seconds
+        self.node_stats: Dict[Node, Tuple[int, float, float]] = {}
+        # {output: transferred bytes}
+        self.output_bytes: Dict[NodeOutput, int] = {}
+        self._max_time = 0.0
+        self._max_bytes = 0
+
+    def set_data(self, node_stats: Dict[Node, Tuple[int, float, float]], output_bytes: Dict[NodeOutput, int]):
+        self.node_stats = node_stats
+        self.output_bytes = output_bytes
+        self._update_max()
+
+    def set_mode(self, mode: str):
+        self.mode = mode
+        self._update_max()
+
+    def _update_max(self):
+        self._max_time = max((self.time(n) for n in self.node_stats), default=0.0)
+        self._max_bytes = max(self.output_bytes.values(), default=0)
+
+    def time(self, node: Node) -> Optional[float]:
+        """The node's execution time according to the mode, None if it
+        was not executed."""
+        stats = self.node_stats.get(node)
+        if stats is None:
+            return None
+        return stats[1] if self.mode == self.CUMULATIVE else stats[2]
+
+    def heat(self, node: Node) -> Optional[float]:
+        """The node's time relative to the slowest node, in [0, 1]."""
+        t = self.time(node)
+        if t is None:
+            return None
+        return t / self._max_time if self._max_time > 0 else 0.0
+
+    def label(self, node: Node) -> str:
+        """The node's time and number of calls, empty if it was not executed."""
+        t = self.time(node)
+        if t is None:
+            return ''
+        calls = self.node_stats[node][0]
+        return f'{t * 1000:.1f} ms  {calls}x'
+
+    def connection_width_factor(self, out: NodeOutput) -> float:
+        """Factor for the width of connections from the output, scaled
+        logarithmically by its data volume."""
+        volume = self.output_bytes.get(out, 0)
+        if volume <= 0 or self._max_bytes <= 0:
+            return 1.0
+        return 1.0 + (self.max_width_factor - 1.0) * log1p(volume) / log1p(self._max_bytes)
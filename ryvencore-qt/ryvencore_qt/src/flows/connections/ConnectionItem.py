@@ -178,6 +178,10 @@ class ConnectionItem(GUIBase, QGraphicsPathItem):
     def flow_theme(self):
         return self.session_design.flow_theme
 
+    def heatmap_width_factor(self) -> float:
+        heatmap = self.out_item.flow_view.heatmap
+        return 1.0 if heatmap is None else heatmap.connection_width_factor(self.connection[0])
+
     def hoverEnterEvent(self, event):
         self.set_highlighted(True)
         super().hoverEnterEvent(event)
@@ -224,11 +228,11 @@ class ExecConnectionItem(ConnectionItem):
 
 class DataConnectionItem(ConnectionItem):
     def pen_width(self):
-        return self.flow_theme().data_conn_width
+        return self.flow_theme().data_conn_width * self.heatmap_width_factor()
 
     def get_pen(self):
         theme = self.flow_theme()
-        pen = QPen(theme.data_conn_color, theme.data_conn_width)
+        pen = QPen(theme.data_conn_color, self.pen_width())
         pen.setStyle(theme.data_conn_pen_style)
         pen.setCapStyle(Qt.RoundCap)
         return pen
@@ -1,4 +1,4 @@
-from typing import Union, Type, List, Optional, Tuple, TypeVar
+from typing import Union, Type, List, Optional, Tuple, TypeVar, Callable
 
 from qtpy.QtWidgets import (
     QWidget, 
@@ -24,12 +24,32 @@ class InspectorView(QWidget):
         self.node: Optional[Node] = None
         self.inspector_widget: Optional[NodeInspectorWidget] = None
         self.flow_view = flow_view
+        # optional source of additional information about the inspected node,
+        # e.g. statistics collected by the application, shown below its
+        # inspector widget as rich text; see refresh_info()
+        self.info_provider: Optional[Callable[[Node], Optional[str]]] = None
 
         self.setup_ui()
         self.flow_view.nodes_selection_changed.connect(self.set_selected_nodes)
 
     def setup_ui(self):
         self.setLayout(QVBoxLayout())
+        self.info_label = QLabel()
+        self.info_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.info_label.setVisible(False)
+        self.layout().addWidget(self.info_label)
+
+    def set_info_provider(self, provider: Optional[Callable[[Node], Optional[str]]]):
+        self.info_provider = provider
+        self.refresh_info()
+
+    def refresh_info(self):
+        """Updates the additional information about the inspected node."""
+        text = None
+        if self.node is not None and self.info_provider is not None:
+            text = self.info_provider(self.node)
+        self.info_label.setText(text or '')
+        self.info_label.setVisible(bool(text))
 
     def set_selected_nodes(self, nodes: List[Node]):
         if len(nodes) == 0:
@@ -57,10 +77,12 @@ class InspectorView(QWidget):
             assert hasattr(self.node, 'gui')
             self.inspector_widget = self.node.gui.inspector_widget
             assert isinstance(self.inspector_widget, QWidget)
-            self.layout().addWidget(self.inspector_widget)
+            self.layout().insertWidget(self.layout().indexOf(self.info_label), self.inspector_widget)
             self.inspector_widget.load()
             self.inspector_widget.setVisible(True)
 
+        self.refresh_info()
+
 
 class NodeInspectorDefaultWidget(NodeInspectorWidget, QWidget):
     """